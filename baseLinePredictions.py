@@ -1,13 +1,60 @@
 from random import randint
 from random import shuffle
+from numpy.random import RandomState
 from gensim.models import Word2Vec
 from scipy.spatial.distance import cosine
+from numpy import arange
+from numpy import asarray
+from numpy import cumsum
+from numpy import inf
+from numpy import isnan
+from numpy import maximum
+from numpy import minimum
+from numpy import repeat
+from numpy import where
 from numpy import zeros
-from itertools import combinations
-from math import isnan
-from copy import deepcopy
+from embeddingBackends import getEmbeddingBackend
+from groupingSolvers import getPartitionTemplates
+from groupingSolvers import maxSubsetExamples
+from groupingSolvers import optimalityGap
+from groupingSolvers import solveGroupingExact
+from groupingSolvers import solveGroupingGreedy
+from groupingSolvers import solveGroupingKMedoids
+from groupingSolvers import solveGroupingLocalSearch
+from groupingSolvers import solveGroupingMatching
+from groupingSolvers import solveGroupingSubsetDP
+from groupingSolvers import solveGroupingsBatch
+from labelAccuracy import calculateGroupedAccuracies
+from labelAccuracy import calculateOFMAccuracy
+from labelAccuracy import getGroupedLabels
+from predictionMethods import WordCrossoverMethod
+from predictionMethods import getPredictionMethod
+from predictionResults import GroupedIndexResults
+from predictionResults import OFMIndexResults
+from predictionResults import getGroupedIndexResults
+import time
 
 class OFMPredictions:
+
+	def __init__(self, vocabulary=None, embeddingStore=None, 
+		similarityCache=None, indexResults=False):
+		"""
+		Args:
+		vocabulary: The TokenVocabulary the examples' tokens were interned with
+		or None if they are lists of tokens.
+		embeddingStore: A SentenceEmbeddingStore holding the sentence vectors of
+		the examples or None to embed them with the model.
+		similarityCache: A SimilarityCache built with the prediction method's
+		similarity over all the examples the data is selected from, or None to
+		score the examples as they are given.
+		indexResults: Boolean to indicate if predictions are given as an 
+		OFMIndexResults holding the position of each selected option rather 
+		than as sentences.
+		"""
+		self.vocabulary = vocabulary
+		self.embeddingStore = embeddingStore
+		self.similarityCache = similarityCache
+		self.indexResults = indexResults
 	
 	def randomSelection(self, dataToSelectFrom):
 		"""
@@ -22,15 +69,15 @@ class OFMPredictions:
 		Returns:
 		A dictionary with the same keys as that given as an argument with values
 		being a dictionary with keys 'example' and 'solution'. Both return a single
-		string. 
+		string. Or an OFMIndexResults if indexResults is set.
 		"""
-		results = {}
-		for key in dataToSelectFrom.keys():
-			example = dataToSelectFrom[key]['example']
-			optionsToSelectFrom = dataToSelectFrom[key]['options']
-			solution = optionsToSelectFrom[randint(0, len(optionsToSelectFrom)-1)]
-			results[key] = {'example':example['sent'], 'solution':solution['sent']}
-		return results
+		keys = list(dataToSelectFrom.keys())
+		selections = [randint(0, len(dataToSelectFrom[key]['options']) - 1)
+			for key in keys]
+		results = OFMIndexResults(keys, selections)
+		if self.indexResults:
+			return results
+		return results.toSentences(dataToSelectFrom)
 
 	  
 	def wordCrossoverSelection(self, dataToSelectFrom, pairs=False):	
@@ -51,22 +98,7 @@ class OFMPredictions:
 		being a dictionary with keys 'example' and 'solution'. Both return a single
 		string. 
 		"""
-		results = {}
-		for key in dataToSelectFrom.keys():
-			example = dataToSelectFrom[key]['example']
-			optionsToSelectFrom = dataToSelectFrom[key]['options']
-			optionsToSelectFrom = deepcopy(optionsToSelectFrom)
-			shuffle(optionsToSelectFrom)
-			numMatches = []
-			for option in optionsToSelectFrom:
-				if pairs:
-					numMatches.append(getCrossoverMatchingWordPairs(example, option))
-				else:	
-					numMatches.append(getCrossoverIntersect(example, option))	
-			selectionIndex = numMatches.index(max(numMatches))
-			results[key] = {'example':example['sent'], 
-				'solution':optionsToSelectFrom[selectionIndex]['sent']}
-		return results
+		return self.selectByScores(dataToSelectFrom, WordCrossoverMethod(pairs))
 
 	def word2VecSimilaritySelectionWordSim(self, dataToSelectFrom, model):
 		"""
@@ -85,19 +117,8 @@ class OFMPredictions:
 		being a dictionary with keys 'example' and 'solution'. Both return a single
 		string. 
 		"""
-		results = {}
-		for key in dataToSelectFrom.keys():
-			example = dataToSelectFrom[key]['example']
-			optionsToSelectFrom = dataToSelectFrom[key]['options']
-			optionsToSelectFrom = deepcopy(optionsToSelectFrom)
-			shuffle(optionsToSelectFrom)
-			optionsSimScore = []
-			for option in optionsToSelectFrom:
-				optionsSimScore.append(word2vecWordSimilarity(example, option, model))	
-			selectionIndex = optionsSimScore.index(max(optionsSimScore))
-			results[key] = {'example':example['sent'], 
-				'solution':optionsToSelectFrom[selectionIndex]['sent']}
-		return results
+		return self.selectByScores(dataToSelectFrom, 
+			getPredictionMethod('word2vecWordSim'), model)
 
 	def word2VecSimilaritySelectionCosine(self, dataToSelectFrom, model):
 		"""
@@ -117,18 +138,81 @@ class OFMPredictions:
 		being a dictionary with keys 'example' and 'solution'. Both return a single
 		string. 
 		"""
-		results = {}
-		for key in dataToSelectFrom.keys():
-			example = dataToSelectFrom[key]['example']
+		return self.selectByScores(dataToSelectFrom, 
+			getPredictionMethod('word2vecCosine'), model)
+
+	def predict(self, dataToSelectFrom, methodName, model=None):
+		"""
+		Selects the solution to the select one from list of options evaluation
+		problem with a registered prediction method.
+
+		Args:
+		dataToSelectFrom: A dictionary with keys 'example' and 'options'. 
+		'example' returns a dictionary with keys 'sent' and 'tokens'. 'options' 
+		returns a list of dictionarys with keys 'sent' and 'tokens'.
+		methodName: The name the prediction method is registered with.
+		model: A trained word2vec model if the method uses one else None.
+
+		Returns:
+		A dictionary with the same keys as that given as an argument with values
+		being a dictionary with keys 'example' and 'solution'. Both return a single
+		string. 
+		"""
+		return getPredictionMethod(methodName).selectOFM(self, dataToSelectFrom,
+			model)
+
+	def selectByScores(self, dataToSelectFrom, method, model=None):
+		"""
+		Selects the solution to the select one from list of options evaluation
+		problem by scoring every option of every word against its example in a 
+		single batch and choosing each word's best scored option.
+
+		Args:
+		dataToSelectFrom: A dictionary with keys 'example' and 'options'. 
+		'example' returns a dictionary with keys 'sent' and 'tokens'. 'options' 
+		returns a list of dictionarys with keys 'sent' and 'tokens'.
+		method: The PredictionMethod to score the options with.
+		model: A trained word2vec model if the method uses one else None.
+
+		Returns:
+		A dictionary with the same keys as that given as an argument with values
+		being a dictionary with keys 'example' and 'solution'. Both return a single
+		string. 
+		"""
+		keys = list(dataToSelectFrom.keys())
+		# Shuffling the positions of the options rather than the options breaks
+		# ties at random without copying or changing the data
+		optionsByKey = {}
+		ordersByKey = {}
+		for key in keys:
 			optionsToSelectFrom = dataToSelectFrom[key]['options']
-			optionsToSelectFrom = deepcopy(optionsToSelectFrom)
-			shuffle(optionsToSelectFrom)
-			cosineSim = [cosineSimilarity(example, option, model) 
-				for option in optionsToSelectFrom]
-			index = cosineSim.index(min(cosineSim))
-			results[key] = {'example':example['sent'], 
-				'solution':optionsToSelectFrom[index]['sent']}
-		return results
+			order = list(range(len(optionsToSelectFrom)))
+			shuffle(order)
+			optionsByKey[key] = [optionsToSelectFrom[i] for i in order]
+			ordersByKey[key] = order
+
+		examples = [dataToSelectFrom[key]['example'] for key in keys 
+			for option in optionsByKey[key]]
+		options = [option for key in keys for option in optionsByKey[key]]
+		if self.similarityCache is not None:
+			scores = self.similarityCache.getOptionScores(keys, 
+				[dataToSelectFrom[key]['example']['sent'] for key in keys],
+				[[option['sent'] for option in optionsByKey[key]] 
+				for key in keys])
+		else:
+			scores = method.scoreBatch(examples, options, model, 
+				self.vocabulary, self.embeddingStore)
+		if method.minValue:
+			# Sentences without any tokens in the model can not be compared
+			scores[isnan(scores)] = inf
+
+		selections = selectBestInSegments(scores, [len(optionsByKey[key]) 
+			for key in keys], method.minValue)
+		results = OFMIndexResults(keys, [ordersByKey[key][selectionIndex] 
+			for key, selectionIndex in zip(keys, selections)])
+		if self.indexResults:
+			return results
+		return results.toSentences(dataToSelectFrom)
 
 	def calculateAccuracy(self, results, dataset):
 		"""
@@ -138,21 +222,63 @@ class OFMPredictions:
 		Args:
 		results: The results from one of the prediction methods as a dictionary
 		with words as keys and a dictionary with keys 'example' and 'solution'
-		as values.
+		as values, or an OFMIndexResults.
 		dataset: The data provided to the prediction method to get the results.
 
 		Returns:
 		The accuracy of the prediction results as a float.
 		"""
-		correct = 0
-		for key in dataset.keys():
-			correctChoice = dataset[key]['options'][0]['sent']
-			answer = results[key]['solution']
-			if answer == correctChoice:
-				correct += 1
-		return correct / float(len(results))
+		if isinstance(results, OFMIndexResults):
+			return results.calculateAccuracy()
+		keys = list(dataset.keys())
+		return calculateOFMAccuracy([results[key]['solution'] for key in keys],
+			[dataset[key]['options'][0]['sent'] for key in keys])
 
 class GroupedPredictions:
+
+	# Solvers that return the best grouping found within a budget
+	heuristicSolvers = ['greedy', 'localSearch', 'kMedoids']
+	# Solvers that score every grouping, replaced by matching for pairs
+	enumeratingSolvers = ['bruteForce', 'batch', 'exact']
+	# Heuristic used by subsetDP for words with too many examples to hold 
+	# every subset of
+	fallbackSolver = 'localSearch'
+
+	def __init__(self, timeLimit=None, maxIterations=None, compareToExact=False,
+		vocabulary=None, embeddingStore=None, similarityCache=None, 
+		indexResults=False):
+		"""
+		Args:
+		timeLimit: The number of seconds a heuristic solver may spend on each 
+		word or None.
+		maxIterations: The number of iterations a heuristic solver may run for
+		each word or None. If neither limit is given a single iteration is run.
+		compareToExact: Boolean to indicate if every word grouped by a 
+		heuristic solver should also be grouped by the exact solver so that the
+		optimality gap and the exact results are recorded in gapReport and 
+		exactResults, words with too many examples to solve exactly are 
+		counted in skippedGaps.
+		vocabulary: The TokenVocabulary the examples' tokens were interned with
+		or None if they are lists of tokens.
+		embeddingStore: A SentenceEmbeddingStore holding the sentence vectors of
+		the examples or None to embed them with the model.
+		similarityCache: A SimilarityCache built with the prediction method's
+		similarity over all the examples the data is selected from, or None to
+		score the examples as they are given.
+		indexResults: Boolean to indicate if predictions, and exactResults, are
+		given as a GroupedIndexResults holding the predicted group of each 
+		example rather than as lists of sentences.
+		"""
+		self.timeLimit = timeLimit
+		self.maxIterations = maxIterations
+		self.compareToExact = compareToExact
+		self.vocabulary = vocabulary
+		self.embeddingStore = embeddingStore
+		self.similarityCache = similarityCache
+		self.indexResults = indexResults
+		self.gapReport = {}
+		self.skippedGaps = 0
+		self.exactResults = {}
 	
 	def randomSelection(self, dataToSelectFrom, groupSize):
 		"""
@@ -162,30 +288,42 @@ class GroupedPredictions:
 		Args:
 		dataToSelectFrom: A dictionary with words as keys and a list of examples
 		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
-		groupSize: Is the size of the groups to be predicted. 
+		groupSize: Is the size of the groups to be predicted or a dictionary 
+		with the same keys holding a list of the size of each group.
 
 		Returns:
 		A dictionary with the same keys as that given as an argument with values
 		of a list of lists. Each of the inner lists being groupSize long and made 
-		up of examples that are predicted to be in a group.
+		up of examples that are predicted to be in a group. Or a 
+		GroupedIndexResults if indexResults is set.
 		"""
-		examplesShuffled = {}
-		for key in dataToSelectFrom.keys():
-			examples = dataToSelectFrom[key]
-			examples = [example['sent'] for example in examples]
-			examples = deepcopy(examples)
-			shuffle(examples)
-			results = []
-			for i in range(len(examples)/groupSize):
-				results.append(examples[i*groupSize : i*groupSize + groupSize])
-			examplesShuffled[key] = results
-		return examplesShuffled
+		keys = list(dataToSelectFrom.keys())
+		groupings = []
+		for key in keys:
+			positions = list(range(len(dataToSelectFrom[key])))
+			shuffle(positions)
+			if isinstance(groupSize, dict):
+				groupSizes = groupSize[key]
+			else:
+				groupSizes = [groupSize] * (len(positions) // groupSize)
+			grouping = []
+			start = 0
+			for size in groupSizes:
+				grouping.append(positions[start : start + size])
+				start += size
+			groupings.append(grouping)
+		results = getGroupedIndexResults(keys, groupings, 
+			[len(dataToSelectFrom[key]) for key in keys])
+		if self.indexResults:
+			return results
+		return results.toSentences(dataToSelectFrom)
 
-	def wordCrossoverSelection(self, dataToSelectFrom, groupSize, pairs=False):
+	def wordCrossoverSelection(self, dataToSelectFrom, groupSize, pairs=False,
+		solver='bruteForce'):
 		"""
 		Selects the solution to the grouped evaluation problem using word 
 		crossover techniques. Each example sentence is scored against all other
-		example sentences using word crossover, then a brute force approach is 
+		example sentences using word crossover, then the selected solver is 
 		used to find the best possible groupings. Two slight varied techniques 
 		possible for the word crossover scoring, selection is made through the 
 		pairs argument.
@@ -193,76 +331,464 @@ class GroupedPredictions:
 		Args:
 		dataToSelectFrom: A dictionary with words as keys and a list of examples
 		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
-		groupSize: Is the size of the groups to be predicted. 
+		groupSize: Is the size of the groups to be predicted or a dictionary 
+		with the same keys holding a list of the size of each group.
 		pairs: Boolean indicating if the scoring should be done using the 
 		crossoverMatchingWordPairs method (if True) or crossoverIntersect method.
+		solver: The method used to find the best groupings, either 'bruteForce',
+		'exact', 'batch', 'subsetDP', 'matching' or one of the heuristicSolvers.
 
 		Returns:
 		A dictionary with the same keys as that given as an argument with values
 		of a list of lists. Each of the inner lists being groupSize long and made 
 		up of examples that are predicted to be in a group.
 		"""
-		results = {}
-		for key in dataToSelectFrom.keys():
-			examples = dataToSelectFrom[key]
-			examples = deepcopy(examples)
-			shuffle(examples)
-			size = len(examples)
-			similarityValues = [[0 for x in range(size)] for y in range(size)]
-			for i in range(len(examples)):
-				for j in range(len(examples)):
-					if pairs:
-						similarityValues[i][j] = getCrossoverMatchingWordPairs(
-							examples[i], examples[j])
-					else:
-						similarityValues[i][j] = getCrossoverIntersect(
-							examples[i], examples[j])	
-			groups = self.groupBySimilarityBF(examples, similarityValues, groupSize, 
-				False)
-			results[key] = groups		
-		return results
+		return self.groupByScores(dataToSelectFrom, groupSize, 
+			WordCrossoverMethod(pairs), solver=solver)
 
-	def word2VecSimilaritySelection(self, dataToSelectFrom, groupSize, model):
+	def word2VecSimilaritySelection(self, dataToSelectFrom, groupSize, model,
+		solver='bruteForce'):
 		"""
 		Selects the solution to the grouped evaluation problem using word2vec 
 		and scoring the similarity between sentences using cosine similarity. 
 		Each example sentence is scored against all other example sentences, 
-		then a brute force approach is used to find the best possible 
-		groupings.
+		then the selected solver is used to find the best possible groupings.
 
 		Args:
 		dataToSelectFrom: A dictionary with words as keys and a list of examples
 		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
-		groupSize: Is the size of the groups to be predicted. 
+		groupSize: Is the size of the groups to be predicted or a dictionary 
+		with the same keys holding a list of the size of each group.
 		model: A trained word2vec model.
+		solver: The method used to find the best groupings, either 'bruteForce',
+		'exact', 'batch', 'subsetDP', 'matching' or one of the heuristicSolvers.
 
 		Returns:
 		A dictionary with the same keys as that given as an argument with values
 		of a list of lists. Each of the inner lists being groupSize long and made 
 		up of examples that are predicted to be in a group.
 		"""
-		results = {}
+		return self.groupByScores(dataToSelectFrom, groupSize, 
+			getPredictionMethod('word2vec'), model, solver)
+
+	def predict(self, dataToSelectFrom, groupSize, methodName, model=None,
+		solver='bruteForce'):
+		"""
+		Selects the solution to the grouped evaluation problem with a 
+		registered prediction method.
+
+		Args:
+		dataToSelectFrom: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+		groupSize: Is the size of the groups to be predicted or a dictionary 
+		with the same keys holding a list of the size of each group.
+		methodName: The name the prediction method is registered with.
+		model: A trained word2vec model if the method uses one else None.
+		solver: The method used to find the best groupings.
+
+		Returns:
+		A dictionary with the same keys as that given as an argument with values
+		of a list of lists, each inner list being a predicted group.
+		"""
+		return getPredictionMethod(methodName).selectGrouped(self, 
+			dataToSelectFrom, groupSize, model, solver)
+
+	def groupByScores(self, dataToSelectFrom, groupSize, method, model=None,
+		solver='bruteForce'):
+		"""
+		Selects the solution to the grouped evaluation problem by scoring every
+		pair of examples of every word in a single batch, then using the 
+		selected solver to find the best possible groupings.
+
+		Args:
+		dataToSelectFrom: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+		groupSize: Is the size of the groups to be predicted or a dictionary 
+		with the same keys holding a list of the size of each group.
+		method: The PredictionMethod to score the examples with.
+		model: A trained word2vec model if the method uses one else None.
+		solver: The method used to find the best groupings, either 'bruteForce',
+		'exact', 'batch', 'subsetDP', 'matching' or one of the heuristicSolvers.
+
+		Returns:
+		A dictionary with the same keys as that given as an argument with values
+		of a list of lists, each inner list being a predicted group.
+		"""
+		examplesByKey = {}
+		ordersByKey = {}
 		for key in dataToSelectFrom.keys():
 			examples = dataToSelectFrom[key]
-			examples = deepcopy(examples)
-			shuffle(examples)
-			size = len(examples)
-			similarityValues = [[0 for x in range(size)] for y in range(size)]
-			for i in range(len(examples)):
-				for j in range(len(examples)):
-					similarityValues[i][j] = cosineSimilarity(examples[i], 
-						examples[j], model)
-			groups = self.groupBySimilarityBF(examples, similarityValues, groupSize, 
-				True)
-			results[key] = groups		
-		return results				
+			order = list(range(len(examples)))
+			shuffle(order)
+			examplesByKey[key] = [examples[i] for i in order]
+			ordersByKey[key] = order
+		if self.similarityCache is not None:
+			similarityByKey = self.getCachedSimilarities(examplesByKey)
+		else:
+			similarityByKey = method.scoreMatrices(examplesByKey, model, 
+				self.vocabulary, self.embeddingStore)
+		results = self.groupAllBySimilarity(examplesByKey, similarityByKey, 
+			groupSize, method.minValue, solver)
+		if not self.indexResults:
+			return results
+
+		# The groups hold positions in the shuffled order of the examples
+		def toIndexResults(groupingsByKey):
+			keys = list(groupingsByKey.keys())
+			return getGroupedIndexResults(keys, [[[ordersByKey[key][i] 
+				for i in group] for group in groupingsByKey[key]] for key in keys],
+				[len(ordersByKey[key]) for key in keys])
+		if isinstance(self.exactResults, dict) and self.exactResults:
+			self.exactResults = toIndexResults(self.exactResults)
+		return toIndexResults(results)
+
+	def formatGrouping(self, examples, grouping):
+		"""
+		Gives a grouping found by a solver in the format of the predictions.
+
+		Args:
+		examples: A list of examples, each example is a dictionary with keys 
+		'sent' and 'tokens'. 
+		grouping: A list of groups of example positions.
+
+		Returns:
+		A list of lists with each inner list holding the sentences of a group,
+		or the positions of its examples if indexResults is set.
+		"""
+		if self.indexResults:
+			return [list(group) for group in grouping]
+		return [[examples[i]['sent'] for i in group] for group in grouping]
+
+	def getCachedSimilarities(self, examplesByKey):
+		"""
+		Looks up the similarity between every pair of each word's examples in
+		the similarity cache.
+
+		Args:
+		examplesByKey: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+
+		Returns:
+		A dictionary with the same keys holding the similarity values between
+		all pairs of each word's examples, in the order of the examples.
+		"""
+		return dict((key, self.similarityCache.getSimilarityMatrix(key, 
+			[example['sent'] for example in examplesByKey[key]])) 
+			for key in examplesByKey)
+
+	def groupAllBySimilarity(self, examplesByKey, similarityByKey, groupSize,
+		minValue, solver='bruteForce'):
+		"""
+		Finds the best groupings of the examples for every word using the 
+		selected solver.
+
+		Args:
+		examplesByKey: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+		similarityByKey: A dictionary with the same keys holding the 
+		similarity values between all pairs of each word's examples.
+		groupSize: The number of examples in a group, or with the 'subsetDP' 
+		or a heuristic solver a dictionary with the same keys holding a list of
+		the size of each of the word's groups.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+		solver: Either 'batch' to score every possible grouping of all words
+		together or one of the solvers accepted by groupBySimilarity.
+
+		Returns:
+		A dictionary with the same keys as examplesByKey with values of a list 
+		of lists, each inner list being a predicted group.
+		"""
+		if isinstance(groupSize, dict):
+			if solver != 'subsetDP' and solver not in self.heuristicSolvers:
+				raise ValueError('Groups of unequal size can only be found by the ' + 
+					'subsetDP or a heuristic solver.')
+			return dict((key, self.groupBySimilarity(examplesByKey[key], 
+				similarityByKey[key], groupSize[key], minValue, solver)) 
+				for key in examplesByKey)
+		if groupSize == 2 and solver in self.enumeratingSolvers:
+			solver = 'matching'
+		if solver == 'batch':
+			return self.groupBySimilarityBatch(examplesByKey, similarityByKey, 
+				groupSize, minValue)
+		if self.compareToExact and solver in self.heuristicSolvers:
+			return self.groupBySimilarityCompared(examplesByKey, similarityByKey,
+				groupSize, minValue, solver)
+		results = {}
+		for key in examplesByKey:
+			results[key] = self.groupBySimilarity(examplesByKey[key], 
+				similarityByKey[key], groupSize, minValue, solver)
+		return results
+
+	def groupBySimilarityCompared(self, examplesByKey, similarityByKey, 
+		groupSize, minValue, solver):
+		"""
+		Groups every word with a heuristic solver and also with the exact 
+		solver when it has few enough examples for optimalityGap to solve. For
+		each word solved exactly the optimality gap and the time taken by both
+		solvers is recorded in gapReport and the exact groupings in 
+		exactResults, the other words are counted in skippedGaps.
+
+		Args:
+		examplesByKey: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+		similarityByKey: A dictionary with the same keys holding the 
+		similarity values between all pairs of each word's examples.
+		groupSize: The number of examples in a group.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+		solver: One of the heuristicSolvers.
+
+		Returns:
+		A dictionary with the same keys as examplesByKey with values of a list 
+		of lists, each inner list being a group predicted by the heuristic 
+		solver.
+		"""
+		results = {}
+		exactResults = {}
+		for key in examplesByKey:
+			examples = examplesByKey[key]
+			startTime = time.time()
+			grouping = self.findHeuristicGrouping(similarityByKey[key], groupSize,
+				minValue, solver)
+			seconds = time.time() - startTime
+			results[key] = self.formatGrouping(examples, grouping)
+			exactStartTime = time.time()
+			gap = optimalityGap(similarityByKey[key], grouping, groupSize, 
+				minValue)
+			if gap is None:
+				self.skippedGaps += 1
+				continue
+			gap['seconds'] = seconds
+			gap['exactSeconds'] = time.time() - exactStartTime
+			optimumGrouping = gap.pop('optimumGrouping')
+			self.gapReport[key] = gap
+			exactResults[key] = self.formatGrouping(examples, optimumGrouping)
+		if self.indexResults:
+			# Converted to a GroupedIndexResults by groupByScores
+			self.exactResults = exactResults
+		else:
+			self.exactResults.update(exactResults)
+		return results
+
+	def summariseGapReport(self):
+		"""
+		Summarises the optimality gaps recorded while grouping with 
+		compareToExact set.
+
+		Returns:
+		A dictionary with keys 'words', 'skipped', 'meanGap', 'maxGap', 
+		'seconds' and 'exactSeconds'. 'words' is the number of words solved 
+		exactly, 'skipped' the number with too many examples to be, and the
+		gaps and times are over the words solved exactly.
+		"""
+		gaps = [report['gap'] for report in self.gapReport.values()]
+		return {'words':len(gaps), 'skipped':self.skippedGaps,
+			'meanGap':sum(gaps) / float(len(gaps)) if gaps else 0.0,
+			'maxGap':max(gaps) if gaps else 0.0,
+			'seconds':sum(r['seconds'] for r in self.gapReport.values()),
+			'exactSeconds':sum(r['exactSeconds'] for r in self.gapReport.values())}
+
+	def groupBySimilarityBatch(self, examplesByKey, similarityByKey, groupSize,
+		minValue):
+		"""
+		Finds the best groupings for all words together. The similarity values
+		of all words with the same number of examples are stacked and every 
+		possible grouping is scored for all of them at once. Groupings with the
+		same score are chosen between at random.
+
+		Args:
+		examplesByKey: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+		similarityByKey: A dictionary with the same keys holding the 
+		similarity values between all pairs of each word's examples.
+		groupSize: The number of examples in a group.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+
+		Returns:
+		A dictionary with the same keys as examplesByKey with values of a list 
+		of lists, each inner list being a predicted group.
+		"""
+		randomState = RandomState(randint(0, 2**31 - 1))
+		keysBySize = {}
+		for key in sorted(examplesByKey):
+			keysBySize.setdefault(len(examplesByKey[key]), []).append(key)
+		results = {}
+		for size in sorted(keysBySize):
+			keys = keysBySize[size]
+			selections = solveGroupingsBatch([similarityByKey[key] for key in keys],
+				groupSize, minValue, randomState)
+			for key, selection in zip(keys, selections):
+				examples = examplesByKey[key]
+				results[key] = self.formatGrouping(examples, selection)
+		return results
+
+	def groupBySimilarity(self, exampleSents, similarityValues, groupSize, 
+		minValue, solver='bruteForce'):
+		"""
+		Finds the best groupings of the examples from the similarity values 
+		using the selected solver.
+
+		Args:
+		exampleSents: A list of examples, each example is a dictionary with 
+		keys 'sent' and 'tokens'. 
+		similarityValues: A list of lists of size equal to the number of 
+		examples, holding a similarity scoring between all pairs of examples.
+		groupSize: The number of examples in a group, or with the 'subsetDP' 
+		or a heuristic solver a list of the size of each group.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+		solver: Either 'bruteForce' to score every possible grouping, 'exact'
+		to match pairs and use dynamic programming over subsets otherwise,
+		'subsetDP' to use dynamic programming over subsets for groups of any
+		size, 'matching' to pair examples by maximum weight matching or one
+		of the heuristicSolvers. Pairs are always found by matching unless a 
+		heuristic solver is selected.
+
+		Returns:
+		A list of lists with each inner list being a group and giving the best
+		overall groupings score from the input.
+		"""
+		if groupSize == 2 and solver in self.enumeratingSolvers:
+			solver = 'matching'
+		if solver == 'matching':
+			return self.groupBySimilarityMatching(exampleSents, similarityValues, 
+				groupSize, minValue)
+		elif solver == 'bruteForce':
+			return self.groupBySimilarityBF(exampleSents, similarityValues, 
+				groupSize, minValue)
+		elif solver == 'exact':
+			return self.groupBySimilarityExact(exampleSents, similarityValues, 
+				groupSize, minValue)
+		elif solver == 'subsetDP':
+			return self.groupBySimilarityDP(exampleSents, similarityValues, 
+				groupSize, minValue)
+		elif solver in self.heuristicSolvers:
+			grouping = self.findHeuristicGrouping(similarityValues, groupSize, 
+				minValue, solver)
+			return self.formatGrouping(exampleSents, grouping)
+		raise ValueError(solver + ' is not a recognised grouping solver.')
+
+	def groupBySimilarityMatching(self, exampleSents, similarityValues, 
+		groupSize, minValue):
+		"""
+		Given a list of examples and similarity values between all examples 
+		finds the best possible pairing of the examples as a maximum weight 
+		perfect matching. This takes polynomial time so any number of senses 
+		with two examples each can be grouped.
+
+		Args:
+		exampleSents: A list of examples, each example is a dictionary with 
+		keys 'sent' and 'tokens'. 
+		similarityValues: A list of lists of size equal to the number of 
+		examples, holding a similarity scoring between all pairs of examples.
+		groupSize: The number of examples in a group, which must be 2.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+
+		Returns:
+		A list of lists with each inner list being a pair and giving the best
+		overall groupings score from the input.
+		"""
+		if groupSize != 2:
+			raise ValueError('The matching solver can only find groups of 2.')
+		grouping = solveGroupingMatching(similarityValues, minValue)
+		return self.formatGrouping(exampleSents, grouping)
+
+	def groupBySimilarityDP(self, exampleSents, similarityValues, groupSizes, 
+		minValue):
+		"""
+		Given a list of examples and similarity values between all examples 
+		finds the best possible groupings into groups of the given sizes using
+		dynamic programming over subsets of the examples. The groups do not 
+		need to be of equal size. Words with more than maxSubsetExamples 
+		examples are grouped by the fallbackSolver heuristic instead, within 
+		the predictor's time and iteration budget.
+
+		Args:
+		exampleSents: A list of examples, each example is a dictionary with 
+		keys 'sent' and 'tokens'. 
+		similarityValues: A list of lists of size equal to the number of 
+		examples, holding a similarity scoring between all pairs of examples.
+		groupSizes: A list of the size of each group or a single group size 
+		shared by all groups.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+
+		Returns:
+		A list of lists with each inner list being a group and giving the best
+		overall groupings score from the input.
+		"""
+		if not isinstance(groupSizes, list):
+			groupSizes = [groupSizes] * (len(exampleSents) // groupSizes)
+		if len(exampleSents) > maxSubsetExamples:
+			grouping = self.findHeuristicGrouping(similarityValues, groupSizes, 
+				minValue, self.fallbackSolver)
+		else:
+			grouping = solveGroupingSubsetDP(similarityValues, groupSizes, 
+				minValue)
+		return self.formatGrouping(exampleSents, grouping)
+
+	def findHeuristicGrouping(self, similarityValues, groupSize, minValue, 
+		solver):
+		"""
+		Finds a good grouping with one of the heuristic solvers within the 
+		predictor's time and iteration budget.
+
+		Args:
+		similarityValues: A list of lists of size equal to the number of 
+		examples, holding a similarity scoring between all pairs of examples.
+		groupSize: The number of examples in a group or a list of the size of 
+		each group.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+		solver: 'greedy', 'localSearch' or 'kMedoids'.
+
+		Returns:
+		The best grouping found as a list of groups of example positions.
+		"""
+		randomState = RandomState(randint(0, 2**31 - 1))
+		if solver == 'greedy':
+			solve = solveGroupingGreedy
+		elif solver == 'localSearch':
+			solve = solveGroupingLocalSearch
+		elif solver == 'kMedoids':
+			solve = solveGroupingKMedoids
+		return solve(similarityValues, groupSize, minValue, self.timeLimit, 
+			self.maxIterations, randomState)
+
+	def groupBySimilarityExact(self, exampleSents, similarityValues, groupSize, 
+		minValue):
+		"""
+		Given a list of examples and similarity values between all examples 
+		finds the best possible groupings by dynamic programming over subsets
+		of the examples, or by matching for pairs. Gives the same optimum score
+		as groupBySimilarityBF for up to maxSubsetExamples examples without
+		scoring every possible grouping.
+
+		Args:
+		exampleSents: A list of examples, each example is a dictionary with 
+		keys 'sent' and 'tokens'. 
+		similarityValues: A list of lists of size equal to the number of 
+		examples, holding a similarity scoring between all pairs of examples.
+		groupSize: The number of examples in a group.
+		minValue: Boolean to indicate if the smallest total group score or 
+		largest indicates the best groupings.
+
+		Returns:
+		A list of lists with each inner list being a group and giving the best
+		overall groupings score from the input.
+		"""
+		grouping = solveGroupingExact(similarityValues, groupSize, minValue)
+		return self.formatGrouping(exampleSents, grouping)
 
 	def groupBySimilarityBF(self, exampleSents, similarityValues, groupSize, minValue):
 		"""
 		Given a list of example and similarity values between all example. 
-		This method builds all possible groupings of those examples and then 
-		scores them using th similarity scores. The best possible groupings 
-		can then be found and returned.
+		This method takes all possible groupings of those examples from the 
+		cached partition templates and then scores them using th similarity 
+		scores. The best possible groupings can then be found and returned.
 
 		Args:
 		exampleSents: A list of examples, each example is a dictionary with 
@@ -277,46 +803,12 @@ class GroupedPredictions:
 		A list of lists with each inner list being a group and giving the best
 		overall groupings score frm the input.
 		"""
-		sentToIDMap = {}
-		for i in range(len(exampleSents)):
-			sentToIDMap[tuple(exampleSents[i]['tokens'])] = i
-
-		# Convert tokenized sentences from lists to tuples to be immutable
-		tokenTuples = [tuple(example['tokens']) for example in exampleSents]
-
-		# Create all possible groups for the given group size
-		allGroupings = set()
-		if groupSize == 3:
-			allGroupings = self.createAllGroupsOfSize3(tokenTuples)
-		elif groupSize == 4:
-			allGroupings = self.createAllGroupsOfSize4(tokenTuples)
-
-		# Score all of the possible groupingss
-		scoredGroupings =[]
-		for grouping in allGroupings:	
-			score = 0
-			for group in grouping:
-				score += self.calculateGroupScore(group, similarityValues, 
-					sentToIDMap)
-			scoredGroupings.append({'grouping':grouping, 'score':score})
-
-		# Select the group with the highest or lowest score depending on the 
-		# minValue argument
-		if minValue:
-			selection = scoredGroupings[scoredGroupings.index(min(scoredGroupings, 
-				key=lambda x:x['score']))]['grouping']
-		else:
-			selection = scoredGroupings[scoredGroupings.index(max(scoredGroupings, 
-				key=lambda x:x['score']))]['grouping']
+		# Examples are referred to by position so that two examples with the
+		# same tokens are still treated as separate examples
+		selection = solveGroupingsBatch([similarityValues], groupSize, minValue)[0]
 		
 		# Convert the best result into suitable format
-		result = []
-		for group in selection:
-			newGroup = []
-			for item in group:
-				newGroup.append(exampleSents[sentToIDMap[item]]['sent'])
-			result.append(newGroup)
-		return result			
+		return self.formatGrouping(exampleSents, selection)			
 
 	def createAllGroupsOfSize3(self, tokenTuples):
 		"""
@@ -329,15 +821,7 @@ class GroupedPredictions:
 		Returns:
 		A set of all possible groupings of 3 groups each of size 3.
 		"""
-		allGroups = set()
-		for firstGroup in combinations(tokenTuples, 3):
-			otherSents = [i for i in tokenTuples if i not in firstGroup]
-			for secondGroup in combinations(otherSents, 3):
-				lastGroup = [i for i in otherSents if i not in secondGroup]
-				group = frozenset([firstGroup, secondGroup, tuple(lastGroup)])
-				set(group)
-				allGroups.add(group)
-		return allGroups			
+		return self.createAllGroupings(tokenTuples, 3)
 
 	def createAllGroupsOfSize4(self, tokenTuples):	
 		"""
@@ -350,16 +834,25 @@ class GroupedPredictions:
 		Returns:
 		A set of all possible groupings of 4 groups each of size 4.
 		"""
+		return self.createAllGroupings(tokenTuples, 4)
+
+	def createAllGroupings(self, tokenTuples, groupSize):
+		"""
+		Creates all possible groupings of the given items into groups of
+		groupSize using the cached partition templates.
+
+		Args: 
+		tokenTuples: A list of tuples. Each tuple contains the tokens of one 
+		example sentence. 
+		groupSize: The number of items in a group.
+
+		Returns:
+		A set of all possible groupings, each grouping is a frozenset of tuples.
+		"""
 		allGroups = set()
-		for firstGroup in combinations(tokenTuples, 4):
-			otherSents = [i for i in tokenTuples if i not in firstGroup]
-			for secondGroup in combinations(otherSents, 4):
-				remSents = [i for i in otherSents if i not in secondGroup]
-				for thirdGroup in combinations(remSents, 4):
-					lastGroup = [i for i in remSents if i not in thirdGroup]
-					group = frozenset([firstGroup, secondGroup, thirdGroup, tuple(lastGroup)])
-					set(group)
-					allGroups.add(group)
+		for partition in getPartitionTemplates(len(tokenTuples), groupSize):
+			allGroups.add(frozenset(tuple(tokenTuples[i] for i in group) 
+				for group in partition))
 		return allGroups
 						
 	def calculateGroupScore(self, group, similarityValues, sentToIDMap):
@@ -388,7 +881,34 @@ class GroupedPredictions:
 				totalScore += similarityValues[i][j]
 		return totalScore		 
 
-	def calculateAccuracy(self, results, dataSet):
+	def calculateAccuracyMeasure(self, results, dataSet, accuracyMeasure,
+		senseLabels=None):
+		"""
+		Calculates the accuracy of prediction methods for the grouped evaluation
+		problem with any of the accuracy measures in groupedAccuracyMeasures,
+		from the predicted and actual labels of every word's examples.
+
+		Args:
+		results: The results from one of the prediction methods as a dictionary
+		with words as keys and a list of lists as values. Each inner list is a
+		predicted group of the grou, or a GroupedIndexResults.
+		dataset: The data provided to the prediction method to get the results.
+		accuracyMeasure: 'total', 'pairs', 'ari' or 'nmi'.
+		senseLabels: A dictionary with the same keys holding the sense label of
+		each example, or None if the examples are ordered by sense in groups of
+		equal size.
+
+		Returns:
+		The mean accuracy of the words as a float.
+		"""
+		if isinstance(results, GroupedIndexResults):
+			return float(results.calculateAccuracies(dataSet, senseLabels)
+				[accuracyMeasure].mean())
+		actual, predicted = getGroupedLabels(results, dataSet, senseLabels)
+		return float(calculateGroupedAccuracies(actual, predicted)
+			[accuracyMeasure].mean())
+
+	def calculateAccuracy(self, results, dataSet, senseLabels=None):
 		"""
 		Calculates the accuracy of prediction methods for the grouped evaluation
 		problem. Only counts those predictions that have all groups correct in 
@@ -399,33 +919,17 @@ class GroupedPredictions:
 		with words as keys and a list of lists as values. Each inner list is a
 		predicted group of the grou.
 		dataset: The data provided to the prediction method to get the results.
+		senseLabels: A dictionary with the same keys holding the sense label of
+		each example, or None if the examples are ordered by sense in groups of
+		equal size.
 
 		Returns:
 		The accuracy as a float.
 		"""
-		match = 0
-		for key in dataSet.keys():
-			predictedSenseGroups = results[key]
-			# Examples are in order so split into group size to find groups 
-			orderedExamples = dataSet[key]
-			senseNum = len(predictedSenseGroups)
-			groupSize = len(predictedSenseGroups[0])
-			actualSenseGroups = []
-			for i in range(senseNum):
-				actualSenseGroups.append(orderedExamples[i*groupSize:i*groupSize+groupSize])
-			
-			# Compare actual groups to predicted groups
-			groupMatchCount = 0
-			for predictedGroup in predictedSenseGroups:
-				for actualGroup in actualSenseGroups:
-					actualGroup = [example['sent'] for example in actualGroup]
-					if set(predictedGroup) == set(actualGroup):
-						groupMatchCount += 1
-			if groupMatchCount == senseNum:
-				match += 1					
-		return match / float(len(dataSet))
-
-	def calculateAccuracyPairs(self, results, dataSet):
+		return self.calculateAccuracyMeasure(results, dataSet, 'total',
+			senseLabels)
+
+	def calculateAccuracyPairs(self, results, dataSet, senseLabels=None):
 		"""
 		Calculates the accuracy of prediction methods for the grouped evaluation
 		problem. Counts the number of pairs correct in a group, for eaxmple if
@@ -444,41 +948,15 @@ class GroupedPredictions:
 		with words as keys and a list of lists as values. Each inner list is a
 		predicted group of the grou.
 		dataset: The data provided to the prediction method to get the results.
+		senseLabels: A dictionary with the same keys holding the sense label of
+		each example, or None if the examples are ordered by sense in groups of
+		equal size.
 
 		Returns:
 		The pair accuracy for the predictions as a float.
 		"""
-		match = 0
-		for key in dataSet:
-			predictedSenseGroups = results[key]
-			orderedExamples = dataSet[key]
-			# Examples are in order so split into group size to find groups 
-			senseNum = len(predictedSenseGroups)
-			groupSize = len(predictedSenseGroups[0])
-			actualSenseGroups = []
-			for i in range(senseNum):
-				actualSenseGroups.append(orderedExamples[i*groupSize:i*groupSize+groupSize])
-			
-			# Find all pairs from the predicted and actual groups
-			predictedPairs = []
-			actualPairs = []
-			for predGroup, actualGroup in zip(predictedSenseGroups, actualSenseGroups):
-				actualGroup = [example['sent'] for example in actualGroup]
-				predictedPairs += combinations(predGroup, 2)
-				actualPairs += combinations(actualGroup, 2)
-
-			# Convert pairs to sets so the order does not matter i.e ab == ba
-			predictedPairs = [set(p) for p in predictedPairs]
-			actualPairs = [set(a) for a in actualPairs]
-
-			# Find number of pairs correctly predicted
-			pairMatchCount = 0
-			for predPair in predictedPairs:
-				if predPair in actualPairs:
-					pairMatchCount += 1		
-			match += pairMatchCount / float(len(actualPairs))
-
-		return match / float(len(dataSet)) 
+		return self.calculateAccuracyMeasure(results, dataSet, 'pairs',
+			senseLabels)
 
 def cosineSimilarity(sentence1, sentence2, model):
 	"""
@@ -507,16 +985,17 @@ def word2vecWordSimilarity(sentence1, sentence2, model):
 	Args:
 	sentence1: A sentence as a dictionary with keys 'sent' and 'tokens'.
 	sentence2: A sentence as a dictionary with keys 'sent' and 'tokens'.
-	model: A traind word2vec model.
+	model: A traind word2vec model or EmbeddingBackend.
 
 	Returns:
 	The word2vec word similarity between the two sentences.
 	"""
+	backend = getEmbeddingBackend(model)
 	cumulativeSimilarity = 0
 	for word in sentence1['tokens']:
 		for word2 in sentence2['tokens']:
-			if word in model.vocab and word2 in model.vocab: 
-				cumulativeSimilarity += model.similarity(word2, word)
+			if word in backend and word2 in backend: 
+				cumulativeSimilarity += backend.similarity(word2, word)
 	return cumulativeSimilarity						
 
 def getCrossoverMatchingWordPairs(sentence1, sentence2):
@@ -560,18 +1039,44 @@ def getVectorSum(listToSum, model):
 
 	Args:
 	listToSum: A list of tokens
-	model: A traind word2vec model.
+	model: A traind word2vec model or EmbeddingBackend.
 
 	Returns:
 	A vector representing the sum of all vectors for tokens in the argument list.
 	"""
+	backend = getEmbeddingBackend(model)
 	total = 0
 	for word in listToSum:
-		if word in model.vocab:
-			total += model[word]
+		if word in backend:
+			total += backend[word]
 	if isinstance(total, int):	#instance where there are no words in word2vec thus a vector is not created
 		print(listToSum)
-		vectorLength = len(model['women'])
-		return zeros(vectorLength)
+		return zeros(backend.vectorSize)
 	else: 
 		return total	
+
+def selectBestInSegments(scores, lengths, minValue):
+	"""
+	Finds the position of the best score in each of a run of segments of an
+	array of scores with a few array operations rather than one for each
+	segment. As with argmax and argmin the first of equal best scores is
+	chosen, and the first NaN in a segment holding one.
+
+	Args:
+	scores: An array of the scores of every segment one after another.
+	lengths: A list of the length of each segment, none of which are empty.
+	minValue: Boolean to indicate if the smallest score or largest is best.
+
+	Returns:
+	An array of the position of the best score within each segment.
+	"""
+	scores = asarray(scores)
+	if not len(lengths):
+		return zeros(0, dtype=int)
+	starts = cumsum([0] + list(lengths[:-1]))
+	reduceScores = minimum if minValue else maximum
+	# The minimum and maximum ufuncs propagate NaN, as argmin and argmax do
+	best = repeat(reduceScores.reduceat(scores, starts), lengths)
+	isBest = where(isnan(best), isnan(scores), scores == best)
+	positions = where(isBest, arange(len(scores)), len(scores))
+	return minimum.reduceat(positions, starts) - starts
@@ -1,3 +1,24 @@
+from groupingSolvers import maxSubsetExamples
+from labelAccuracy import groupedAccuracyMeasures
+from predictionMethods import getMethodNames
+
+# Keys that may be left out of a configuration file and the value used when 
+# they are.
+optionalDefaults = {'groupingSolver':'bruteForce', 'solverTimeLimit':'0', 
+	'solverIterations':'20', 'compareToExact':'False', 'unequalGroups':'False',
+	'maxExamp':'0', 'internTokens':'False', 'embeddingStore':'',
+	'word2vecSidecar':'', 'embeddingBackend':'gensim', 
+	'embeddingPrecision':'float32', 'comparePrecision':'False',
+	'similarityCache':'False', 'retrieval':'False', 'retrievalK':'1,5,10',
+	'retrievalIndex':'exact', 'lshBits':'8', 'lshTables':'16',
+	'randomBaseline':'sampled', 'exhaustiveOFM':'False', 'workers':'1',
+	'shardWords':'False'}
+
+# Grouping solvers that can group any number of senses and examples
+anySizeSolvers = ['exact', 'subsetDP', 'greedy', 'localSearch', 'kMedoids']
+# Grouping solvers that can find groups of unequal size
+unequalSizeSolvers = ['subsetDP', 'greedy', 'localSearch', 'kMedoids']
+
 
 def validateConfigFile(configFileParser):
 	"""
@@ -18,8 +39,30 @@ def validateConfigFile(configFileParser):
 	
 	baseLineMethodValid = validateBaseLineMethod(configFileParser)
 	posValid = validatePos(configFileParser)
+	groupingSolverValid = validateGroupingSolver(configFileParser)
+	if not baseLineMethodValid or not posValid or not groupingSolverValid:
+		return False
+
+	if not validateEmbeddingBackend(configFileParser):
+		return False
+
+	if not validateRandomBaseline(configFileParser):
+		return False
+
 	validNumOfSensesAndExamples = validateSenseAndExampNum(configFileParser)
-	if not baseLineMethodValid or not posValid or not validNumOfSensesAndExamples:
+	if not validNumOfSensesAndExamples:
+		return False
+
+	if not validateUnequalGroups(configFileParser):
+		return False
+
+	if not validateRetrieval(configFileParser):
+		return False
+
+	if not validateExhaustiveOFM(configFileParser):
+		return False
+
+	if not validateWorkers(configFileParser):
 		return False
 
 	return True	
@@ -38,7 +81,12 @@ def validateBoolean(parser):
 	"""
 	allValid = True
 	boolKeys = ['grouped', 'rmStopwords', 'rmPunct', 'lemmatize']
-	for key in boolKeys:
+	optionalBoolKeys = ['internTokens', 'comparePrecision', 'similarityCache',
+		'retrieval', 'exhaustiveOFM', 'shardWords']
+	for key in boolKeys + optionalBoolKeys:
+		if key in optionalBoolKeys and \
+			not parser.has_option('evaluation_params', key):
+			continue
 		try:
 			parser.getboolean('evaluation_params', key)
 		except ValueError as err:
@@ -71,8 +119,10 @@ def validateInt(parser):
 def validateBaseLineMethod(parser):
 	"""
 	Checks that the base line method seclected is a valid selection based
-	on the evaluation problem selected. Also checks if grouped evaluation
-	problem is selected that a suitable accuracy measure has been selected.
+	on the evaluation problem selected, the valid methods being those 
+	registered in predictionMethods for the problem. Also checks if grouped 
+	evaluation problem is selected that a suitable accuracy measure has been
+	selected.
 
 	Args:
 	parser: Is a ConfigParser that has read the config file to
@@ -83,30 +133,28 @@ def validateBaseLineMethod(parser):
 
 	"""
 	grouped = parser.getboolean('evaluation_params', 'grouped')
-	if grouped:
-		validBaseLines = ['random', 'wordCrossover', 'word2vec']
-		accuracyMeasures = ['total', 'pairs']
-	else:
-		validBaseLines = ['random', 'wordCrossover', 'word2vecCosine', 'word2vecWordSim']
-
+	validBaseLines = getMethodNames(grouped)
 	baseLineMethod = parser.get('evaluation_params', 'baseLineMethod')
 	if grouped:
 		if baseLineMethod not in validBaseLines:
 			print(baseLineMethod + ' is not a recognised grouped prediction ' + 
-			'method. Valid methods are \'random\'  \'wordCrossover\' \'word2vec\'.')
+			'method. Valid methods are ' + 
+			' '.join('\'{}\''.format(name) for name in validBaseLines) + '.')
 			return False
 
 		groupedAccuracyMeasure = parser.get('evaluation_params', 
 			'groupedAccuracyMeasure')
-		if 	groupedAccuracyMeasure not in accuracyMeasures:
+		if 	groupedAccuracyMeasure not in groupedAccuracyMeasures:
 			print(groupedAccuracyMeasure + ' is not a recognised accuracy measure '
-			+ 'for grouped data. Valid measures are \'total\' and \'pairs\'.')
+			+ 'for grouped data. Valid measures are ' + 
+			' '.join('\'{}\''.format(name) for name in groupedAccuracyMeasures)
+			+ '.')
 			return False	
 
 	if not grouped and baseLineMethod not in validBaseLines:
 		print(baseLineMethod + ' is not a recognised select one sentence from '
-			+ 'many prediction method. Valid methods are \'random\' ' + 
-			' \'wordCrossover\' \'word2vecCosine\' \'word2vecWordSim\'.')
+			+ 'many prediction method. Valid methods are ' + 
+			' '.join('\'{}\''.format(name) for name in validBaseLines) + '.')
 		return False
 	return True
 
@@ -130,11 +178,145 @@ def validatePos(parser):
 		return False
 	return True
 
+def getOptional(parser, key):
+	"""
+	Gets the value of a key that may be left out of the configuration file.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file.
+	key: The optional key to get the value of.
+
+	Returns:
+	The value for the key as a string or the default from optionalDefaults if
+	the key is not set.
+	"""
+	if parser.has_option('evaluation_params', key):
+		return parser.get('evaluation_params', key)
+	return optionalDefaults[key]
+
+def validateEmbeddingBackend(parser):
+	"""
+	Checks that the embedding backend and precision selected are valid 
+	selections.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if embeddingBackend is 'gensim', 'mmap' or 'matrix' and 
+	embeddingPrecision is 'float32', 'float16' or 'int8' else False.
+	"""
+	validBackends = ['gensim', 'mmap', 'matrix']
+	backend = getOptional(parser, 'embeddingBackend')
+	if backend not in validBackends:
+		print(backend + ' is not a recognised embedding backend. Valid options '
+		+ 'are \'gensim\' \'mmap\' \'matrix\'.')
+		return False
+	validPrecisions = ['float32', 'float16', 'int8']
+	precision = getOptional(parser, 'embeddingPrecision')
+	if precision not in validPrecisions:
+		print(precision + ' is not a recognised embedding precision. Valid '
+		+ 'options are \'float32\' \'float16\' \'int8\'.')
+		return False
+	return True
+
+def validateRandomBaseline(parser):
+	"""
+	Checks that the way the random prediction method's accuracy is found is a
+	valid selection.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if randomBaseline is 'sampled', or 'analytic' and the accuracy
+	measure has a closed form, else False.
+	"""
+	randomBaseline = getOptional(parser, 'randomBaseline')
+	if randomBaseline not in ['sampled', 'analytic']:
+		print(randomBaseline + ' is not a recognised random baseline. Valid ' +
+			'options are \'sampled\' \'analytic\'.')
+		return False
+	if randomBaseline == 'analytic' and \
+		parser.getboolean('evaluation_params', 'grouped') and \
+		parser.get('evaluation_params', 'groupedAccuracyMeasure') not in \
+		['total', 'pairs']:
+		print('The analytic random baseline needs the \'total\' or \'pairs\' ' +
+			'accuracy measure.')
+		return False
+	return True
+
+def validateGroupingSolver(parser):
+	"""
+	Checks that the grouping solver selected is a valid selection.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if groupingSolver is 'bruteForce', 'exact', 'batch', 'subsetDP', 
+	'matching', 'greedy', 'localSearch' or 'kMedoids' and its budget and 
+	comparison keys are valid else False.
+	"""
+	validSolvers = ['bruteForce', 'exact', 'batch', 'subsetDP', 'matching', 
+		'greedy', 'localSearch', 'kMedoids']
+	solver = getOptional(parser, 'groupingSolver')
+	if solver not in validSolvers:
+		print(solver + ' is not a recognised grouping solver. Valid options are '
+		+ '\'bruteForce\' \'exact\' \'batch\' \'subsetDP\' \'matching\' ' + 
+		'\'greedy\' \'localSearch\' \'kMedoids\'.')
+		return False
+	return validateSolverBudget(parser)
+
+def validateSolverBudget(parser):
+	"""
+	Checks that the time limit and number of iterations given to the heuristic
+	grouping solvers are not negative and that compareToExact is a boolean.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if solverTimeLimit, solverIterations and compareToExact are valid 
+	else False.
+	"""
+	try:
+		timeLimit = float(getOptional(parser, 'solverTimeLimit'))
+	except ValueError as err:
+		print('The value for key solverTimeLimit is not a valid number.')
+		return False
+	try:
+		iterations = int(getOptional(parser, 'solverIterations'))
+	except ValueError as err:
+		print('The value for key solverIterations is not a valid integer.')
+		return False
+	if timeLimit < 0 or iterations < 0:
+		print('solverTimeLimit and solverIterations must not be negative.')
+		return False
+	if parser.has_option('evaluation_params', 'compareToExact'):
+		try:
+			parser.getboolean('evaluation_params', 'compareToExact')
+		except ValueError as err:
+			print('The value for key compareToExact is not a valid boolean.')
+			return False
+	return True
+
 def validateSenseAndExampNum(parser):
 	"""
 	Checks that the number of examples is at least 2 and the number of senses 
-	is at least 3. If a grouped evaluation is selected the number of 
-	senses is either 3 or 4 and the number of examples matches.
+	is at least 3. If a grouped evaluation is selected with the brute force 
+	or batch solver the number of senses is either 3 or 4 and the number of 
+	examples matches, or there are at least 2 senses of 2 examples as pairs
+	are found by matching. With the exact or a heuristic solver any number of senses
+	and examples of at least 2 can be grouped, except that the exact solver
+	can only group more than 2 examples per sense for up to maxSubsetExamples
+	examples in total. The subsetDP solver groups words with more examples 
+	than that heuristically. The matching solver groups any number of senses 
+	of at least 2 with exactly 2 examples.
 
 	Args:
 	parser: Is a ConfigParser that has read the config file to
@@ -147,11 +329,30 @@ def validateSenseAndExampNum(parser):
 	senseNum = parser.getint('evaluation_params', 'numOfSenses') 
 	exampNum = parser.getint('evaluation_params', 'numOfExamp')
 	grouped = parser.getboolean('evaluation_params', 'grouped')
-	if grouped:
+	solver = getOptional(parser, 'groupingSolver')
+	if grouped and solver == 'matching':
+		if senseNum < 2 or exampNum != 2:
+			print('For grouped evaluation problem with the matching solver ' +
+				'example number must be 2 and sense number at least 2.')
+			return False
+	elif grouped and solver in anySizeSolvers:
+		if senseNum < 2 or exampNum < 2:
+			print('For grouped evaluation problem with the exact or a heuristic ' +
+				'solver sense number and example number must both be at least 2.')
+			return False
+		if solver == 'exact' and exampNum != 2 and \
+			senseNum * exampNum > maxSubsetExamples:
+			print('For grouped evaluation problem with the exact solver sense ' +
+				'number times example number must be at most {} unless example '
+				.format(maxSubsetExamples) + 'number is 2.')
+			return False
+	elif grouped:
 		if not (senseNum == 3 and exampNum == 3) and \
-			not (senseNum == 4 and exampNum == 4):
+			not (senseNum == 4 and exampNum == 4) and \
+			not (senseNum >= 2 and exampNum == 2):
 			print('For grouped evaluation problem sense number and example ' + 
-				'number must both be 3 or both be 4.')
+				'number must both be 3 or both be 4, or example number must be ' +
+				'2 and sense number at least 2.')
 			return False
 	else:
 		if exampNum < 2:
@@ -160,5 +361,156 @@ def validateSenseAndExampNum(parser):
 		if senseNum < 3:
 			print('The minimum number of senses is 3.')
 			return False	
-	return True		
+	return True
+
+def validateUnequalGroups(parser):
+	"""
+	Checks the keys for a grouped evaluation with unequal sense group sizes.
+	When unequalGroups is True senses need at least numOfExamp examples and up
+	to maxExamp examples are selected from each, so maxExamp must be at least 
+	numOfExamp and the groups can only be found by the 'subsetDP' solver or a
+	heuristic solver. Any numOfSenses and maxExamp can be grouped as subsetDP
+	groups words with more than maxSubsetExamples examples heuristically.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if unequalGroups is a boolean and, when it is True, maxExamp and the
+	grouping solver are valid else False.
+	"""
+	if not parser.has_option('evaluation_params', 'unequalGroups'):
+		return True
+	try:
+		unequalGroups = parser.getboolean('evaluation_params', 'unequalGroups')
+	except ValueError as err:
+		print('The value for key unequalGroups is not a valid boolean.')
+		return False
+	if not unequalGroups:
+		return True
+	try:
+		maxExamp = int(getOptional(parser, 'maxExamp'))
+	except ValueError as err:
+		print('The value for key maxExamp is not a valid integer.')
+		return False
+	if maxExamp < parser.getint('evaluation_params', 'numOfExamp'):
+		print('With unequalGroups maxExamp must be at least numOfExamp.')
+		return False
+	if parser.get('evaluation_params', 'baseLineMethod') != 'random' and \
+		getOptional(parser, 'groupingSolver') not in unequalSizeSolvers:
+		print('With unequalGroups the grouping solver must be \'subsetDP\', ' +
+			'\'greedy\', \'localSearch\' or \'kMedoids\'.')
+		return False
+	return True
+
+def getRetrievalKs(parser):
+	"""
+	Gives the values of k recall is measured at in the retrieval evaluation.
 
+	Args:
+	parser: Is a ConfigParser that has read the config file.
+
+	Returns:
+	A sorted list of the integers in the comma separated retrievalK value.
+
+	Raises:
+	ValueError: If a value is not an integer.
+	"""
+	return sorted(int(k) for k in getOptional(parser, 'retrievalK').split(','))
+
+def validateRetrieval(parser):
+	"""
+	Checks the keys for the retrieval evaluation, which ranks every example of
+	the dictionary for a query example of each word. It is a variant of the 
+	select one sentence from many options problem that ranks by the cosine of
+	the sentence vectors, so grouped must be False and baseLineMethod 
+	'word2vecCosine'.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if retrieval is False, or it is True and the retrieval keys are 
+	valid, else False.
+	"""
+	if not parser.has_option('evaluation_params', 'retrieval') or \
+		not parser.getboolean('evaluation_params', 'retrieval'):
+		return True
+	if parser.getboolean('evaluation_params', 'grouped') or \
+		parser.get('evaluation_params', 'baseLineMethod') != 'word2vecCosine':
+		print('The retrieval evaluation needs grouped to be False and the ' + 
+			'\'word2vecCosine\' prediction method.')
+		return False
+	try:
+		ks = getRetrievalKs(parser)
+	except ValueError as err:
+		print('The value for key retrievalK is not a comma separated list of ' +
+			'integers.')
+		return False
+	if ks[0] < 1:
+		print('The values of retrievalK must be at least 1.')
+		return False
+	index = getOptional(parser, 'retrievalIndex')
+	if index not in ['exact', 'lsh']:
+		print(index + ' is not a recognised retrieval index. Valid options are ' 
+			+ '\'exact\' \'lsh\'.')
+		return False
+	try:
+		bits = int(getOptional(parser, 'lshBits'))
+		tables = int(getOptional(parser, 'lshTables'))
+	except ValueError as err:
+		print('The values for keys lshBits and lshTables must be integers.')
+		return False
+	if not 1 <= bits <= 62 or tables < 1:
+		print('lshBits must be between 1 and 62 and lshTables at least 1.')
+		return False
+	return True
+
+def validateExhaustiveOFM(parser):
+	"""
+	Checks that the exhaustive evaluation, which scores every select one 
+	sentence from many options problem of each word instead of sampling them,
+	is only selected for that problem.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if exhaustiveOFM is False, or it is True with grouped and retrieval
+	False, else False.
+	"""
+	if not parser.has_option('evaluation_params', 'exhaustiveOFM') or \
+		not parser.getboolean('evaluation_params', 'exhaustiveOFM'):
+		return True
+	if parser.getboolean('evaluation_params', 'grouped') or \
+		(parser.has_option('evaluation_params', 'retrieval') and
+		parser.getboolean('evaluation_params', 'retrieval')):
+		print('The exhaustive evaluation needs grouped and retrieval to be ' +
+			'False.')
+		return False
+	return True
+
+def validateWorkers(parser):
+	"""
+	Checks that the number of processes the test iterations are run in is a
+	positive integer.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file to
+	be validated.
+
+	Returns:
+	True if workers is an integer of at least 1 else False.
+	"""
+	try:
+		workers = int(getOptional(parser, 'workers'))
+	except ValueError as err:
+		print('The value for key workers is not a valid integer.')
+		return False
+	if workers < 1:
+		print('workers must be at least 1.')
+		return False
+	return True
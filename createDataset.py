@@ -4,6 +4,9 @@ from oxford import OxfordAPIAccess
 from semcor import SemcorWordExtraction
 from collins import CollinsAPIAccess
 from wordLists import getWordList
+from deduplicateDataset import deduplicateDataset
+from deduplicateDataset import getReportSummary
+from deduplicateDataset import saveDuplicateReport
 import loadAndSave as sl
 
 def main(argv):
@@ -12,7 +15,9 @@ def main(argv):
 
 	Args:
 	argsv: List of strings with the dictionary to create the dataset from 
-	in postion 0 and the name to save the dataset to in position 1. 
+	in postion 0 and the name to save the dataset to in position 1. If 
+	position 2 is 'dedup' near duplicate examples are removed before saving
+	and a report of them is saved beside the dataset.
 	"""
 	dictionary = argv[0] 
 	fileNameToSaveTo = 'dictionaryData/' + argv[1]
@@ -37,6 +42,11 @@ def main(argv):
 			wordResult = reader.makeRequestForWord(word)
 			if wordResult is not None:
 				dataset[word] = wordResult
+
+	if len(argv) > 2 and argv[2] == 'dedup':
+		dataset, report = deduplicateDataset(dataset)
+		saveDuplicateReport(fileNameToSaveTo + 'Duplicates.txt', report)
+		print(getReportSummary(report))
 	
 	sl.saveDataToFile(fileNameToSaveTo, dataset)
 
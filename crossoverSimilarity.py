@@ -0,0 +1,222 @@
+from numpy import arange
+from numpy import asarray
+from numpy import concatenate
+from numpy import cumsum
+from numpy import int32
+from numpy import int64
+from numpy import ones
+from numpy import repeat
+from numpy import unique
+from numpy import zeros
+from scipy.sparse import csr_matrix
+from tokenInterning import isInterned
+
+def createCountMatrix(tokenLists, vocabulary=None):
+	"""
+	Creates a sparse bag of words matrix with a row for each list of tokens
+	holding the number of times each token occurs in it.
+
+	Args:
+	tokenLists: A list of lists of tokens, or of arrays of token IDs from a 
+	TokenVocabulary whose IDs are then used as the column numbers.
+	vocabulary: A dictionary mapping tokens to column numbers that is added to
+	as new tokens are found, or None to start a new one. Matrices that are to
+	be multiplied together must share a vocabulary. For token IDs the
+	TokenVocabulary they came from or None.
+
+	Returns:
+	A tuple of the sparse count matrix and the vocabulary.
+	"""
+	if isInterned(tokenLists):
+		columnNum = len(vocabulary) if vocabulary is not None else 0
+		return createCountMatrixFromIDs(tokenLists, columnNum), vocabulary
+	if vocabulary is None:
+		vocabulary = {}
+	rows = []
+	columns = []
+	for row, tokens in enumerate(tokenLists):
+		for token in tokens:
+			rows.append(row)
+			columns.append(vocabulary.setdefault(token, len(vocabulary)))
+	# Duplicate entries are summed giving the count of each token
+	counts = csr_matrix((ones(len(rows), dtype=int32), (rows, columns)),
+		shape=(len(tokenLists), max(len(vocabulary), 1)))
+	counts.sum_duplicates()
+	return counts, vocabulary
+
+def createCountMatrixFromIDs(tokenIDArrays, columnNum=0):
+	"""
+	Creates a sparse bag of words matrix from arrays of token IDs, using each
+	ID as a column number so no tokens need to be looked up.
+
+	Args:
+	tokenIDArrays: A list of integer arrays of token IDs.
+	columnNum: The least number of columns the matrix should have.
+
+	Returns:
+	The sparse count matrix.
+	"""
+	lengths = [len(tokenIDs) for tokenIDs in tokenIDArrays]
+	rows = repeat(arange(len(tokenIDArrays)), lengths)
+	columns = concatenate(tokenIDArrays).astype(int64)
+	if len(columns):
+		columnNum = max(columnNum, columns.max() + 1)
+	counts = csr_matrix((ones(len(rows), dtype=int32), (rows, columns)),
+		shape=(len(tokenIDArrays), max(columnNum, 1)))
+	counts.sum_duplicates()
+	return counts
+
+def resizeColumns(counts, columnNum):
+	"""
+	Gives a count matrix created before its vocabulary grew the columns of
+	the larger vocabulary, all tokens added since being absent.
+	"""
+	return csr_matrix((counts.data, counts.indices, counts.indptr),
+		shape=(counts.shape[0], columnNum))
+
+def getIncidenceMatrix(counts):
+	"""
+	Converts a count matrix to a matrix holding 1 wherever a token occurs.
+	"""
+	incidence = counts.copy()
+	incidence.data = ones(len(incidence.data), dtype=int32)
+	return incidence
+
+def crossoverMatrix(counts1, counts2, pairs=False):
+	"""
+	Scores every row of one count matrix against every row of another using
+	word crossover with two sparse matrix products. Gives exactly the values of
+	getCrossoverMatchingWordPairs when pairs is True, as the number of
+	matching token pairs is the dot product of the token counts, or otherwise
+	of getCrossoverIntersect, as the size of the intersect is the dot product
+	of the token incidences and the size of the union follows from it.
+
+	Args:
+	counts1: A sparse count matrix as returned by createCountMatrix.
+	counts2: A sparse count matrix sharing counts1's vocabulary.
+	pairs: Boolean indicating if the scoring should be done by counting
+	matching word pairs (if True) or by set intersect on set union.
+
+	Returns:
+	An array with entry [i][j] holding the score of row i of counts1 against
+	row j of counts2.
+	"""
+	columnNum = max(counts1.shape[1], counts2.shape[1])
+	counts1 = resizeColumns(counts1, columnNum)
+	counts2 = resizeColumns(counts2, columnNum)
+	if pairs:
+		return (counts1 * counts2.T).toarray()
+	incidence1 = getIncidenceMatrix(counts1)
+	incidence2 = getIncidenceMatrix(counts2)
+	intersect = (incidence1 * incidence2.T).toarray()
+	sizes1 = asarray(incidence1.sum(axis=1)).reshape(-1, 1)
+	sizes2 = asarray(incidence2.sum(axis=1)).reshape(1, -1)
+	return intersectOnUnion(intersect, sizes1 + sizes2 - intersect)
+
+def crossoverRows(counts1, counts2, pairs=False):
+	"""
+	Scores each row of one count matrix against the same row of another using
+	word crossover, giving the same values as crossoverMatrix's diagonal
+	without scoring any other pairs of rows.
+
+	Args:
+	counts1: A sparse count matrix as returned by createCountMatrix.
+	counts2: A sparse count matrix with the same number of rows sharing
+	counts1's vocabulary.
+	pairs: Boolean indicating if the scoring should be done by counting
+	matching word pairs (if True) or by set intersect on set union.
+
+	Returns:
+	An array with entry i holding the score of row i of counts1 against row i
+	of counts2.
+	"""
+	columnNum = max(counts1.shape[1], counts2.shape[1])
+	counts1 = resizeColumns(counts1, columnNum)
+	counts2 = resizeColumns(counts2, columnNum)
+	if pairs:
+		return asarray(counts1.multiply(counts2).sum(axis=1)).ravel()
+	incidence1 = getIncidenceMatrix(counts1)
+	incidence2 = getIncidenceMatrix(counts2)
+	intersect = asarray(incidence1.multiply(incidence2).sum(axis=1)).ravel()
+	union = asarray(incidence1.sum(axis=1)).ravel() + \
+		asarray(incidence2.sum(axis=1)).ravel() - intersect
+	return intersectOnUnion(intersect, union)
+
+def intersectOnUnion(intersect, union):
+	"""
+	Divides intersect sizes by union sizes. As with getCrossoverIntersect two
+	sentences without tokens can not be scored.
+	"""
+	if (union == 0).any():
+		raise ZeroDivisionError('Can not score sentences without tokens.')
+	return intersect / union.astype(float)
+
+def crossoverMatricesByKey(tokenListsByKey, pairs=False):
+	"""
+	Scores every pair of token lists for each word using word crossover with a
+	single sparse matrix product for all words. The columns of the count 
+	matrix are tokens of a particular word so lists of different words never
+	share a column, the product only holds pairs from the same word and there
+	is no need to loop over the words.
+
+	Args:
+	tokenListsByKey: A dictionary with words as keys and a list of lists of 
+	tokens as values.
+	pairs: Boolean indicating if the scoring should be done by counting
+	matching word pairs (if True) or by set intersect on set union.
+
+	Returns:
+	A dictionary with the same keys holding an array of the scores between
+	all pairs of the word's token lists, as crossoverMatrix would give.
+	"""
+	keys = list(tokenListsByKey.keys())
+	if not keys:
+		return {}
+	lengths = asarray([len(tokenListsByKey[key]) for key in keys], dtype=int64)
+	tokenLists = [tokens for key in keys for tokens in tokenListsByKey[key]]
+	if isInterned(tokenLists):
+		# Number the distinct (word, token ID) pairs to give the columns
+		tokenIDs = concatenate(tokenLists).astype(int64)
+		tokenWords = repeat(repeat(arange(len(keys)), lengths), 
+			[len(tokens) for tokens in tokenLists])
+		idNum = tokenIDs.max() + 1 if len(tokenIDs) else 1
+		wordTokens, columns = unique(tokenWords * idNum + tokenIDs, 
+			return_inverse=True)
+		columnIDs = []
+		start = 0
+		for tokens in tokenLists:
+			columnIDs.append(columns[start:start + len(tokens)])
+			start += len(tokens)
+		counts = createCountMatrixFromIDs(columnIDs)
+	else:
+		counts, vocabulary = createCountMatrix([[(wordNum, token) 
+			for token in tokens] for wordNum, key in enumerate(keys) 
+			for tokens in tokenListsByKey[key]])
+	if not pairs:
+		counts = getIncidenceMatrix(counts)
+	products = (counts * counts.T).tocoo()
+
+	# Each word's scores are a block of a flat array, row by row
+	starts = concatenate([[0], cumsum(lengths)[:-1]])
+	blockStarts = concatenate([[0], cumsum(lengths ** 2)[:-1]])
+	wordOfRow = repeat(arange(len(keys)), lengths)
+	scores = zeros(int((lengths ** 2).sum()), dtype=products.dtype)
+	words = wordOfRow[products.row]
+	scores[blockStarts[words] + (products.row - starts[words]) * lengths[words]
+		+ products.col - starts[words]] = products.data
+	if not pairs:
+		blockOfScore = repeat(arange(len(keys)), lengths ** 2)
+		positions = arange(len(scores)) - blockStarts[blockOfScore]
+		rows = starts[blockOfScore] + positions // lengths[blockOfScore]
+		columns = starts[blockOfScore] + positions % lengths[blockOfScore]
+		tokenNums = asarray(counts.sum(axis=1)).ravel()
+		scores = intersectOnUnion(scores, 
+			tokenNums[rows] + tokenNums[columns] - scores)
+
+	similarityByKey = {}
+	for wordNum, key in enumerate(keys):
+		start = blockStarts[wordNum]
+		length = lengths[wordNum]
+		similarityByKey[key] = scores[start:start + length ** 2].reshape(length, 
+			length)
+	return similarityByKey
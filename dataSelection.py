@@ -5,6 +5,7 @@ from nltk.stem.wordnet import WordNetLemmatizer
 from nltk import word_tokenize
 from nltk import pos_tag
 from nltk.corpus import wordnet
+from tokenInterning import TokenVocabulary
 
 def selectPoS(dataToAudit, PoS):
 	"""
@@ -120,6 +121,37 @@ def tokenizeAndLemmatizeExamples(dataToTokenize, lemmatize = False):
 		dictToReturn[key] = senses	
 	return dictToReturn
 
+def internTokens(dataToIntern, vocabulary=None):
+	"""
+	Replaces the tokens of each example with an int32 array of token IDs so 
+	the prediction methods can compare examples without hashing strings.
+
+	Args:
+	dataToIntern: A dictionary with words as keys and as values a list of 
+	senses which are dictionarys which must have a key 'examples' that as a 
+	value is a list of dictionaries with keys 'sent' and 'tokens'.
+	vocabulary: The TokenVocabulary to add the tokens to or None to start a 
+	new one.
+
+	Returns:
+	A tuple of a new dictionary with the same data as the dictionary given as
+	an argument but with each example's tokens as an array of token IDs, and 
+	the TokenVocabulary holding the token of each ID.
+	"""
+	if vocabulary is None:
+		vocabulary = TokenVocabulary()
+	dictToReturn = {}
+	for key in dataToIntern:
+		senses = []
+		for sense in dataToIntern[key]:
+			sense = dict(sense)
+			sense['examples'] = [{'sent':example['sent'], 
+				'tokens':vocabulary.intern(example['tokens'])} 
+				for example in sense['examples']]
+			senses.append(sense)
+		dictToReturn[key] = senses
+	return dictToReturn, vocabulary
+
 def convertPoSTag(originalTag):
     """
     Converts part of speach tags to WordNet tags.
@@ -212,17 +244,21 @@ def selectExamplesAndSenses(dataToSelectFrom, numSenses, numExamp):
 		
 	Returns:
 	A dictionary with the same keys as the one given as an argument with as values
-	numSenses senses as a list with each of the senses having numExamp examples.
+	numSenses senses as a list with each of the senses having numExamp examples,
+	or all of its examples if it has fewer. The senses given as an argument keep
+	all of their examples.
 	"""
 	selected = {}
 	for key in dataToSelectFrom:
 		senses = dataToSelectFrom[key]
 		shuffle(senses)
-		selectedSenses = senses[:numSenses]
-		for sense in selectedSenses:
+		selectedSenses = []
+		for sense in senses[:numSenses]:
 			examples = sense['examples']
 			shuffle(examples)
+			sense = dict(sense)
 			sense['examples'] = examples[:numExamp]
+			selectedSenses.append(sense)
 		selected[key] = selectedSenses
 	return selected
 
@@ -247,6 +283,43 @@ def createGroupedTestData(dataToGroup):
 		groupedData[key] = group
 	return groupedData			
 
+def createGroupedTestLabels(dataToGroup):
+	"""
+	Creates the sense label of every example in the data created by 
+	createGroupedTestData.
+
+	Args:
+	dataToGroup: A dictionary with words as keys and as values a list of 
+	senses which are dictionarys which must have a key 'examples'.  
+		
+	Returns:
+	A dictionary with the same keys as the dictionary given as an argument
+	which as values has a list with the position of the sense each example 
+	belongs to, in the same order as the examples from createGroupedTestData.
+	"""
+	labels = {}
+	for key in dataToGroup:
+		senseLabels = []
+		for senseNum, sense in enumerate(dataToGroup[key]):
+			senseLabels += [senseNum] * len(sense['examples'])
+		labels[key] = senseLabels
+	return labels
+
+def getGroupSizes(dataToGroup):
+	"""
+	Finds the number of examples in each sense of each word.
+
+	Args:
+	dataToGroup: A dictionary with words as keys and as values a list of 
+	senses which are dictionarys which must have a key 'examples'.  
+		
+	Returns:
+	A dictionary with the same keys as the dictionary given as an argument
+	which as values has a list of the number of examples in each sense.
+	"""
+	return dict((key, [len(sense['examples']) for sense in dataToGroup[key]])
+		for key in dataToGroup)
+
 def createOFMData(dataToSelectFrom):
 	"""
 	Create data to perform selecting one from many options evaluation. 
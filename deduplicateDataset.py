@@ -0,0 +1,323 @@
+from sys import argv
+from sys import exit
+from re import sub
+from zlib import crc32
+from numpy import arange
+from numpy import asarray
+from numpy import concatenate
+from numpy import full
+from numpy import int64
+from numpy import lexsort
+from numpy import minimum
+from numpy import uint64
+from numpy.random import RandomState
+import loadAndSave as sl
+
+# The prime the shingle hashes are permuted modulo
+hashPrime = 2 ** 31 - 1
+
+class MinHasher:
+	"""
+	Gives MinHash signatures of sets of shingles. Each of numHashes random
+	hash functions permutes the shingle hashes and a signature holds the
+	smallest permuted hash of each, so the fraction of positions at which two
+	signatures agree estimates the Jaccard similarity of their sets.
+	"""
+
+	def __init__(self, numHashes=128, seed=0, blockSentences=256):
+		"""
+		Args:
+		numHashes: The number of hash functions, the length of a signature.
+		seed: The seed of the random hash functions.
+		blockSentences: The number of sentences hashed at a time.
+		"""
+		randomState = RandomState(seed)
+		self.multipliers = randomState.randint(1, hashPrime, numHashes)\
+			.astype(int64).reshape(-1, 1)
+		self.increments = randomState.randint(0, hashPrime, numHashes)\
+			.astype(int64).reshape(-1, 1)
+		self.numHashes = numHashes
+		self.blockSentences = blockSentences
+
+	def getSignatures(self, shingleSets):
+		"""
+		Gives the signature of each set of shingle hashes.
+
+		Args:
+		shingleSets: A list of sets of shingle hashes as given by getShingles.
+
+		Returns:
+		A matrix with the signature of each set as a row. Empty sets have a
+		row of hashPrime, larger than any hash.
+		"""
+		signatures = full((len(shingleSets), self.numHashes), hashPrime,
+			dtype=int64)
+		rows = [row for row, shingles in enumerate(shingleSets) if shingles]
+		for start in range(0, len(rows), self.blockSentences):
+			blockRows = rows[start:start + self.blockSentences]
+			shingles = [asarray(sorted(shingleSets[row]), dtype=int64)
+				for row in blockRows]
+			offsets = concatenate([[0], [len(rowShingles)
+				for rowShingles in shingles]]).cumsum()[:-1]
+			hashes = (self.multipliers * (concatenate(shingles) % hashPrime) +
+				self.increments) % hashPrime
+			signatures[blockRows] = minimum.reduceat(hashes, offsets, axis=1).T
+		return signatures
+
+def normaliseSentence(sentence):
+	"""
+	Lower cases a sentence and replaces each run of characters that are not
+	letters or digits with a single space, so sentences differing only in
+	case, punctuation or spacing are the same.
+	"""
+	if isinstance(sentence, str):
+		sentence = sentence.decode('utf-8', 'replace')
+	return sub(r'(?u)[\W_]+', ' ', sentence.lower()).strip()
+
+def getShingles(sentence, shingleSize=5):
+	"""
+	Gives the hashes of the overlapping runs of shingleSize characters of a
+	normalised sentence.
+
+	Args:
+	sentence: A sentence as a string.
+	shingleSize: The number of characters in each shingle.
+
+	Returns:
+	A set of the shingle hashes, holding the hash of the whole sentence if it
+	is shorter than shingleSize or empty if the sentence has no letters or
+	digits.
+	"""
+	text = normaliseSentence(sentence).encode('utf-8')
+	if not text:
+		return set()
+	return set(crc32(text[start:start + shingleSize]) & 0xffffffff
+		for start in range(max(len(text) - shingleSize + 1, 1)))
+
+def getJaccard(shingles1, shingles2):
+	"""
+	Gives the Jaccard similarity, size of intersect on size of union, of two
+	sets of shingles.
+	"""
+	return len(shingles1 & shingles2) / float(len(shingles1 | shingles2))
+
+def findCandidatePairs(signatures, numBands, maxBucket=20):
+	"""
+	Finds the pairs of signatures that agree on every position of at least
+	one band of rows, splitting the signatures into numBands bands. Each band
+	is sorted so signatures in the same bucket are next to each other, which
+	takes time close to linear in the number of signatures rather than
+	comparing all pairs.
+
+	Args:
+	signatures: A matrix of MinHash signatures.
+	numBands: The number of bands, which must divide the signature length.
+	maxBucket: The largest bucket all pairs of which are candidates. In
+	larger buckets, ordered by their whole signature, only neighbouring
+	signatures are paired.
+
+	Returns:
+	A set of pairs of the rows of the candidate signatures, the smaller row
+	first.
+	"""
+	rows = (signatures < hashPrime).any(axis=1).nonzero()[0]
+	bandRows = signatures.shape[1] // numBands
+	multipliers = RandomState(0).randint(1, 2 ** 62, signatures.shape[1])\
+		.astype(uint64)
+	# Overflowing unsigned arithmetic keeps the keys to 64 bits
+	wholeKeys = (signatures[rows].astype(uint64) * multipliers).sum(axis=1,
+		dtype=uint64)
+	pairs = set()
+	for band in range(numBands):
+		columns = slice(band * bandRows, (band + 1) * bandRows)
+		bandKeys = (signatures[rows, columns].astype(uint64) *
+			multipliers[columns]).sum(axis=1, dtype=uint64)
+		order = lexsort((wholeKeys, bandKeys))
+		sortedKeys = bandKeys[order]
+		starts = concatenate([[0], (sortedKeys[1:] != sortedKeys[:-1])
+			.nonzero()[0] + 1, [len(order)]])
+		for start, end in zip(starts[:-1], starts[1:]):
+			if end - start < 2:
+				continue
+			bucket = rows[order[start:end]]
+			# The keys can collide, so the band itself is checked
+			bucketSignatures = signatures[bucket, columns]
+			if end - start <= maxBucket:
+				bucketPairs = [(i, j) for i in range(len(bucket))
+					for j in range(i + 1, len(bucket))]
+			else:
+				bucketPairs = [(i, i + 1) for i in range(len(bucket) - 1)]
+			for i, j in bucketPairs:
+				if (bucketSignatures[i] == bucketSignatures[j]).all():
+					pairs.add((min(bucket[i], bucket[j]), max(bucket[i], bucket[j])))
+	return pairs
+
+def findDuplicateClusters(sentences, threshold=0.8, numHashes=128,
+	numBands=16, shingleSize=5, seed=0):
+	"""
+	Finds groups of near duplicate sentences with MinHash signatures and LSH
+	banding. Candidate pairs are kept if the Jaccard similarity of their
+	shingles is at least threshold and joined into clusters, so a sentence is
+	in the cluster of any sentence it is a near duplicate of.
+
+	Args:
+	sentences: A list of sentences as strings.
+	threshold: The smallest Jaccard similarity of near duplicates.
+	numHashes: The length of the MinHash signatures.
+	numBands: The number of LSH bands. Pairs with a Jaccard similarity of
+	about (1 / numBands) ** (numBands / numHashes) or more are likely to be
+	candidates.
+	shingleSize: The number of characters in each shingle.
+	seed: The seed of the MinHash functions.
+
+	Returns:
+	A list of the clusters of two or more sentences, each a sorted list of
+	positions in sentences, ordered by their first position.
+	"""
+	shingleSets = [getShingles(sentence, shingleSize) for sentence in sentences]
+	signatures = MinHasher(numHashes, seed).getSignatures(shingleSets)
+	parents = arange(len(sentences))
+	def findRoot(position):
+		while parents[position] != position:
+			parents[position] = parents[parents[position]]
+			position = parents[position]
+		return position
+	for position1, position2 in sorted(findCandidatePairs(signatures,
+		numBands)):
+		if getJaccard(shingleSets[position1], shingleSets[position2]) >= \
+			threshold:
+			root1 = findRoot(position1)
+			root2 = findRoot(position2)
+			parents[max(root1, root2)] = min(root1, root2)
+	clusters = {}
+	for position in range(len(sentences)):
+		clusters.setdefault(findRoot(position), []).append(position)
+	return [clusters[root] for root in sorted(clusters)
+		if len(clusters[root]) > 1]
+
+def getExampleSentence(example):
+	"""
+	Gives the sentence of an example, which is a string before the dataset is
+	tokenised and a dictionary with key 'sent' after.
+	"""
+	if isinstance(example, dict):
+		return example['sent']
+	return example
+
+def deduplicateDataset(dataset, threshold=0.8, acrossWords=False, **options):
+	"""
+	Removes near duplicate examples from a dataset. Of each cluster of near
+	duplicates the first example of each word is kept, or only the first
+	example of all if acrossWords is True, as the same sentence can be an
+	example of several words. Senses left without examples and words left
+	without senses are removed.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of sentences.
+	threshold: The smallest Jaccard similarity of near duplicates.
+	acrossWords: Boolean indicating if examples of different words can be
+	removed as duplicates of each other.
+	options: Any other keyword arguments of findDuplicateClusters.
+
+	Returns:
+	The cleaned dataset, a new dictionary leaving the one given unchanged, and
+	a report as a dictionary with keys 'examples', the number of examples,
+	'clusters', a list of the clusters of near duplicates each a list of
+	(word, sense number, example) tuples, and 'removed', the list of removed
+	examples as (word, sense number, example) tuples.
+	"""
+	positions = [(key, senseNum, exampleNum) for key in sorted(dataset)
+		for senseNum, sense in enumerate(dataset[key])
+		for exampleNum in range(len(sense['examples']))]
+	sentences = [getExampleSentence(dataset[key][senseNum]['examples']
+		[exampleNum]) for key, senseNum, exampleNum in positions]
+	clusters = findDuplicateClusters(sentences, threshold, **options)
+	removed = set()
+	for cluster in clusters:
+		keptKeys = set()
+		for position in cluster:
+			key = positions[position][0] if not acrossWords else None
+			if key in keptKeys:
+				removed.add(positions[position])
+			keptKeys.add(key)
+	cleaned = {}
+	for key in dataset:
+		senses = []
+		for senseNum, sense in enumerate(dataset[key]):
+			examples = [example for exampleNum, example
+				in enumerate(sense['examples'])
+				if (key, senseNum, exampleNum) not in removed]
+			if examples:
+				sense = dict(sense)
+				sense['examples'] = examples
+				senses.append(sense)
+		if senses:
+			cleaned[key] = senses
+	def describe(position):
+		key, senseNum, exampleNum = position
+		return (key, senseNum, dataset[key][senseNum]['examples'][exampleNum])
+	report = {'examples':len(positions), 'clusters':[[describe(positions[
+		position]) for position in cluster] for cluster in clusters],
+		'removed':[describe(position) for position in sorted(removed)]}
+	return cleaned, report
+
+def saveDuplicateReport(fileName, report):
+	"""
+	Saves a report given by deduplicateDataset as text, listing each cluster
+	of near duplicates with the word, sense number and sentence of each of
+	its examples and whether it was removed.
+
+	Args:
+	fileName: The name to save the file as.
+	report: The report given by deduplicateDataset.
+	"""
+	removed = set((key, senseNum, getExampleSentence(example))
+		for key, senseNum, example in report['removed'])
+	with open(fileName, 'w') as saveFile:
+		saveFile.write(getReportSummary(report) + '\n')
+		for cluster in report['clusters']:
+			saveFile.write('\n<cluster>\n')
+			for key, senseNum, example in cluster:
+				sentence = getExampleSentence(example)
+				saveFile.write(u'{}\t{}\t{}\t{}\n'.format(key, senseNum,
+					'removed' if (key, senseNum, sentence) in removed else 'kept',
+					sentence).encode('utf-8'))
+
+def getReportSummary(report):
+	"""
+	Gives a one line summary of a report given by deduplicateDataset.
+	"""
+	return '{} examples, {} clusters of near duplicates holding {} examples, '\
+		'{} examples removed.'.format(report['examples'],
+		len(report['clusters']), sum(len(cluster)
+		for cluster in report['clusters']), len(report['removed']))
+
+def main(argv):
+	"""
+	Removes near duplicate examples from a dataset in the dictionaryData
+	directory, saving the cleaned dataset and a report of the duplicates found.
+
+	Args:
+	argv: List of strings with the name of the dataset in position 0, the name
+	to save the cleaned dataset as in position 1 and optionally the smallest
+	Jaccard similarity of near duplicates in position 2.
+	"""
+	if len(argv) < 2:
+		print('Give the dataset to clean and the name to save it as.')
+		exit()
+	threshold = float(argv[2]) if len(argv) > 2 else 0.8
+	try:
+		dataset = sl.loadDataFromFile('dictionaryData/' + argv[0])
+	except IOError as err:
+		print(argv[0] + ' can not be found in the dictionaryData directory.')
+		exit()
+	cleaned, report = deduplicateDataset(dataset, threshold)
+	fileNameToSaveTo = 'dictionaryData/' + argv[1]
+	sl.saveDataToFile(fileNameToSaveTo, cleaned)
+	saveDuplicateReport(fileNameToSaveTo + 'Duplicates.txt', report)
+	print(getReportSummary(report))
+
+if __name__ == '__main__':
+	main(argv[1:])
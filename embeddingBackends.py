@@ -0,0 +1,285 @@
+import os
+from gensim.models import Word2Vec
+from gensim.models.keyedvectors import KeyedVectors
+from numpy import asarray
+from numpy import float16
+from numpy import float32
+from numpy import float64
+from numpy import int8
+from numpy import load
+from numpy import rint
+from numpy import sqrt
+from numpy import zeros
+from numpy.random import RandomState
+import loadAndSave as sl
+from word2vecSidecar import getSidecarPaths
+from word2vecSidecar import saveSidecarModel
+
+class EmbeddingBackend:
+	"""
+	The word vectors the prediction methods look up. The vectors are the rows
+	of a matrix and each backend gives the row of a word.
+	"""
+
+	def __init__(self, vectors):
+		"""
+		Args:
+		vectors: A matrix with a word vector in each row, which may be
+		memory-mapped.
+		"""
+		self.vectors = vectors
+		self.vectorSize = vectors.shape[1]
+
+	def getRow(self, word):
+		"""
+		Gives the row of a word's vector or None if the word has no vector.
+		"""
+		raise NotImplementedError
+
+	def getRows(self):
+		"""
+		Gives a dictionary with every word that has a vector as keys and the 
+		row of its vector as values.
+		"""
+		raise NotImplementedError
+
+	def __contains__(self, word):
+		return self.getRow(word) is not None
+
+	def __getitem__(self, word):
+		row = self.getRow(word)
+		if row is None:
+			raise KeyError(word)
+		return self.getRowVectors(row)
+
+	def getRowVectors(self, rows):
+		"""
+		Reads the vectors in the given rows of the matrix.
+
+		Args:
+		rows: A row number or array of row numbers.
+
+		Returns:
+		The vector or a matrix with a vector in each row.
+		"""
+		return self.vectors[rows]
+
+	def getVectorBytes(self):
+		"""
+		Gives the number of bytes the vectors take up.
+		"""
+		return self.vectors.nbytes
+
+	def similarity(self, word1, word2):
+		"""
+		Gives the cosine similarity between the vectors of two words as
+		model.similarity does.
+		"""
+		vector1 = self[word1].astype(float64)
+		vector2 = self[word2].astype(float64)
+		return vector1.dot(vector2) / sqrt(vector1.dot(vector1) *
+			vector2.dot(vector2))
+
+class GensimBackend(EmbeddingBackend):
+	"""
+	Word vectors held by a gensim word2vec model or its KeyedVectors.
+	"""
+
+	def __init__(self, model):
+		"""
+		Args:
+		model: A trained word2vec model or KeyedVectors.
+		"""
+		self.keyedVectors = getattr(model, 'wv', model)
+		EmbeddingBackend.__init__(self, self.keyedVectors.syn0)
+
+	def getRow(self, word):
+		vocabEntry = self.keyedVectors.vocab.get(word)
+		if vocabEntry is None:
+			return None
+		return vocabEntry.index
+
+	def getRows(self):
+		return dict((word, vocabEntry.index) 
+			for word, vocabEntry in self.keyedVectors.vocab.iteritems())
+
+class MatrixBackend(EmbeddingBackend):
+	"""
+	Word vectors held in a numpy matrix with a dictionary from word to row.
+	"""
+
+	def __init__(self, vectors, rows):
+		"""
+		Args:
+		vectors: A matrix with a word vector in each row.
+		rows: A dictionary with words as keys and the row of their vector as
+		values.
+		"""
+		EmbeddingBackend.__init__(self, vectors)
+		self.rows = rows
+
+	def getRow(self, word):
+		return self.rows.get(word)
+
+	def getRows(self):
+		return self.rows
+
+class SyntheticBackend(MatrixBackend):
+	"""
+	Random word vectors for a small list of words, for testing the prediction
+	methods without a trained model.
+	"""
+
+	def __init__(self, words, vectorSize=100, seed=0):
+		"""
+		Args:
+		words: A list of the words to give vectors.
+		vectorSize: The length of the vectors.
+		seed: The seed of the random vectors, the same seed always giving the
+		same vectors.
+		"""
+		vectors = RandomState(seed).standard_normal((len(words), vectorSize))
+		MatrixBackend.__init__(self, vectors.astype(float32),
+			dict((word, row) for row, word in enumerate(words)))
+
+class QuantisedBackend(MatrixBackend):
+	"""
+	The word vectors of another backend stored at a lower precision, either as
+	float16 or as int8 with a float32 scale for each row, to halve or quarter
+	the memory they take up. Vectors are converted back to float32 as they 
+	are read. Only the rows of the words are kept from the other backend so 
+	its full precision vectors can be freed.
+	"""
+
+	# The number of rows quantised at a time, bounding the float32 copies
+	# made while quantising a memory-mapped matrix
+	blockRows = 100000
+
+	def __init__(self, backend, precision):
+		"""
+		Args:
+		backend: The EmbeddingBackend holding the full precision vectors.
+		precision: Either 'float16' or 'int8'.
+		"""
+		self.precision = precision
+		vectors = backend.vectors
+		if precision == 'float16':
+			MatrixBackend.__init__(self, asarray(vectors, dtype=float16), 
+				backend.getRows())
+			self.scales = None
+			return
+		MatrixBackend.__init__(self, zeros(vectors.shape, dtype=int8), 
+			backend.getRows())
+		self.scales = zeros(len(vectors), dtype=float32)
+		for start in xrange(0, len(vectors), self.blockRows):
+			block = asarray(vectors[start:start + self.blockRows], dtype=float32)
+			scales = abs(block).max(axis=1) / 127
+			# Rows of zeros keep a scale that can be divided by
+			scales[scales == 0] = 1
+			self.vectors[start:start + len(block)] = rint(block / 
+				scales.reshape(-1, 1))
+			self.scales[start:start + len(block)] = scales
+
+	def getRowVectors(self, rows):
+		vectors = asarray(self.vectors[rows], dtype=float32)
+		if self.scales is not None:
+			vectors *= asarray(self.scales[rows])[..., None]
+		return vectors
+
+	def getVectorBytes(self):
+		if self.scales is None:
+			return self.vectors.nbytes
+		return self.vectors.nbytes + self.scales.nbytes
+
+def quantiseBackend(model, precision):
+	"""
+	Gives the vectors of a model at the selected precision.
+
+	Args:
+	model: A trained word2vec model or EmbeddingBackend.
+	precision: Either 'float32' to keep the vectors as they are, 'float16' or
+	'int8'.
+
+	Returns:
+	The model itself for 'float32' else a QuantisedBackend, which does not 
+	keep the model so the model's vectors are freed once it is no longer 
+	used.
+	"""
+	if precision == 'float32':
+		return model
+	return QuantisedBackend(getEmbeddingBackend(model), precision)
+
+def getEmbeddingBackend(model):
+	"""
+	Gives the backend for a model, wrapping a gensim model in a GensimBackend.
+
+	Args:
+	model: An EmbeddingBackend or a trained word2vec model.
+
+	Returns:
+	An EmbeddingBackend.
+	"""
+	if isinstance(model, EmbeddingBackend):
+		return model
+	return GensimBackend(model)
+
+def loadGensimBackend(word2vecBin):
+	"""
+	Loads the vectors of a word2vec binary memory-mapped from gensim's own
+	format, so processes on the same machine share one copy of the vectors.
+	The binary is converted to gensim's format next to it the first time, or
+	again if the binary has changed.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary.
+
+	Returns:
+	A GensimBackend.
+	"""
+	keyedVectorsPath = word2vecBin + '.kv'
+	signaturePath = keyedVectorsPath + '.signature'
+	signature = sl.getFileSignature(word2vecBin)
+	if not os.path.exists(signaturePath) or \
+		sl.loadDataFromFile(signaturePath) != signature:
+		model = Word2Vec.load_word2vec_format(word2vecBin, binary=True)
+		# The vectors are saved to their own .npy file so they can be mapped
+		model.wv.save(keyedVectorsPath, separately=['syn0'])
+		sl.saveDataToFile(signaturePath, signature)
+	return GensimBackend(KeyedVectors.load(keyedVectorsPath, mmap='r'))
+
+def loadMatrixBackend(matrixPath):
+	"""
+	Loads word vectors saved as a .npy matrix and index of words, such as a
+	sidecar model, memory-mapping the matrix so processes on the same machine
+	share one copy of it.
+
+	Args:
+	matrixPath: The file path, without extension, of the saved vectors.
+
+	Returns:
+	A MatrixBackend.
+	"""
+	vectorsPath, indexPath = getSidecarPaths(matrixPath)
+	words = sl.loadDataFromFile(indexPath)['words']
+	return MatrixBackend(load(vectorsPath, mmap_mode='r'),
+		dict((word, row) for row, word in enumerate(words)))
+
+def convertToMatrixBackend(word2vecBin):
+	"""
+	Loads the vectors of a word2vec binary as a memory-mapped MatrixBackend,
+	converting the whole binary to a .npy matrix next to it the first time or
+	again if the binary has changed.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary.
+
+	Returns:
+	A MatrixBackend.
+	"""
+	matrixPath = word2vecBin + '.matrix'
+	vectorsPath, indexPath = getSidecarPaths(matrixPath)
+	if not os.path.exists(vectorsPath) or not os.path.exists(indexPath) or \
+		sl.loadDataFromFile(indexPath)['binarySignature'] != \
+		sl.getFileSignature(word2vecBin):
+		saveSidecarModel(word2vecBin, matrixPath)
+	return loadMatrixBackend(matrixPath)
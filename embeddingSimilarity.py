@@ -0,0 +1,255 @@
+from numpy import asarray
+from numpy import ascontiguousarray
+from numpy import float32
+from numpy import float64
+from numpy import int64
+from numpy import nan
+from numpy import sqrt
+from numpy import zeros
+from crossoverSimilarity import createCountMatrix
+from embeddingBackends import getEmbeddingBackend
+from crossoverSimilarity import resizeColumns
+from tokenInterning import TokenVocabulary
+from tokenInterning import isInterned
+from tokenInterning import oovRow
+
+def getVectors(vocabulary, model):
+	"""
+	Looks up the word2vec vector of every token in a vocabulary once.
+
+	Args:
+	vocabulary: A dictionary mapping tokens to row numbers, as created by
+	createCountMatrix, or a TokenVocabulary whose token IDs are the row 
+	numbers.
+	model: A trained word2vec model or EmbeddingBackend.
+
+	Returns:
+	A float32 matrix with a row for each token of the vocabulary holding its
+	vector, or zeros if the token is not in the model.
+	"""
+	backend = getEmbeddingBackend(model)
+	vectors = zeros((max(len(vocabulary), 1), backend.vectorSize), dtype=float32)
+	if isinstance(vocabulary, TokenVocabulary):
+		embeddingRows = vocabulary.getEmbeddingRows(model)
+	else:
+		embeddingRows = zeros(len(vectors), dtype=int64) + oovRow
+		for token, row in vocabulary.items():
+			embeddingRow = backend.getRow(token)
+			if embeddingRow is not None:
+				embeddingRows[row] = embeddingRow
+	known = (embeddingRows != oovRow).nonzero()[0]
+	if len(known):
+		vectors[known] = backend.getRowVectors(embeddingRows[known])
+	return vectors
+
+def getUnitVectors(vocabulary, model):
+	"""
+	Looks up the word2vec vector of every token in a vocabulary once and
+	scales it to unit length, as model.similarity does before taking the dot
+	product of two vectors.
+
+	Args:
+	vocabulary: A dictionary mapping tokens to row numbers, as created by
+	createCountMatrix.
+	model: A trained word2vec model or EmbeddingBackend.
+
+	Returns:
+	A float32 matrix with a row for each token of the vocabulary holding its
+	unit vector, or zeros if the token is not in the model.
+	"""
+	vectors = getVectors(vocabulary, model).astype(float64)
+	lengths = getRowLengths(vectors)
+	known = lengths > 0
+	vectors[known] /= lengths[known].reshape(-1, 1)
+	return vectors.astype(float32)
+
+def getCountMatrix(tokenLists, vocabulary=None):
+	"""
+	Creates the count matrix of lists of tokens for looking up their vectors,
+	checking that token IDs come with the TokenVocabulary needed to find the
+	tokens they stand for.
+	"""
+	if isInterned(tokenLists) and not isinstance(vocabulary, TokenVocabulary):
+		raise ValueError('Token IDs need the TokenVocabulary they came from.')
+	return createCountMatrix(tokenLists, vocabulary)
+
+def getRowLengths(vectors):
+	"""
+	Gives the L2 norm of each row of a matrix.
+	"""
+	return sqrt((vectors * vectors).sum(axis=1))
+
+def getUnitVectorSums(tokenLists, model, vocabulary=None):
+	"""
+	Sums the unit vectors of the tokens of each list of tokens that are in the
+	model, counting a token each time it occurs. As the sum of the dot products
+	between every pair of vectors from two lists is the dot product of the
+	sums, these are all that is needed to score word similarity.
+
+	Args:
+	tokenLists: A list of lists of tokens.
+	model: A trained word2vec model or EmbeddingBackend.
+	vocabulary: A dictionary mapping tokens to row numbers to add to, or None
+	to start a new one. Must be the TokenVocabulary the tokens came from if
+	they are token IDs.
+
+	Returns:
+	A float64 matrix with a row for each list of tokens holding the sum.
+	"""
+	counts, vocabulary = getCountMatrix(tokenLists, vocabulary)
+	unitVectors = getUnitVectors(vocabulary, model)
+	counts = resizeColumns(counts, unitVectors.shape[0])
+	return counts * unitVectors
+
+def word2vecWordSimilarityRows(tokenLists1, tokenLists2, model, 
+	vocabulary=None):
+	"""
+	Scores each list of tokens against the list at the same position of
+	another using word2vec word similarity, giving the same values as
+	word2vecWordSimilarity without looking up or normalising a vector more than
+	once.
+
+	Args:
+	tokenLists1: A list of lists of tokens.
+	tokenLists2: A list of lists of tokens the same length as tokenLists1.
+	model: A trained word2vec model or EmbeddingBackend.
+	vocabulary: The TokenVocabulary the tokens came from if they are token IDs
+	else None.
+
+	Returns:
+	An array with entry i holding the word similarity between tokenLists1[i]
+	and tokenLists2[i].
+	"""
+	sums = getUnitVectorSums(list(tokenLists1) + list(tokenLists2), model, 
+		vocabulary)
+	return (sums[:len(tokenLists1)] * sums[len(tokenLists1):]).sum(axis=1)
+
+def word2vecWordSimilarityMatrix(tokenLists1, tokenLists2, model, 
+	vocabulary=None):
+	"""
+	Scores every list of tokens against every list of another using word2vec
+	word similarity with a single matrix product.
+
+	Args:
+	tokenLists1: A list of lists of tokens.
+	tokenLists2: A list of lists of tokens.
+	model: A trained word2vec model or EmbeddingBackend.
+	vocabulary: The TokenVocabulary the tokens came from if they are token IDs
+	else None.
+
+	Returns:
+	An array with entry [i][j] holding the word similarity between
+	tokenLists1[i] and tokenLists2[j].
+	"""
+	sums = getUnitVectorSums(list(tokenLists1) + list(tokenLists2), model, 
+		vocabulary)
+	return sums[:len(tokenLists1)].dot(sums[len(tokenLists1):].T)
+
+def getSentenceVectors(tokenLists, model, vocabulary=None):
+	"""
+	Embeds each list of tokens once as the sum of the vectors of its tokens
+	that are in the model, as getVectorSum does, scaled to unit length so the
+	cosine similarity of two sentences is the dot product of their rows.
+
+	Args:
+	tokenLists: A list of lists of tokens.
+	model: A trained word2vec model or EmbeddingBackend.
+	vocabulary: The TokenVocabulary the tokens came from if they are token IDs
+	else None.
+
+	Returns:
+	A contiguous float32 matrix with a unit length row for each list of 
+	tokens. Lists without any tokens in the model have no direction and are
+	given a row of NaN, so like scipy's cosine any distance to them is NaN.
+	"""
+	counts, vocabulary = getCountMatrix(tokenLists, vocabulary)
+	vectors = getVectors(vocabulary, model)
+	sums = resizeColumns(counts, vectors.shape[0]) * vectors
+	lengths = getRowLengths(sums)
+	lengths[lengths == 0] = nan
+	return ascontiguousarray(sums / lengths.reshape(-1, 1), dtype=float32)
+
+def cosineDistanceRows(tokenLists1, tokenLists2, model, vocabulary=None):
+	"""
+	Gives the cosine distance between each list of tokens and the list at the
+	same position of another, the values cosineSimilarity gives, embedding 
+	each list only once.
+
+	Args:
+	tokenLists1: A list of lists of tokens.
+	tokenLists2: A list of lists of tokens the same length as tokenLists1.
+	model: A trained word2vec model or EmbeddingBackend.
+	vocabulary: The TokenVocabulary the tokens came from if they are token IDs
+	else None.
+
+	Returns:
+	An array with entry i holding the cosine distance between tokenLists1[i]
+	and tokenLists2[i].
+	"""
+	vectors = getSentenceVectors(list(tokenLists1) + list(tokenLists2), model,
+		vocabulary)
+	return getCosineDistanceRows(vectors[:len(tokenLists1)], 
+		vectors[len(tokenLists1):])
+
+def getCosineDistanceRows(vectors1, vectors2):
+	"""
+	Gives the cosine distance between each row of a matrix of unit length
+	sentence vectors and the same row of another.
+
+	Args:
+	vectors1: A matrix of sentence vectors as given by getSentenceVectors.
+	vectors2: A matrix of sentence vectors with as many rows as vectors1.
+
+	Returns:
+	An array with entry i holding the cosine distance between row i of 
+	vectors1 and row i of vectors2.
+	"""
+	return 1.0 - (asarray(vectors1, dtype=float64) * vectors2).sum(axis=1)
+
+def cosineDistanceMatricesByKey(tokenListsByKey, model, vocabulary=None):
+	"""
+	Gives the cosine distance between every pair of lists of tokens for each 
+	word. Every sentence of every word is embedded once into a single matrix
+	and each word's distances are then a single matrix product of its block
+	of rows.
+
+	Args:
+	tokenListsByKey: A dictionary with words as keys and a list of lists of 
+	tokens as values.
+	model: A trained word2vec model or EmbeddingBackend.
+	vocabulary: The TokenVocabulary the tokens came from if they are token IDs
+	else None.
+
+	Returns:
+	A dictionary with the same keys holding an array of the cosine distance 
+	between all pairs of the word's lists of tokens.
+	"""
+	keys = list(tokenListsByKey.keys())
+	vectors = getSentenceVectors([tokens for key in keys 
+		for tokens in tokenListsByKey[key]], model, vocabulary)
+	vectorsByKey = {}
+	start = 0
+	for key in keys:
+		end = start + len(tokenListsByKey[key])
+		vectorsByKey[key] = vectors[start:end]
+		start = end
+	return getCosineDistanceMatrices(vectorsByKey)
+
+def getCosineDistanceMatrices(vectorsByKey):
+	"""
+	Gives the cosine distance between every pair of sentence vectors for each
+	word with a single matrix product for each word.
+
+	Args:
+	vectorsByKey: A dictionary with words as keys and a matrix of unit length
+	sentence vectors, as given by getSentenceVectors, as values.
+
+	Returns:
+	A dictionary with the same keys holding an array of the cosine distance 
+	between all pairs of the word's sentence vectors.
+	"""
+	distancesByKey = {}
+	for key, vectors in vectorsByKey.items():
+		vectors = asarray(vectors, dtype=float64)
+		distancesByKey[key] = 1.0 - vectors.dot(vectors.T)
+	return distancesByKey
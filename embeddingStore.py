@@ -0,0 +1,175 @@
+import os
+from hashlib import sha1
+from numpy import asarray
+from numpy import concatenate
+from numpy import float32
+from numpy import int64
+from numpy import isnan
+from numpy import load
+from numpy import save
+import loadAndSave as sl
+from embeddingSimilarity import getSentenceVectors
+
+class SentenceEmbeddingStore:
+	"""
+	The unit length word2vec sentence vector of every example of a dataset,
+	held in a memory-mapped matrix with an index from example sentence to row.
+	"""
+
+	def __init__(self, vectors, sentRows, noVectorSents):
+		"""
+		Args:
+		vectors: A matrix, usually memory-mapped, with a sentence vector as
+		given by getSentenceVectors in each row.
+		sentRows: A dictionary with example sentences as keys and the row of
+		their vector as values.
+		noVectorSents: A list of the example sentences without any tokens in
+		the model, whose rows are NaN.
+		"""
+		self.vectors = vectors
+		self.sentRows = sentRows
+		self.noVectorSents = noVectorSents
+
+	def __len__(self):
+		return len(self.sentRows)
+
+	def getVectors(self, sents):
+		"""
+		Reads the vectors of example sentences from the store.
+
+		Args:
+		sents: A list of example sentences, all of which are in the store.
+
+		Returns:
+		A float32 matrix with the vector of each sentence in a row.
+		"""
+		rows = asarray([self.sentRows[sent] for sent in sents], dtype=int64)
+		return asarray(self.vectors[rows], dtype=float32)
+
+	def getMissingExamples(self, examples):
+		"""
+		Finds the examples whose sentences are not in the store.
+		"""
+		return [example for example in examples
+			if example['sent'] not in self.sentRows]
+
+def getStoreKey(word2vecBin, lemmatize, rmStopwords, rmPunct, dictionary,
+	precision='float32'):
+	"""
+	Creates the key that identifies the store of sentence vectors created with
+	a word2vec model and dictionary file after the selected preprocessing.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary the model is loaded from.
+	lemmatize: Boolean indicating if the tokens were lemmatized.
+	rmStopwords: Boolean indicating if stopwords were removed from the tokens.
+	rmPunct: Boolean indicating if punctuation was removed from the tokens.
+	dictionary: The file path of the dictionary data file.
+	precision: The precision the model's vectors were stored at.
+
+	Returns:
+	A string of hexadecimal digits.
+	"""
+	settings = [sl.getFileSignature(word2vecBin),
+		sl.getFileSignature(dictionary),
+		'lemmatize={}'.format(bool(lemmatize)),
+		'rmStopwords={}'.format(bool(rmStopwords)),
+		'rmPunct={}'.format(bool(rmPunct))]
+	# Full precision adds nothing so existing stores keep their keys
+	if precision != 'float32':
+		settings.append('precision={}'.format(precision))
+	return sha1('\n'.join(settings)).hexdigest()
+
+def getStorePaths(storeDir, key):
+	"""
+	Gives the file paths of the vector matrix and index of a store.
+	"""
+	return (os.path.join(storeDir, key + '.npy'),
+		os.path.join(storeDir, key + '.index'))
+
+def getDatasetExamples(dataset):
+	"""
+	Gathers every example of a dataset once.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'.
+
+	Returns:
+	A list of the examples, each example sentence appearing only once.
+	"""
+	examples = []
+	seen = set()
+	for key in dataset:
+		for sense in dataset[key]:
+			for example in sense['examples']:
+				if example['sent'] not in seen:
+					seen.add(example['sent'])
+					examples.append(example)
+	return examples
+
+def loadEmbeddingStore(storeDir, key):
+	"""
+	Memory-maps the store with the given key.
+
+	Args:
+	storeDir: The directory the store was saved in.
+	key: The key of the store as given by getStoreKey.
+
+	Returns:
+	The SentenceEmbeddingStore or None if there is no store with the key.
+	"""
+	vectorsPath, indexPath = getStorePaths(storeDir, key)
+	if not os.path.exists(vectorsPath) or not os.path.exists(indexPath):
+		return None
+	index = sl.loadDataFromFile(indexPath)
+	return SentenceEmbeddingStore(load(vectorsPath, mmap_mode='r'),
+		index['sentRows'], index['noVectorSents'])
+
+def saveEmbeddingStore(examples, model, storeDir, key, store=None,
+	vocabulary=None):
+	"""
+	Embeds examples with a word2vec model and saves their vectors, together
+	with those of an existing store, as the store with the given key.
+
+	Args:
+	examples: A list of examples, dictionaries with keys 'sent' and 'tokens',
+	that are not in the store.
+	model: A trained word2vec model or EmbeddingBackend.
+	storeDir: The directory to save the store in.
+	key: The key of the store as given by getStoreKey.
+	store: The SentenceEmbeddingStore to add the examples to or None.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+
+	Returns:
+	The memory-mapped SentenceEmbeddingStore holding all the vectors.
+	"""
+	vectors = getSentenceVectors([example['tokens'] for example in examples],
+		model, vocabulary)
+	sents = [example['sent'] for example in examples]
+	noVectorSents = [sent for sent, vector in zip(sents, vectors)
+		if isnan(vector[0])]
+	if store is not None and len(store):
+		sentRows = dict(store.sentRows)
+		noVectorSents = store.noVectorSents + noVectorSents
+		vectors = concatenate([asarray(store.vectors, dtype=float32), vectors])
+	else:
+		sentRows = {}
+	start = len(vectors) - len(sents)
+	for row, sent in enumerate(sents):
+		sentRows[sent] = start + row
+
+	if not os.path.exists(storeDir):
+		os.makedirs(storeDir)
+	vectorsPath, indexPath = getStorePaths(storeDir, key)
+	# Written to temporary files first so an interrupted save leaves the old
+	# store in place
+	with open(vectorsPath + '.tmp', 'wb') as vectorsFile:
+		save(vectorsFile, vectors)
+	sl.saveDataToFile(indexPath + '.tmp', {'sentRows':sentRows,
+		'noVectorSents':noVectorSents})
+	os.rename(vectorsPath + '.tmp', vectorsPath)
+	os.rename(indexPath + '.tmp', indexPath)
+	return loadEmbeddingStore(storeDir, key)
@@ -8,14 +8,48 @@ from baseLinePredictions import GroupedPredictions
 from wordLists import getWordList 
 from gensim.models import Word2Vec
 from copy import deepcopy
+from multiprocessing import Pool
+from random import Random
+from random import getstate
 from random import seed
+from random import setstate
+from numpy import sqrt
 from numpy import std
 from numpy import mean
 from ConfigParser import SafeConfigParser
 from configValidation import validateConfigFile 
+from configValidation import getRetrievalKs
+from configValidation import optionalDefaults
+from embeddingBackends import convertToMatrixBackend
+from embeddingBackends import getEmbeddingBackend
+from embeddingBackends import loadGensimBackend
+from embeddingBackends import loadMatrixBackend
+from embeddingBackends import quantiseBackend
+from embeddingStore import getDatasetExamples
+from embeddingStore import getStoreKey
+from embeddingStore import loadEmbeddingStore
+from embeddingStore import saveEmbeddingStore
+from exhaustiveEvaluation import runExhaustiveOFMTest
+from predictionMethods import embedSentences
+from predictionMethods import getPredictionMethod
+from randomBaseline import expectedRandomAccuracy
+from retrievalIndex import LSHIndex
+from retrievalIndex import RetrievalIndex
+from retrievalIndex import createRetrievalData
+from retrievalIndex import recallAtK
+from retrievalIndex import selectRetrievalQueries
+from similarityCache import buildSimilarityCache
+from word2vecSidecar import getDatasetTokens
+from word2vecSidecar import loadRestrictedModel
+from word2vecSidecar import updateSidecarModel
+from wordSharding import estimateWordCost
+from wordSharding import getWordSeeds
+from wordSharding import mergeWordResults
+from wordSharding import orderByCost
 import time
 
-def runGroupedTest(data, method, model, accuracyMeasure):
+def runGroupedTest(data, method, model, accuracyMeasure, groupSize, 
+	solver='bruteForce', dataTest=None):
 	"""
 	Runs a grouped evaluation problem prediction on the given data and returns 
 	the accuracy using the selected accuracy measure.
@@ -26,29 +60,100 @@ def runGroupedTest(data, method, model, accuracyMeasure):
 	are 'random', 'wordCrossover' or 'word2vec' 
 	model: A trained word2vec model if method is 'word2vec' else None.
 	accuracyMeasure: The measure by which the accuracy will be measured either
-	'total' or 'pairs'.
+	'total', 'pairs', 'ari' or 'nmi'.
+	groupSize: The number of examples in each sense group or None to group 
+	the examples into groups the size of each sense with the 'subsetDP' 
+	solver.
+	solver: The grouping solver to use, either 'bruteForce', 'exact', 
+	'batch', 'subsetDP', 'greedy', 'localSearch' or 'kMedoids'.
+	dataTest: The GroupedPredictions to predict with or None to use one with
+	the default settings.
 
 	Returns:
 	The accuracy as a float of using the selected prediction method on the 
 	given data using the selected accuracy measure.
 
 	"""
-	dataTest = GroupedPredictions()
+	if dataTest is None:
+		dataTest = GroupedPredictions(indexResults=True)
 	groupTestData = ds.createGroupedTestData(data)
+	senseLabels = ds.createGroupedTestLabels(data)
+	if groupSize is None:
+		groupSize = ds.getGroupSizes(data)
 	#sl.saveGroupedData('oxfordGroupedTest', groupTestData)
-	if method == 'random':
-		selections = dataTest.randomSelection(groupTestData, 3)
-	elif method == 'wordCrossover': 
-		selections = dataTest.wordCrossoverSelection(groupTestData, 3)
-	elif method == 'word2vec':	
-		selections = dataTest.word2VecSimilaritySelection(groupTestData, 3, model)
-	
-	if accuracyMeasure == 'total':
-		return dataTest.calculateAccuracy(selections, groupTestData)
-	elif accuracyMeasure == 'pairs':	
-		return dataTest.calculateAccuracyPairs(selections, groupTestData)
+	selections = dataTest.predict(groupTestData, groupSize, method, model, 
+		solver)
+	return calculateGroupedAccuracy(dataTest, selections, groupTestData, 
+		accuracyMeasure, senseLabels)
+
+def calculateGroupedAccuracy(dataTest, selections, groupTestData, 
+	accuracyMeasure, senseLabels=None):
+	"""
+	Calculates the accuracy of grouped predictions with the selected accuracy
+	measure.
+
+	Args:
+	dataTest: A GroupedPredictions.
+	selections: The predicted groups for each word.
+	groupTestData: The grouped test data the predictions were made on.
+	accuracyMeasure: 'total', 'pairs', 'ari' or 'nmi'.
+	senseLabels: The sense label of each example for each word or None if 
+	the examples are ordered by sense in groups of equal size.
+
+	Returns:
+	The accuracy as a float.
+	"""
+	return dataTest.calculateAccuracyMeasure(selections, groupTestData, 
+		accuracyMeasure, senseLabels)
+
+def runGroupedSolverComparison(data, method, model, accuracyMeasure, 
+	groupSize, solver, timeLimit=None, maxIterations=None, vocabulary=None,
+	embeddingStore=None, similarityCache=None):
+	"""
+	Runs a grouped evaluation problem prediction with a heuristic grouping 
+	solver and also solves every word exactly, reporting how much accuracy 
+	and grouping score the heuristic trades for its speed.
+
+	Args:
+	data: The data to perform the prediction on. 
+	method: Either 'wordCrossover' or 'word2vec'.
+	model: A trained word2vec model if method is 'word2vec' else None.
+	accuracyMeasure: 'total', 'pairs', 'ari' or 'nmi'.
+	groupSize: The number of examples in each sense group.
+	solver: 'greedy', 'localSearch' or 'kMedoids'.
+	timeLimit: The number of seconds the solver may spend on each word or None.
+	maxIterations: The number of iterations the solver may run for each word 
+	or None.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+	embeddingStore: The SentenceEmbeddingStore holding the examples' sentence
+	vectors or None.
+	similarityCache: The SimilarityCache of all the examples the data was 
+	selected from or None.
+
+	Returns:
+	A dictionary with keys 'accuracy' and 'exactAccuracy' for the accuracy of 
+	the heuristic and exact groupings, and 'words', 'skipped', 'meanGap', 
+	'maxGap', 'seconds' and 'exactSeconds' as returned by summariseGapReport.
+	The exact accuracy is over the words solved exactly, None if there are 
+	none.
+	"""
+	dataTest = GroupedPredictions(timeLimit, maxIterations, True, vocabulary,
+		embeddingStore, similarityCache, True)
+	accuracy = runGroupedTest(data, method, model, accuracyMeasure, groupSize, 
+		solver, dataTest)
+	groupTestData = ds.createGroupedTestData(data)
+	report = dataTest.summariseGapReport()
+	report['accuracy'] = accuracy
+	report['exactAccuracy'] = None
+	if report['words']:
+		report['exactAccuracy'] = calculateGroupedAccuracy(dataTest, 
+			dataTest.exactResults, groupTestData, accuracyMeasure, 
+			ds.createGroupedTestLabels(data))
+	return report
 
-def runOFMTest(data, method, model):
+def runOFMTest(data, method, model, vocabulary=None, embeddingStore=None,
+	similarityCache=None):
 	"""
 	Runs a select one sentence from many options evaluation problem prediction 
 	on the given data and returns the accuracy.
@@ -59,24 +164,393 @@ def runOFMTest(data, method, model):
 	are 'random', 'wordCrossover', 'word2vecCosine' and 'word2vecWordSim'. 
 	model: A trained word2vec model if method is 'word2vecCosine' or 
 	'word2vecWordSim' else None.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+	embeddingStore: The SentenceEmbeddingStore holding the examples' sentence
+	vectors or None.
+	similarityCache: The SimilarityCache of all the examples the data was 
+	selected from or None.
 
 	Returns:
 	The accuracy as a float of using the selected prediction method on the 
 	given data.
 	"""
-	ofmPredictor = OFMPredictions()	
+	ofmPredictor = OFMPredictions(vocabulary, embeddingStore, similarityCache,
+		True)
 	ofmData = ds.createOFMData(data)
 	#sl.saveOneFromManyData('delete', ofmData)
-	if method == 'random':
-		selections = ofmPredictor.randomSelection(ofmData)
-	elif method == 'wordCrossover':	
-		selections = ofmPredictor.wordCrossoverSelection(ofmData)
-	elif method == 'word2vecCosine':
-		selections = ofmPredictor.word2VecSimilaritySelectionCosine(ofmData, model)
-	elif method == 'word2vecWordSim':
-		selections = ofmPredictor.word2VecSimilaritySelectionWordSim(ofmData, model)		
+	selections = ofmPredictor.predict(ofmData, method, model)
 	return ofmPredictor.calculateAccuracy(selections, ofmData)
 
+def buildRetrievalIndices(parser, retrievalData, model, vocabulary=None,
+	embeddingStore=None):
+	"""
+	Indexes the sentence vector of every example for the retrieval evaluation
+	and prints the time and memory each index took to build.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file.
+	retrievalData: The data given by createRetrievalData.
+	model: A trained word2vec model or EmbeddingBackend, may be None if 
+	embeddingStore is given.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+	embeddingStore: The SentenceEmbeddingStore holding the examples' sentence
+	vectors or None.
+
+	Returns:
+	A list of pairs of the name of each index and the index, the exact 
+	RetrievalIndex first followed by an LSHIndex if retrievalIndex is 'lsh'.
+	"""
+	startTime = time.time()
+	index = RetrievalIndex(embedSentences(retrievalData['examples'], model,
+		vocabulary, embeddingStore))
+	print('Exact index of {} examples: {} bytes, {} bytes of scores while '
+		'searching, built in {} seconds'.format(len(index.vectors), 
+		index.getIndexBytes(), index.getScratchBytes(), 
+		time.time() - startTime))
+	indices = [('exact', index)]
+	if parser.get('evaluation_params', 'retrievalIndex') == 'lsh':
+		startTime = time.time()
+		lshIndex = LSHIndex(index, parser.getint('evaluation_params', 'lshBits'),
+			parser.getint('evaluation_params', 'lshTables'))
+		print('LSH index: {} bytes, built in {} seconds'.format(
+			lshIndex.getIndexBytes(), time.time() - startTime))
+		indices.append(('lsh', lshIndex))
+	return indices
+
+def runRetrievalTest(retrievalData, indices, ks):
+	"""
+	Runs a retrieval evaluation, a select one sentence from many options 
+	problem where the options are every example of every word. A query example
+	is selected for each word and the examples of the dictionary are ranked by
+	their similarity to it.
+
+	Args:
+	retrievalData: The data given by createRetrievalData.
+	indices: A list of pairs of a name and a RetrievalIndex or LSHIndex as 
+	given by buildRetrievalIndices.
+	ks: A list of the values of k to measure recall at.
+
+	Returns:
+	A dictionary with the name of each index as keys holding a dictionary 
+	with key 'recall', a dictionary of the recall at each k, key 'seconds', the
+	time taken to search, and key 'queries', the number of queries.
+	"""
+	exactIndex = indices[0][1]
+	queryRows = selectRetrievalQueries(retrievalData, exactIndex.valid)
+	queries = exactIndex.vectors[queryRows]
+	report = {}
+	for name, index in indices:
+		startTime = time.time()
+		rows, scores = index.topK(queries, max(ks), queryRows)
+		report[name] = {'seconds':time.time() - startTime, 
+			'queries':len(queryRows), 'recall':recallAtK(rows, queryRows, 
+			retrievalData['senses'], exactIndex.valid, ks)}
+		if name == 'lsh':
+			report[name]['candidates'] = index.lastCandidates
+	return report
+
+
+# The data and settings of the test iterations of the running evaluation, 
+# set in each worker process when it starts
+iterationContext = {}
+
+def setIterationContext(context):
+	"""
+	Sets the data and settings the test iterations are run with.
+
+	Args:
+	context: A dictionary as given to runTestIterations.
+	"""
+	iterationContext.clear()
+	iterationContext.update(context)
+
+def getIterationSeeds(seedNo, iterations):
+	"""
+	Draws the random seed of each test iteration from the seed of the 
+	evaluation, so that each iteration selects and predicts the same way 
+	whichever process runs it and in whatever order.
+
+	Args:
+	seedNo: The seed of the evaluation.
+	iterations: The number of test iterations.
+
+	Returns:
+	A list of the seed of each iteration.
+	"""
+	seeds = Random(seedNo)
+	return [seeds.randint(0, 2**31 - 1) for i in range(iterations)]
+
+def copySenseLists(data):
+	"""
+	Copies the lists of senses and examples of a dataset, but not the 
+	examples, so that selecting from the copy does not reorder the dataset.
+
+	Args:
+	data: A dictionary with words as keys and as values a list of senses 
+	which are dictionarys which must have a key 'examples'.
+
+	Returns:
+	A dictionary with the same keys and copies of the senses.
+	"""
+	copied = {}
+	for key in data:
+		copied[key] = []
+		for sense in data[key]:
+			sense = dict(sense)
+			sense['examples'] = list(sense['examples'])
+			copied[key].append(sense)
+	return copied
+
+def runTestIteration(iterationSeed):
+	"""
+	Runs one test iteration of the grouped or select one sentence from many 
+	options evaluation problem with the data and settings set by 
+	setIterationContext. 
+
+	Args:
+	iterationSeed: The random seed of the iteration.
+
+	Returns:
+	A dictionary with key 'accuracy', key 'comparison' holding the report of
+	runGroupedSolverComparison if the heuristic solver is compared to the 
+	exact solver and key 'fullAccuracy' if the full precision model is 
+	compared.
+	"""
+	seed(iterationSeed)
+	return runSelectedTest(selectIterationData())
+
+def selectIterationData():
+	"""
+	Selects the senses and examples of a test iteration from the dataset set
+	by setIterationContext, leaving the dataset unchanged.
+
+	Returns:
+	The selected data.
+	"""
+	parser = iterationContext['parser']
+	return ds.selectExamplesAndSenses(copySenseLists(iterationContext['data']),
+		parser.getint('evaluation_params', 'numOfSenses'), 
+		iterationContext['selectedExamp'])
+
+def runSelectedTest(dataSelected):
+	"""
+	Predicts and scores the selected data of a test iteration with the 
+	settings set by setIterationContext.
+
+	Args:
+	dataSelected: The senses and examples selected for the iteration.
+
+	Returns:
+	A dictionary as returned by runTestIteration.
+	"""
+	context = iterationContext
+	parser = context['parser']
+	method = parser.get('evaluation_params', 'baseLineMethod')
+	accuracyMeasure = parser.get('evaluation_params', 'groupedAccuracyMeasure')
+	grouped = parser.getboolean('evaluation_params', 'grouped')
+	result = {}
+	if context['fullModel'] is not None:
+		# Both precisions predict from the same random state
+		randomState = getstate()
+		result['fullAccuracy'] = runFullPrecisionTest(parser, dataSelected, 
+			context['fullModel'], context['groupSize'], context['solver'], 
+			context['timeLimit'], context['maxIterations'], 
+			context['vocabulary'])
+		setstate(randomState)
+	if grouped and context['compareToExact']:
+		result['comparison'] = runGroupedSolverComparison(dataSelected, method,
+			context['model'], accuracyMeasure, context['groupSize'], 
+			context['solver'], context['timeLimit'], context['maxIterations'], 
+			context['vocabulary'], context['embeddingStore'], 
+			context['similarityCache'])
+		result['accuracy'] = result['comparison']['accuracy']
+	elif grouped:
+		result['accuracy'] = runGroupedTest(dataSelected, method, 
+			context['model'], accuracyMeasure, context['groupSize'], 
+			context['solver'], GroupedPredictions(context['timeLimit'], 
+			context['maxIterations'], vocabulary=context['vocabulary'], 
+			embeddingStore=context['embeddingStore'], 
+			similarityCache=context['similarityCache'], indexResults=True))
+	else:
+		result['accuracy'] = runOFMTest(dataSelected, method, context['model'],
+			context['vocabulary'], context['embeddingStore'], 
+			context['similarityCache'])
+	return result
+
+def runWordTest(task):
+	"""
+	Predicts and scores one word of a test iteration with the settings set by
+	setIterationContext.
+
+	Args:
+	task: A tuple of the word, the random seed of the word and the word's 
+	selected senses.
+
+	Returns:
+	A pair of the word and a dictionary as returned by runTestIteration.
+	"""
+	key, wordSeed, senses = task
+	seed(wordSeed)
+	return key, runSelectedTest({key:senses})
+
+def getWordTasks(dataSelected, iterationSeed):
+	"""
+	Splits the selected data of a test iteration into a task for each word,
+	ordered so the words expected to take the longest are predicted first.
+
+	Args:
+	dataSelected: The senses and examples selected for the iteration.
+	iterationSeed: The random seed of the iteration.
+
+	Returns:
+	A list of the tasks as given to runWordTest.
+	"""
+	parser = iterationContext['parser']
+	grouped = parser.getboolean('evaluation_params', 'grouped')
+	costs = {}
+	for key in dataSelected:
+		groupSizes = [len(sense['examples']) for sense in dataSelected[key]]
+		costs[key] = estimateWordCost([example for sense in dataSelected[key] 
+			for example in sense['examples']], grouped, groupSizes, 
+			iterationContext['solver'])
+	seeds = getWordSeeds(iterationSeed, dataSelected.keys())
+	return [(key, seeds[key], dataSelected[key]) for key in orderByCost(costs)]
+
+def runShardedIterations(context, iterationSeeds, workers=1):
+	"""
+	Runs the test iterations of an evaluation one after another, sharding 
+	the words of each iteration across a pool of worker processes. Each word
+	is predicted alone with its own seed, so the results are the same for 
+	any number of workers.
+
+	Args:
+	context: A dictionary as given to runTestIterations.
+	iterationSeeds: A list of the random seed of each iteration.
+	workers: The number of processes to predict the words in.
+
+	Returns:
+	A list of the results of each iteration in order, as returned by 
+	runTestIteration.
+	"""
+	setIterationContext(context)
+	pool = None
+	if workers > 1:
+		pool = Pool(workers, setIterationContext, (context,))
+	try:
+		results = []
+		for iterationSeed in iterationSeeds:
+			seed(iterationSeed)
+			tasks = getWordTasks(selectIterationData(), iterationSeed)
+			if pool is None:
+				wordResults = map(runWordTest, tasks)
+			else:
+				wordResults = pool.imap_unordered(runWordTest, tasks)
+			results.append(mergeWordResults(dict(wordResults)))
+		return results
+	finally:
+		if pool is not None:
+			pool.close()
+			pool.join()
+
+def runTestIterations(context, iterationSeeds, workers=1):
+	"""
+	Runs the test iterations of an evaluation, in a pool of worker processes
+	if more than one worker is given. The context is handed to each worker 
+	once when it starts rather than with every iteration. Each iteration 
+	starts from its own seed and the unchanged dataset, so the results are 
+	the same for any number of workers.
+
+	Args:
+	context: A dictionary with key 'parser' holding the ConfigParser that has 
+	read the config file, 'data' the preprocessed dataset, 'model', 
+	'fullModel', 'vocabulary', 'embeddingStore' and 'similarityCache' as 
+	loaded for the evaluation or None, 'selectedExamp' the number of examples
+	selected from each sense, 'groupSize', 'solver', 'timeLimit' and 
+	'maxIterations' the grouping settings, 'compareToExact' a boolean and 
+	optionally 'shardWords' a boolean to shard the words of each iteration 
+	across the workers instead of running whole iterations in each.
+	iterationSeeds: A list of the random seed of each iteration.
+	workers: The number of processes to run the iterations in.
+
+	Returns:
+	A list of the results of runTestIteration for each iteration in order.
+	"""
+	if context.get('shardWords'):
+		return runShardedIterations(context, iterationSeeds, workers)
+	if workers <= 1 or len(iterationSeeds) <= 1:
+		setIterationContext(context)
+		return [runTestIteration(iterationSeed) 
+			for iterationSeed in iterationSeeds]
+	pool = Pool(min(workers, len(iterationSeeds)), setIterationContext, 
+		(context,))
+	try:
+		return pool.map(runTestIteration, iterationSeeds, chunksize=1)
+	finally:
+		pool.close()
+		pool.join()
+
+def runFullPrecisionTest(parser, data, model, groupSize, solver, 
+	timeLimit=None, maxIterations=None, vocabulary=None):
+	"""
+	Runs the grouped or select one sentence from many options evaluation 
+	problem set in the configuration file with the full precision model, to
+	compare with the accuracy of the same test with quantised vectors.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file.
+	data: The data to perform the prediction on.
+	model: The full precision word2vec model.
+	groupSize: The number of examples in each sense group or None.
+	solver: The grouping solver to use.
+	timeLimit: The number of seconds the solver may spend on each word or None.
+	maxIterations: The number of iterations the solver may run for each word 
+	or None.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+
+	Returns:
+	The accuracy as a float.
+	"""
+	method = parser.get('evaluation_params', 'baseLineMethod')
+	if parser.getboolean('evaluation_params', 'grouped'):
+		return runGroupedTest(data, method, model, 
+			parser.get('evaluation_params', 'groupedAccuracyMeasure'), 
+			groupSize, solver, GroupedPredictions(timeLimit, maxIterations, 
+			vocabulary=vocabulary, indexResults=True))
+	return runOFMTest(data, method, model, vocabulary)
+
+def loadModel(parser, data, vocabulary=None):
+	"""
+	Loads the word2vec model from the binary file set by word2vecBin, or if 
+	word2vecSidecar is set a model holding only the vectors of the tokens in 
+	the data from a sidecar of the binary. The embeddingBackend key selects
+	whether the vectors are loaded into memory by gensim or memory-mapped.
+
+	Args:
+	parser: Is a ConfigParser that has read the config file.
+	data: The preprocessed data the model is needed for.
+	vocabulary: The TokenVocabulary the data's tokens were interned with or 
+	None.
+
+	Returns:
+	The word2vec model or EmbeddingBackend.
+	"""
+	word2vecBin = parser.get('evaluation_params', 'word2vecBin')
+	sidecarPath = parser.get('evaluation_params', 'word2vecSidecar')
+	backend = parser.get('evaluation_params', 'embeddingBackend')
+	if sidecarPath:
+		tokens = getDatasetTokens(data, vocabulary)
+		if backend == 'gensim':
+			return loadRestrictedModel(word2vecBin, sidecarPath, tokens)
+		updateSidecarModel(word2vecBin, sidecarPath, tokens)
+		return loadMatrixBackend(sidecarPath)
+	if backend == 'mmap':
+		return loadGensimBackend(word2vecBin)
+	if backend == 'matrix':
+		return convertToMatrixBackend(word2vecBin)
+	return Word2Vec.load_word2vec_format(word2vecBin, binary=True)
 
 def main(argv):
 	"""
@@ -86,7 +560,7 @@ def main(argv):
 	is used to set the parameters of the evaluation.
 	"""
 	startTime  = time.time()
-	parser = SafeConfigParser()
+	parser = SafeConfigParser(optionalDefaults)
 	parser.read(argv[0])
 	
 	validConfig = validateConfigFile(parser)
@@ -99,7 +573,7 @@ def main(argv):
 	try:
 		evaluationData = sl.loadDataFromFile('dictionaryData/' + dictionaryDataPath)
 	except IOError as err:
-		print(dictionaryDataParth + ' can not be found in the dictionaryData directory.')
+		print(dictionaryDataPath + ' can not be found in the dictionaryData directory.')
 		exit()	
 	
 	evaluationData = ds.selectPoS(evaluationData, parser.get('evaluation_params', 'pos'))
@@ -112,38 +586,184 @@ def main(argv):
 	evaluationData = ds.removeStopwordsAndPunct(evaluationData, 
 		parser.getboolean('evaluation_params', 'rmStopwords'), 
 		parser.getboolean('evaluation_params', 'rmPunct'))
+	vocabulary = None
+	if parser.getboolean('evaluation_params', 'internTokens'):
+		evaluationData, vocabulary = ds.internTokens(evaluationData)
 
-	print(len(evaluationData))
-	"""
 	model = None
-	if 'word2vec' in parser.get('evaluation_params', 'baseLineMethod'):
-		model = Word2Vec.load_word2vec_format(parser.get('evaluation_params', 
-			'word2vecBin'), binary=True)
+	fullModel = None
+	embeddingStore = None
+	method = parser.get('evaluation_params', 'baseLineMethod')
+	storeDir = parser.get('evaluation_params', 'embeddingStore')
+	precision = parser.get('evaluation_params', 'embeddingPrecision')
+	retrieval = parser.getboolean('evaluation_params', 'retrieval')
+	exhaustive = parser.getboolean('evaluation_params', 'exhaustiveOFM')
+	# Comparing precisions needs both models, the store would hide the change
+	comparePrecision = parser.getboolean('evaluation_params', 
+		'comparePrecision') and precision != 'float32' and \
+		getPredictionMethod(method).usesModel and not retrieval and \
+		not exhaustive
+	if storeDir and getPredictionMethod(method).usesEmbeddingStore and \
+		not comparePrecision:
+		# Sentence vectors come from the store, the model is only loaded to 
+		# embed sentences the store does not have yet
+		storeKey = getStoreKey(parser.get('evaluation_params', 'word2vecBin'),
+			parser.getboolean('evaluation_params', 'lemmatize'),
+			parser.getboolean('evaluation_params', 'rmStopwords'),
+			parser.getboolean('evaluation_params', 'rmPunct'),
+			'dictionaryData/' + dictionaryDataPath, precision)
+		embeddingStore = loadEmbeddingStore(storeDir, storeKey)
+		examples = getDatasetExamples(evaluationData)
+		if embeddingStore is not None:
+			examples = embeddingStore.getMissingExamples(examples)
+		if embeddingStore is None or examples:
+			model = quantiseBackend(loadModel(parser, evaluationData, vocabulary),
+				precision)
+			embeddingStore = saveEmbeddingStore(examples, model, storeDir, 
+				storeKey, embeddingStore, vocabulary)
+		if embeddingStore.noVectorSents:
+			print('{} examples have no tokens in the word2vec model.'.format(
+				len(embeddingStore.noVectorSents)))
+	elif getPredictionMethod(method).usesModel:
+		fullModel = loadModel(parser, evaluationData, vocabulary)
+		model = quantiseBackend(fullModel, precision)
+		if precision != 'float32':
+			print('Vector bytes: float32 {} {} {}'.format(
+				getEmbeddingBackend(fullModel).getVectorBytes(), precision,
+				model.getVectorBytes()))
+		if not comparePrecision:
+			fullModel = None
 
 	if len(evaluationData) < 1:
 		print('Insufficient data to run evaluation. Try lowering the number ' + 
 			'of sense or examples required and try again.')
 		exit()		
 
+	solver = parser.get('evaluation_params', 'groupingSolver')
+	timeLimit = parser.getfloat('evaluation_params', 'solverTimeLimit') or None
+	maxIterations = parser.getint('evaluation_params', 'solverIterations') or None
+	compareToExact = parser.getboolean('evaluation_params', 'compareToExact') \
+		and solver in GroupedPredictions.heuristicSolvers and \
+		parser.get('evaluation_params', 'baseLineMethod') != 'random' and \
+		not parser.getboolean('evaluation_params', 'unequalGroups')
+
+	# With unequal groups each sense keeps up to maxExamp examples and is 
+	# grouped at its own size
+	groupSize = parser.getint('evaluation_params', 'numOfExamp')
+	selectedExamp = groupSize
+	if parser.getboolean('evaluation_params', 'unequalGroups'):
+		groupSize = None
+		selectedExamp = parser.getint('evaluation_params', 'maxExamp')
+
+	# The random method's expected accuracy has a closed form, so it is not
+	# sampled unless asked for
+	if method == 'random' and \
+		parser.get('evaluation_params', 'randomBaseline') == 'analytic':
+		expected, variance = expectedRandomAccuracy(evaluationData, 
+			parser.getint('evaluation_params', 'numOfSenses'), selectedExamp,
+			parser.getboolean('evaluation_params', 'grouped'),
+			parser.get('evaluation_params', 'groupedAccuracyMeasure'))
+		print('Expected average: {}'.format(expected))
+		print('Standard deviation: {}'.format(sqrt(variance)))
+		print("{} seconds".format(time.time() - startTime))
+		return
+
+	# Every problem of each word is scored from one matrix of the similarity
+	# of its examples, so no iterations are sampled
+	if exhaustive:
+		report = runExhaustiveOFMTest(evaluationData, method, 
+			parser.getint('evaluation_params', 'numOfSenses'), model, vocabulary,
+			embeddingStore)
+		print('Problems scored: {} of {} words'.format(report['questions'],
+			report['words']))
+		print('Expected average: {}'.format(report['accuracy']))
+		print('Standard deviation: {}'.format(sqrt(report['variance'])))
+		print("{} seconds".format(time.time() - startTime))
+		return
+
+	# Every pair of each word's examples is scored once for all iterations
+	similarityCache = None
+	if parser.getboolean('evaluation_params', 'similarityCache') and \
+		method != 'random' and not retrieval:
+		similarityCache = buildSimilarityCache(evaluationData, method, model, 
+			vocabulary, embeddingStore)
+
+	# The retrieval evaluation ranks every example of the dictionary, so their
+	# sentence vectors are indexed once for all iterations
+	if retrieval:
+		retrievalData = createRetrievalData(evaluationData)
+		retrievalKs = getRetrievalKs(parser)
+		retrievalIndices = buildRetrievalIndices(parser, retrievalData, model, 
+			vocabulary, embeddingStore)
+
 	total = []	
-	for i in range(parser.getint('evaluation_params', 'testItterations')):	
-		dataSelected = ds.selectExamplesAndSenses(evaluationData, 
-			parser.getint('evaluation_params', 'numOfSenses'), 
-			parser.getint('evaluation_params', 'numOfExamp'))
-		if parser.getboolean('evaluation_params', 'grouped'):
-			total.append(runGroupedTest(dataSelected, 
-				parser.get('evaluation_params', 'baseLineMethod'), model, 
-				parser.get('evaluation_params', 'groupedAccuracyMeasure')))
-		else:
-			total.append(runOFMTest(dataSelected, 
-				parser.get('evaluation_params', 'baseLineMethod'), model))			
+	comparisons = []
+	fullTotal = []
+	retrievalReports = []
+	iterations = parser.getint('evaluation_params', 'testItterations')
+	if retrieval:
+		# Queries are timed so the iterations are run one at a time
+		for i in range(iterations):	
+			retrievalReports.append(runRetrievalTest(retrievalData, 
+				retrievalIndices, retrievalKs))
+			total.append(retrievalReports[-1][retrievalIndices[-1][0]]['recall']
+				[retrievalKs[0]])
+	else:
+		context = {'parser':parser, 'data':evaluationData, 'model':model, 
+			'fullModel':fullModel, 'vocabulary':vocabulary, 
+			'embeddingStore':embeddingStore, 'similarityCache':similarityCache,
+			'selectedExamp':selectedExamp, 'groupSize':groupSize, 
+			'solver':solver, 'timeLimit':timeLimit, 
+			'maxIterations':maxIterations, 'compareToExact':compareToExact,
+			'shardWords':parser.getboolean('evaluation_params', 'shardWords')}
+		for result in runTestIterations(context, getIterationSeeds(
+			parser.getint('evaluation_params', 'seedNo'), iterations),
+			parser.getint('evaluation_params', 'workers')):
+			total.append(result['accuracy'])
+			if 'comparison' in result:
+				comparisons.append(result['comparison'])
+			if 'fullAccuracy' in result:
+				fullTotal.append(result['fullAccuracy'])
 			
 	print('Average: {}'.format(mean(total)))
 	print('Maximum: {}'.format(max(total)))
 	print('Minimum: {}'.format(min(total)))
 	print('Standard deviation: {}'.format(std(total)))
+	skippedGaps = sum(c['skipped'] for c in comparisons)
+	comparisons = [c for c in comparisons if c['words']]
+	if skippedGaps:
+		print('Words with too many examples to solve exactly: {}'.format(
+			skippedGaps))
+	if comparisons:
+		print('Exact solver average: {}'.format(mean([c['exactAccuracy'] 
+			for c in comparisons])))
+		print('Mean optimality gap: {}'.format(mean([c['meanGap'] 
+			for c in comparisons])))
+		print('Maximum optimality gap: {}'.format(max(c['maxGap'] 
+			for c in comparisons)))
+		print('{} solver seconds: {} Exact solver seconds: {}'.format(solver,
+			sum(c['seconds'] for c in comparisons), 
+			sum(c['exactSeconds'] for c in comparisons)))
+	if fullTotal:
+		changes = [accuracy - fullAccuracy for accuracy, fullAccuracy 
+			in zip(total, fullTotal)]
+		print('Full precision average: {}'.format(mean(fullTotal)))
+		print('Mean accuracy change with {}: {}'.format(precision, 
+			mean(changes)))
+		print('Largest accuracy change with {}: {}'.format(precision, 
+			max(changes, key=abs)))
+	for name, index in (retrievalIndices if retrieval else []):
+		reports = [report[name] for report in retrievalReports]
+		for k in retrievalKs:
+			print('{} recall@{}: {}'.format(name, k, mean([report['recall'][k] 
+				for report in reports])))
+		print('{} milliseconds per query: {}'.format(name, 1000 * 
+			sum(report['seconds'] for report in reports) / 
+			sum(report['queries'] for report in reports)))
+		if name == 'lsh':
+			print('lsh candidates scored per query: {}'.format(mean(
+				[report['candidates'] for report in reports])))
 	print("{} seconds".format(time.time() - startTime))
-	"""
 if __name__ == '__main__':
 	main(argv[1:])		
 		
@@ -0,0 +1,173 @@
+from numpy import arange
+from numpy import asarray
+from numpy import float64
+from numpy import inf
+from numpy import isnan
+from numpy import sort
+from numpy import where
+from numpy import zeros
+from predictionMethods import getPredictionMethod
+from randomBaseline import binomial
+
+def getExamplePools(dataset):
+	"""
+	Gathers every example of each word of a dataset with the sense each
+	belongs to.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'.
+
+	Returns:
+	A dictionary with the same keys holding the list of the word's examples
+	sense by sense, and a dictionary with the same keys holding an array of
+	the position of the sense of each example.
+	"""
+	examplesByKey = {}
+	labelsByKey = {}
+	for key in dataset:
+		examplesByKey[key] = [example for sense in dataset[key]
+			for example in sense['examples']]
+		labelsByKey[key] = asarray([senseNum for senseNum, sense
+			in enumerate(dataset[key]) for example in sense['examples']])
+	return examplesByKey, labelsByKey
+
+def getWordOFMAccuracy(similarityValues, labels, numOptions, minValue):
+	"""
+	Gives the exact expected accuracy of a prediction method on the select one
+	sentence from many options problems of a word, over every problem the
+	random selection of senses and examples can give. The query sense is any
+	of the word's senses, the query any of its examples, the correct option
+	any other example of the sense and the other options one example of each
+	of any numOptions - 1 of the other senses. The best scored option is
+	chosen, between equally scored best options at random. Senses with one
+	example are only ever other options.
+
+	The other options are independent, so for a query and correct option the
+	chance the correct option is chosen is the integral over z from 0 to 1 of
+	the sum, over every choice of the other senses, of the product for each
+	chosen sense of the fraction of its examples scored worse than the correct
+	option plus z times the fraction scored the same. The sum over choices is
+	an elementary symmetric polynomial of those linear polynomials, built one
+	sense at a time for every correct option of a query at once.
+
+	Args:
+	similarityValues: The matrix of scores between every pair of the word's
+	examples.
+	labels: An array of the sense of each example.
+	numOptions: The number of options of each problem, the number of senses
+	selected.
+	minValue: Boolean to indicate if the smallest score or largest marks the
+	most similar option. As when predicting, NaN scores are the worst scores
+	if the smallest is best and the best scores otherwise.
+
+	Returns:
+	The expected accuracy as a float.
+	"""
+	scores = asarray(similarityValues, dtype=float64)
+	scores = where(isnan(scores), inf, scores)
+	if minValue:
+		scores = -scores
+	labels = asarray(labels)
+	senses = sorted(set(labels.tolist()))
+	membersBySense = dict((sense, (labels == sense).nonzero()[0])
+		for sense in senses)
+	numOthers = numOptions - 1
+	choices = float(binomial(len(senses) - 1, numOthers))
+	senseAccuracies = []
+	for sense in senses:
+		members = membersBySense[sense]
+		if len(members) < 2:
+			# No example of the sense can be a correct option
+			continue
+		queryAccuracies = []
+		for query in members:
+			correctScores = scores[query, members[members != query]]
+			# polynomials[k] holds the coefficients of the elementary symmetric
+			# polynomial of degree k for each correct option
+			polynomials = zeros((numOthers + 1, len(correctScores),
+				numOthers + 1))
+			polynomials[0, :, 0] = 1
+			for otherSense in senses:
+				if otherSense == sense:
+					continue
+				otherScores = sort(scores[query, membersBySense[otherSense]])
+				worse = otherScores.searchsorted(correctScores, 'left')
+				same = otherScores.searchsorted(correctScores, 'right') - worse
+				worse = (worse / float(len(otherScores))).reshape(1, -1, 1)
+				same = (same / float(len(otherScores))).reshape(1, -1, 1)
+				previous = polynomials[:-1].copy()
+				polynomials[1:] += worse * previous
+				polynomials[1:, :, 1:] += same * previous[:, :, :-1]
+			probabilities = (polynomials[numOthers] /
+				arange(1, numOthers + 2)).sum(axis=1) / choices
+			queryAccuracies.append(probabilities.mean())
+		senseAccuracies.append(sum(queryAccuracies) / len(queryAccuracies))
+	return sum(senseAccuracies) / len(senseAccuracies)
+
+def getOFMQuestionNum(labels, numOptions):
+	"""
+	Gives the number of different select one sentence from many options
+	problems of a word, each query and correct option with every choice of
+	one example from each of numOptions - 1 other senses.
+	"""
+	sizes = [int((asarray(labels) == sense).sum()) for sense in
+		sorted(set(asarray(labels).tolist()))]
+	questions = 0
+	for senseNum, size in enumerate(sizes):
+		others = sizes[:senseNum] + sizes[senseNum + 1:]
+		# The sums of products of every choice of the other senses' sizes
+		products = [1] + [0] * (numOptions - 1)
+		for otherSize in others:
+			for k in range(numOptions - 1, 0, -1):
+				products[k] += otherSize * products[k - 1]
+		questions += size * (size - 1) * products[numOptions - 1]
+	return questions
+
+def runExhaustiveOFMTest(dataset, method, numOptions, model=None,
+	vocabulary=None, embeddingStore=None):
+	"""
+	Evaluates a prediction method on every select one sentence from many
+	options problem of each word of a dataset, scoring them all from one
+	similarity matrix per word rather than sampling problems over many test
+	iterations.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'. Every word must have
+	at least numOptions senses and every sense at least 2 examples.
+	method: The name of a registered select one sentence from many options
+	prediction method.
+	numOptions: The number of options of each problem.
+	model: A trained word2vec model or EmbeddingBackend if the method uses one
+	else None.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+	embeddingStore: A SentenceEmbeddingStore holding the sentence vectors of
+	the examples or None.
+
+	Returns:
+	A dictionary with key 'accuracy', the expected accuracy of a sampled test
+	iteration, key 'variance', the variance of a sampled iteration's
+	accuracy, key 'words', the number of words, and key 'questions', the
+	number of problems scored.
+	"""
+	examplesByKey, labelsByKey = getExamplePools(dataset)
+	predictionMethod = getPredictionMethod(method)
+	if method == 'random':
+		# Every option scored the same is chosen at random
+		similarityByKey = dict((key, zeros((len(examplesByKey[key]),) * 2))
+			for key in examplesByKey)
+	else:
+		similarityByKey = predictionMethod.scoreMatrices(examplesByKey, model,
+			vocabulary, embeddingStore)
+	accuracies = [getWordOFMAccuracy(similarityByKey[key], labelsByKey[key],
+		numOptions, predictionMethod.minValue) for key in examplesByKey]
+	# Each word of a sampled iteration is correct with its expected accuracy
+	return {'accuracy':sum(accuracies) / len(accuracies),
+		'variance':sum(accuracy * (1 - accuracy) for accuracy in accuracies) /
+		float(len(accuracies) ** 2), 'words':len(accuracies),
+		'questions':sum(getOFMQuestionNum(labelsByKey[key], numOptions)
+		for key in labelsByKey)}
@@ -0,0 +1,817 @@
+from itertools import combinations
+from time import time
+from numpy import arange
+from numpy import argsort
+from numpy import array
+from numpy import asarray
+from numpy import concatenate
+from numpy import empty
+from numpy import fill_diagonal
+from numpy import flatnonzero
+from numpy import full
+from numpy import inf
+from numpy import int8
+from numpy import int16
+from numpy import int32
+from numpy import int64
+from numpy import ix_
+from numpy import searchsorted
+from numpy import where
+from numpy import zeros
+from numpy.random import RandomState
+from scipy.special import comb
+from weightedMatching import maxWeightMatching
+
+# Partition templates keyed by (exampleNum, groupSize). Built once and shared
+# by every word and every test iteration.
+_partitionTemplateCache = {}
+_subsetTemplateCache = {}
+
+# The largest number of examples the subset dynamic programming solves. It 
+# holds a score for every subset of the examples, 8MB for 20 examples, and
+# takes about a second to group 20 examples into 4 or 5 groups.
+maxSubsetExamples = 20
+
+def getPartitionTemplates(exampleNum, groupSize):
+	"""
+	Returns every distinct way of splitting the positions range(exampleNum) into
+	groups of groupSize. The templates are built the first time they are asked
+	for and cached so that they can be reused for every word.
+
+	Args:
+	exampleNum: The number of examples to be grouped.
+	groupSize: The number of examples in each group.
+
+	Returns:
+	A read only integer array of shape (numPartitions, numGroups, groupSize).
+	Each entry along the first axis is one partition with each row being a
+	group of example positions.
+	"""
+	key = (exampleNum, groupSize)
+	if key not in _partitionTemplateCache:
+		templates = createPartitionTemplates(exampleNum, groupSize)
+		templates.setflags(write=False)
+		_partitionTemplateCache[key] = templates
+	return _partitionTemplateCache[key]
+
+def createPartitionTemplates(exampleNum, groupSize):
+	"""
+	Enumerates each partition of range(exampleNum) into groups of groupSize
+	exactly once. The lowest unused position always starts the next group so
+	no partition can be produced twice in a different group order, removing
+	the need for any de-duplication.
+
+	Args:
+	exampleNum: The number of examples to be grouped, must be a multiple of
+	groupSize.
+	groupSize: The number of examples in each group.
+
+	Returns:
+	An integer array of shape (numPartitions, numGroups, groupSize).
+	"""
+	if groupSize < 1 or exampleNum % groupSize != 0:
+		raise ValueError('{} examples can not be split into groups of size {}.'
+			.format(exampleNum, groupSize))
+	dtype = int8 if exampleNum <= 127 else int16
+	if exampleNum == 0:
+		return zeros((1, 0, groupSize), dtype=dtype)
+
+	subTemplates = getPartitionTemplates(exampleNum - groupSize, groupSize)
+	blocks = []
+	for companions in combinations(range(1, exampleNum), groupSize - 1):
+		firstGroup = array((0,) + companions, dtype=dtype)
+		remaining = array([i for i in range(1, exampleNum) if i not in companions],
+			dtype=dtype)
+		block = empty((len(subTemplates), exampleNum // groupSize, groupSize),
+			dtype=dtype)
+		block[:, 0, :] = firstGroup
+		block[:, 1:, :] = remaining[subTemplates]
+		blocks.append(block)
+	return concatenate(blocks)
+
+def scorePartitions(similarityValues, templates):
+	"""
+	Scores every partition in templates by summing, for each group, the
+	similarity between every ordered pair of its examples (including each
+	example against itself) as GroupedPredictions.calculateGroupScore does.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	templates: An array of partitions as returned by getPartitionTemplates.
+
+	Returns:
+	An array holding the score of each partition.
+	"""
+	similarityValues = asarray(similarityValues, dtype=float)
+	groupSize = templates.shape[2]
+	scores = zeros(len(templates))
+	for a in range(groupSize):
+		for b in range(groupSize):
+			scores += similarityValues[templates[:, :, a], templates[:, :, b]].sum(axis=1)
+	return scores
+
+def getSubsetTemplates(exampleNum, groupSize):
+	"""
+	Returns every group of groupSize example positions along with each 
+	partition from getPartitionTemplates written as indices into those groups.
+	As there are far fewer distinct groups than partitions each group only has
+	to be scored once. Cached in the same way as the partition templates.
+
+	Args:
+	exampleNum: The number of examples to be grouped.
+	groupSize: The number of examples in each group.
+
+	Returns:
+	A tuple of two read only integer arrays. The first of shape 
+	(numSubsets, groupSize) holds every group of positions in increasing 
+	order. The second of shape (numPartitions, numGroups) holds for each 
+	partition the index of each of its groups in the first array.
+	"""
+	key = (exampleNum, groupSize)
+	if key not in _subsetTemplateCache:
+		templates = getPartitionTemplates(exampleNum, groupSize)
+		# Subsets are listed in colex order so that the rank of a sorted group
+		# c0 < c1 < ... is the sum of comb(ci, i + 1)
+		subsets = array(sorted(combinations(range(exampleNum), groupSize), 
+			key=lambda subset: subset[::-1]), dtype=int32).reshape(-1, groupSize)
+		binomials = array([[comb(value, i + 1, exact=True) 
+			for i in range(groupSize)] for value in range(exampleNum)], 
+			dtype=int32)
+		partitionSubsets = binomials[templates, arange(groupSize)].sum(axis=2, 
+			dtype=int32)
+		subsets.setflags(write=False)
+		partitionSubsets.setflags(write=False)
+		_subsetTemplateCache[key] = (subsets, partitionSubsets)
+	return _subsetTemplateCache[key]
+
+def scoreSubsetsBatch(similarityBatch, subsets):
+	"""
+	Scores every group in subsets for every word at once by summing the upper
+	triangle of each word's folded similarity matrix over the pairs in the 
+	group. The diagonal is left out as every partition includes it once.
+
+	Args:
+	similarityBatch: An array of shape (numWords, exampleNum, exampleNum) 
+	holding each word's similarity matrix.
+	subsets: An array of groups as returned by getSubsetTemplates.
+
+	Returns:
+	An array of shape (numWords, numSubsets) holding the score of each group
+	for each word.
+	"""
+	similarityBatch = asarray(similarityBatch, dtype=float)
+	pairWeights = similarityBatch + similarityBatch.transpose(0, 2, 1)
+	scores = zeros((len(similarityBatch), len(subsets)))
+	groupSize = subsets.shape[1]
+	for a in range(groupSize):
+		for b in range(a + 1, groupSize):
+			scores += pairWeights[:, subsets[:, a], subsets[:, b]]
+	return scores
+
+def solveGroupingsBatch(similarityBatch, groupSize, minValue, randomState=None,
+	maxElements=2**22):
+	"""
+	Finds the best grouping for many words at once by scoring every partition
+	for every word from the group scores with a single gather and sum. Words 
+	are worked through in chunks so that no more than maxElements partition 
+	scores are held at a time.
+
+	Args:
+	similarityBatch: An array of shape (numWords, exampleNum, exampleNum) 
+	holding each word's similarity matrix.
+	groupSize: The number of examples in a group.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+	randomState: A numpy RandomState used to pick between equally scored 
+	partitions, if None the first best partition is taken.
+	maxElements: The largest number of partition scores to hold at once.
+
+	Returns:
+	An integer array of shape (numWords, numGroups, groupSize) holding the 
+	best partition of example positions for each word.
+	"""
+	similarityBatch = asarray(similarityBatch, dtype=float)
+	exampleNum = similarityBatch.shape[1]
+	subsets, partitionSubsets = getSubsetTemplates(exampleNum, groupSize)
+	subsetScores = scoreSubsetsBatch(similarityBatch, subsets)
+	if minValue:
+		subsetScores = -subsetScores
+	chunkSize = max(1, maxElements // len(partitionSubsets))
+	best = empty(len(similarityBatch), dtype=int)
+	for start in range(0, len(similarityBatch), chunkSize):
+		chunk = subsetScores[start:start + chunkSize]
+		partitionScores = zeros((len(chunk), len(partitionSubsets)))
+		for group in range(partitionSubsets.shape[1]):
+			partitionScores += chunk[:, partitionSubsets[:, group]]
+		best[start:start + chunkSize] = argmaxWithTies(partitionScores, 
+			randomState)
+	return getPartitionTemplates(exampleNum, groupSize)[best]
+
+def argmaxWithTies(scores, randomState=None):
+	"""
+	Finds the index of the largest score in each row, picking uniformly at 
+	random between scores that are equal.
+
+	Args:
+	scores: A two dimensional array of scores.
+	randomState: A numpy RandomState used to break ties, if None the first 
+	largest score is taken.
+
+	Returns:
+	An integer array holding the selected index for each row.
+	"""
+	if randomState is None:
+		return scores.argmax(axis=1)
+	best = scores.max(axis=1)
+	tied = scores >= (best - 1e-9 * (abs(best) + 1))[:, None]
+	return where(tied, randomState.random_sample(scores.shape), -1).argmax(axis=1)
+
+def getPairWeights(similarityValues, minValue):
+	"""
+	Folds a similarity matrix into symmetric pair weights so that a grouping
+	can be scored from the upper triangle alone. Every example is always in 
+	exactly one group so the diagonal adds the same amount to every grouping
+	and is dropped. When minValue is True the weights are negated so that all
+	solvers can maximise.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+
+	Returns:
+	A symmetric array with a zero diagonal where entry [i][j] is the weight
+	gained by placing examples i and j in the same group.
+	"""
+	similarityValues = asarray(similarityValues, dtype=float)
+	weights = similarityValues + similarityValues.T
+	fill_diagonal(weights, 0)
+	if minValue:
+		weights = -weights
+	return weights
+
+def groupingScore(similarityValues, grouping):
+	"""
+	Scores a single grouping in the same way as scorePartitions.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	grouping: A list of groups, each group being a list of example positions.
+
+	Returns:
+	The total score of the grouping.
+	"""
+	similarityValues = asarray(similarityValues, dtype=float)
+	return sum(similarityValues[ix_(group, group)].sum() for group in grouping)
+
+def pairScore(weights, grouping):
+	"""
+	Scores a grouping from pair weights, counting each pair in a group once.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	grouping: A list of groups, each group being a list of example positions.
+
+	Returns:
+	The total pair weight of the grouping, larger is better.
+	"""
+	return sum(weights[ix_(group, group)].sum() / 2 for group in grouping)
+
+def getHeuristicGroupSizes(exampleNum, groupSize):
+	"""
+	Gives the size of each group a heuristic solver has to fill.
+
+	Args:
+	exampleNum: The number of examples to group.
+	groupSize: The number of examples in a group or a list of the size of 
+	each group.
+
+	Returns:
+	A list of the size of each group.
+	"""
+	if isinstance(groupSize, list):
+		return groupSize
+	return [groupSize] * (exampleNum // groupSize)
+
+def greedyGrouping(weights, groupSize, randomState=None):
+	"""
+	Builds a grouping one group at a time. Each group is started with the 
+	lowest unassigned example, or a random one if a randomState is given, and
+	then repeatedly extended with the unassigned example that has the largest
+	weight to the examples already in the group.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	groupSize: The number of examples in a group or a list of the size of 
+	each group.
+	randomState: An optional numpy RandomState used to pick the example each
+	group is started from.
+
+	Returns:
+	A list of groups, each group being a list of example positions.
+	"""
+	unassigned = list(range(len(weights)))
+	grouping = []
+	for size in getHeuristicGroupSizes(len(weights), groupSize):
+		first = 0 if randomState is None else randomState.randint(len(unassigned))
+		group = [unassigned.pop(first)]
+		while len(group) < size:
+			gains = weights[ix_(unassigned, group)].sum(axis=1)
+			group.append(unassigned.pop(int(gains.argmax())))
+		grouping.append(group)
+	return grouping
+
+def improveBySwaps(weights, grouping):
+	"""
+	Improves a grouping by repeatedly making the swap of two examples in 
+	different groups that gives the largest gain, until no swap improves the
+	grouping. Swaps keep the size of every group.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	grouping: A list of groups, each group being a list of example positions.
+
+	Returns:
+	A new list of groups that is at least as good as the grouping given.
+	"""
+	labels = groupingToLabels(grouping)
+	tolerance = 1e-9 * (abs(weights).sum() + 1)
+	while True:
+		swapGains = getSwapGains(weights, labels)
+		best = swapGains.argmax()
+		i, j = divmod(int(best), len(labels))
+		if swapGains[i, j] <= tolerance:
+			break
+		labels[i], labels[j] = labels[j], labels[i]
+	return labelsToGrouping(labels)
+
+def getSwapGains(weights, labels):
+	"""
+	Calculates the change in grouping score from swapping every pair of 
+	examples between their groups.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	labels: An integer array giving the group of each example.
+
+	Returns:
+	An array where entry [i][j] is the gain from swapping examples i and j. 
+	Pairs already in the same group are given a gain of -inf.
+	"""
+	groupNum = labels.max() + 1
+	membership = zeros((len(labels), groupNum))
+	membership[arange(len(labels)), labels] = 1
+	toGroup = weights.dot(membership)[:, labels]
+	toOwnGroup = toGroup.diagonal()
+	gains = toGroup + toGroup.T - toOwnGroup[:, None] - toOwnGroup[None, :] \
+		- 2 * weights
+	gains[labels[:, None] == labels[None, :]] = -inf
+	return gains
+
+def groupingToLabels(grouping):
+	"""
+	Converts a list of groups of example positions to a label array.
+
+	Args:
+	grouping: A list of groups, each group being a list of example positions.
+
+	Returns:
+	An integer array giving for each example position the index of its group.
+	"""
+	labels = zeros(sum(len(group) for group in grouping), dtype=int)
+	for groupIndex, group in enumerate(grouping):
+		labels[list(group)] = groupIndex
+	return labels
+
+def labelsToGrouping(labels):
+	"""
+	Converts a label array to a list of groups of example positions.
+
+	Args:
+	labels: An integer array giving the group of each example.
+
+	Returns:
+	A list of groups, each group being a list of example positions in 
+	increasing order.
+	"""
+	return [[int(i) for i in flatnonzero(labels == groupIndex)] 
+		for groupIndex in range(labels.max() + 1)]
+
+def solveGroupingExact(similarityValues, groupSize, minValue):
+	"""
+	Finds the best grouping of the examples into groups of equal size. Pairs
+	are found by maximum weight perfect matching, which takes polynomial time
+	for any number of examples. Larger groups are found by the dynamic 
+	programming over subsets of solveGroupingSubsetDP so at most 
+	maxSubsetExamples examples can be grouped.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	groupSize: The number of examples in a group.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+
+	Returns:
+	A list of groups, each group being a list of example positions, with the
+	same optimum score as the brute force search.
+	"""
+	exampleNum = len(similarityValues)
+	if groupSize < 1 or exampleNum % groupSize != 0:
+		raise ValueError('{} examples can not be split into groups of size {}.'
+			.format(exampleNum, groupSize))
+	if groupSize == 2:
+		return solveGroupingMatching(similarityValues, minValue)
+	return solveGroupingSubsetDP(similarityValues, 
+		[groupSize] * (exampleNum // groupSize), minValue)
+
+class SearchBudget:
+	"""
+	Keeps track of how much of a wall clock or iteration budget an anytime 
+	solver has used. If neither limit is given the budget allows a single
+	iteration.
+	"""
+
+	def __init__(self, timeLimit=None, maxIterations=None):
+		"""
+		Args:
+		timeLimit: The number of seconds the solver may run for or None.
+		maxIterations: The number of iterations the solver may run or None.
+		"""
+		if timeLimit is None and maxIterations is None:
+			maxIterations = 1
+		self.timeLimit = timeLimit
+		self.maxIterations = maxIterations
+		self.iterations = 0
+		self.startTime = time()
+
+	def spend(self):
+		"""
+		Records that an iteration has been completed.
+
+		Returns:
+		True if there is budget left for another iteration else False.
+		"""
+		self.iterations += 1
+		if self.maxIterations is not None and self.iterations >= self.maxIterations:
+			return False
+		if self.timeLimit is not None and time() - self.startTime >= self.timeLimit:
+			return False
+		return True
+
+def runAnytime(weights, budget, createGrouping):
+	"""
+	Repeatedly creates groupings until the budget is used, keeping the best. 
+	At least one grouping is always created.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	budget: A SearchBudget.
+	createGrouping: A function taking the iteration number and the best 
+	grouping so far (None on the first iteration) and returning a grouping.
+
+	Returns:
+	The best grouping found.
+	"""
+	best = None
+	bestScore = None
+	while True:
+		grouping = createGrouping(budget.iterations, best)
+		score = pairScore(weights, grouping)
+		if best is None or score > bestScore:
+			best = grouping
+			bestScore = score
+		if not budget.spend():
+			return best
+
+def solveGroupingGreedy(similarityValues, groupSize, minValue, timeLimit=None,
+	maxIterations=None, randomState=None):
+	"""
+	Finds a good grouping by greedy seeding. The first iteration starts each 
+	group from the lowest unassigned example, later iterations start each 
+	group from a random one. The best grouping is kept.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	groupSize: The number of examples in a group or a list of the size of 
+	each group.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+	timeLimit: The number of seconds to search for or None.
+	maxIterations: The number of groupings to build or None.
+	randomState: A numpy RandomState used for the random starts.
+
+	Returns:
+	The best grouping found as a list of groups of example positions.
+	"""
+	weights = getPairWeights(similarityValues, minValue)
+	randomState = randomState or RandomState()
+	def createGrouping(iteration, best):
+		return greedyGrouping(weights, groupSize, 
+			None if iteration == 0 else randomState)
+	return runAnytime(weights, SearchBudget(timeLimit, maxIterations), 
+		createGrouping)
+
+def solveGroupingLocalSearch(similarityValues, groupSize, minValue, 
+	timeLimit=None, maxIterations=None, randomState=None):
+	"""
+	Finds a good grouping by pairwise swap local search. The first iteration
+	improves the greedy grouping by swaps until no swap helps. Each later
+	iteration makes a few random swaps to the best grouping so far and then
+	improves it again by swaps.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	groupSize: The number of examples in a group or a list of the size of 
+	each group.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+	timeLimit: The number of seconds to search for or None.
+	maxIterations: The number of local searches to run or None.
+	randomState: A numpy RandomState used for the random swaps.
+
+	Returns:
+	The best grouping found as a list of groups of example positions.
+	"""
+	weights = getPairWeights(similarityValues, minValue)
+	randomState = randomState or RandomState()
+	def createGrouping(iteration, best):
+		if best is None:
+			return improveBySwaps(weights, greedyGrouping(weights, groupSize))
+		labels = groupingToLabels(best)
+		for kick in range(max(2, len(best) // 2)):
+			i, j = randomState.choice(len(labels), 2, replace=False)
+			labels[i], labels[j] = labels[j], labels[i]
+		return improveBySwaps(weights, labelsToGrouping(labels))
+	return runAnytime(weights, SearchBudget(timeLimit, maxIterations), 
+		createGrouping)
+
+def solveGroupingKMedoids(similarityValues, groupSize, minValue, 
+	timeLimit=None, maxIterations=None, randomState=None):
+	"""
+	Finds a good grouping by size constrained k-medoids. Each iteration picks
+	one medoid per group, the first from the greedy grouping and later ones at
+	random, then alternates between filling each medoid's group with the 
+	examples closest to it up to the group's size and moving each medoid to 
+	the member closest to the rest of its group, until the medoids stop 
+	changing.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	groupSize: The number of examples in a group or a list of the size of 
+	each group.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+	timeLimit: The number of seconds to search for or None.
+	maxIterations: The number of medoid starts to run or None.
+	randomState: A numpy RandomState used to pick the random medoids.
+
+	Returns:
+	The best grouping found as a list of groups of example positions.
+	"""
+	weights = getPairWeights(similarityValues, minValue)
+	groupNum = len(getHeuristicGroupSizes(len(weights), groupSize))
+	randomState = randomState or RandomState()
+	def createGrouping(iteration, best):
+		if best is None:
+			medoids = [getMedoid(weights, group) 
+				for group in greedyGrouping(weights, groupSize)]
+		else:
+			medoids = list(randomState.choice(len(weights), groupNum, replace=False))
+		grouping = None
+		for step in range(len(weights)):
+			grouping = assignToMedoids(weights, medoids, groupSize)
+			newMedoids = [getMedoid(weights, group) for group in grouping]
+			if newMedoids == medoids:
+				break
+			medoids = newMedoids
+		return grouping
+	return runAnytime(weights, SearchBudget(timeLimit, maxIterations), 
+		createGrouping)
+
+def getMedoid(weights, group):
+	"""
+	Finds the member of a group with the largest total weight to the rest of
+	the group.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	group: A list of example positions.
+
+	Returns:
+	The example position of the medoid.
+	"""
+	return int(group[int(weights[ix_(group, group)].sum(axis=1).argmax())])
+
+def assignToMedoids(weights, medoids, groupSize):
+	"""
+	Assigns every example to a medoid so that each medoid gets exactly 
+	the size of its group in examples, including itself. Example and medoid pairs are taken 
+	from the largest weight down, skipping full medoids and examples already 
+	assigned.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+	medoids: A list of example positions, one per group.
+	groupSize: The number of examples in a group or a list of the size of 
+	each medoid's group.
+
+	Returns:
+	A list of groups, each group being a list of example positions.
+	"""
+	groupSizes = getHeuristicGroupSizes(len(weights), groupSize)
+	grouping = [[medoid] for medoid in medoids]
+	assigned = set(medoids)
+	toMedoid = weights[:, medoids]
+	order = argsort(-toMedoid, axis=None, kind='mergesort')
+	for flatIndex in order:
+		example, groupIndex = divmod(int(flatIndex), len(medoids))
+		if example in assigned or len(grouping[groupIndex]) == groupSizes[groupIndex]:
+			continue
+		grouping[groupIndex].append(example)
+		assigned.add(example)
+	return grouping
+
+def optimalityGap(similarityValues, grouping, groupSize, minValue, 
+	maxExactExamples=maxSubsetExamples):
+	"""
+	Measures how far a grouping is from the best possible grouping found by
+	solveGroupingExact, or by solveGroupingMatching for pairs. The exact 
+	solver is only run when there are at most maxExactExamples examples, by
+	default the most it can group.
+
+	Args:
+	similarityValues: A square list of lists or array of similarity scores
+	between all examples.
+	grouping: A list of groups, each group being a list of example positions.
+	groupSize: The number of examples in a group.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+	maxExactExamples: The largest number of examples to run the exact solver
+	on, pairs are always matched.
+
+	Returns:
+	None if the exact solver was not run, otherwise a dictionary with keys 
+	'score' and 'optimum' holding the pair scores of the grouping and of the 
+	best grouping (larger is better), 'gap' holding the shortfall as a 
+	fraction of the size of the optimum and 'optimumGrouping' holding the 
+	best grouping.
+	"""
+	if groupSize == 2:
+		optimumGrouping = solveGroupingMatching(similarityValues, minValue)
+	elif len(similarityValues) > maxExactExamples:
+		return None
+	else:
+		optimumGrouping = solveGroupingExact(similarityValues, groupSize, minValue)
+	weights = getPairWeights(similarityValues, minValue)
+	score = pairScore(weights, grouping)
+	optimum = pairScore(weights, optimumGrouping)
+	gap = optimum - score
+	if optimum != 0:
+		gap /= abs(optimum)
+	return {'score':score, 'optimum':optimum, 'gap':max(gap, 0.0), 
+		'optimumGrouping':optimumGrouping}
+
+def solveGroupingSubsetDP(similarityValues, groupSizes, minValue, 
+	maxElements=2**22):
+	"""
+	Finds the best grouping of examples into groups of the given, possibly 
+	unequal, sizes by dynamic programming over subsets of the examples. Groups
+	are filled in order of size. For every subset of examples that the 
+	remaining groups could hold, the best way to group it is found once from
+	the best ways to group its subsets, so the work grows with the number of 
+	subsets rather than the number of groupings. The score of every subset is
+	held in memory so at most maxSubsetExamples examples can be grouped.
+
+	Args:
+	similarityValues: A list of lists of size equal to the number of 
+	examples, holding a similarity scoring between all pairs of examples.
+	groupSizes: A list with the size of each group, summing to the number of
+	examples.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+	maxElements: The largest number of candidate groups scored in one step.
+
+	Returns:
+	The best grouping as a list of groups of example positions.
+	"""
+	exampleNum = len(similarityValues)
+	if sum(groupSizes) != exampleNum or min(groupSizes) < 1:
+		raise ValueError('Group sizes {} can not group {} examples.'.format(
+			groupSizes, exampleNum))
+	if exampleNum > maxSubsetExamples:
+		raise ValueError('At most {} examples can be grouped by subsets, not {}.'
+			.format(maxSubsetExamples, exampleNum))
+	sizes = sorted(groupSizes)
+	subsetScores = getSubsetScores(getPairWeights(similarityValues, minValue))
+	bits = 1 << arange(exampleNum, dtype=int64)
+
+	# Work back from the last group, finding the best way to group every subset
+	# the remaining groups could hold
+	bestScores = subsetScores
+	levels = []
+	for level in range(len(sizes) - 2, -1, -1):
+		size = sizes[level]
+		remaining = sum(sizes[level:])
+		pool = range(exampleNum)
+		if level > 0 and sizes[0] == sizes[-1]:
+			# With equal sizes the first group always takes example 0 so only
+			# the subsets without it can be left for the later groups
+			pool = range(1, exampleNum)
+		members = asarray(list(combinations(pool, remaining)), 
+			dtype=int64).reshape(-1, remaining)
+		choices = asarray(list(combinations(range(remaining), size)), 
+			dtype=int64).reshape(-1, size)
+		if all(later == size for later in sizes[level:]):
+			# Groups of equal size are interchangeable so the group holding the 
+			# lowest example is always filled first
+			choices = choices[choices[:, 0] == 0]
+		memberBits = bits[members]
+		subsets = memberBits.sum(axis=1)
+		chosen = empty(len(subsets), dtype=int64)
+		scores = empty(len(subsets))
+		step = max(1, maxElements // len(choices))
+		for start in range(0, len(subsets), step):
+			stepBits = memberBits[start:start + step]
+			groups = stepBits[:, choices[:, 0]]
+			for position in range(1, size):
+				groups = groups + stepBits[:, choices[:, position]]
+			totals = subsetScores[groups] + \
+				bestScores[subsets[start:start + step, None] - groups]
+			best = totals.argmax(axis=1)
+			rows = arange(len(best))
+			chosen[start:start + step] = groups[rows, best]
+			scores[start:start + step] = totals[rows, best]
+		bestScores = full(1 << exampleNum, -inf)
+		bestScores[subsets] = scores
+		order = argsort(subsets)
+		levels.append((subsets[order], chosen[order]))
+
+	grouping = []
+	remaining = (1 << exampleNum) - 1
+	for subsets, chosen in reversed(levels):
+		group = int(chosen[searchsorted(subsets, remaining)])
+		grouping.append(maskToGroup(group, exampleNum))
+		remaining -= group
+	grouping.append(maskToGroup(remaining, exampleNum))
+	return grouping
+
+def getSubsetScores(weights):
+	"""
+	Scores every subset of examples as a group by summing the pair weights 
+	inside it.
+
+	Args:
+	weights: Pair weights as returned by getPairWeights.
+
+	Returns:
+	An array of length 2 to the power of the number of examples where entry
+	m is the score of the group holding the examples whose bits are set in m.
+	"""
+	scores = zeros(1)
+	for i in range(len(weights)):
+		# Weight gained by adding example i to each subset of earlier examples
+		gains = zeros(1)
+		for j in range(i):
+			gains = concatenate([gains, gains + weights[i][j]])
+		scores = concatenate([scores, scores + gains])
+	return scores
+
+def maskToGroup(mask, exampleNum):
+	"""
+	Converts a bit mask of examples to a group of example positions.
+	"""
+	return [i for i in range(exampleNum) if mask >> i & 1]
+
+def solveGroupingMatching(similarityValues, minValue):
+	"""
+	Finds the best grouping of examples into pairs as a maximum weight 
+	perfect matching, which takes polynomial time for any number of pairs.
+
+	Args:
+	similarityValues: A list of lists of size equal to the number of 
+	examples, holding a similarity scoring between all pairs of examples.
+	minValue: Boolean to indicate if the smallest total group score or 
+	largest indicates the best groupings.
+
+	Returns:
+	The best grouping as a list of pairs of example positions.
+	"""
+	exampleNum = len(similarityValues)
+	if exampleNum % 2 != 0:
+		raise ValueError('{} examples can not be grouped into pairs.'.format(
+			exampleNum))
+	weights = getPairWeights(similarityValues, minValue)
+	# Every perfect matching has the same number of edges so shifting all
+	# weights to be positive does not change which is best
+	weights = weights - weights.min() + 1
+	edges = [(i, j, float(weights[i][j])) 
+		for i, j in combinations(range(exampleNum), 2)]
+	mate = maxWeightMatching(edges, maxCardinality=True)
+	return [[i, mate[i]] for i in range(exampleNum) if i < mate[i]]
@@ -0,0 +1,198 @@
+from numpy import asarray
+from numpy import bincount
+from numpy import errstate
+from numpy import full
+from numpy import log
+from numpy import where
+
+# The accuracy measures of the grouped evaluation problem
+groupedAccuracyMeasures = ['total', 'pairs', 'ari', 'nmi']
+
+def getActualLabels(examples, predictedGroups, labels=None):
+	"""
+	Gives the sense label of each of a word's examples.
+
+	Args:
+	examples: The word's examples as given to the prediction method.
+	predictedGroups: The groups predicted for the word.
+	labels: The sense label of each example or None if the examples are
+	ordered by sense in groups of equal size.
+
+	Returns:
+	A list with the sense label of each example.
+	"""
+	if labels is not None:
+		return list(labels)
+	# Examples are in order so split into group size to find the senses
+	groupSize = len(predictedGroups[0])
+	return [position // groupSize for position in range(len(examples))]
+
+def getPredictedLabels(examples, predictedGroups):
+	"""
+	Gives the position of the predicted group of each of a word's examples.
+	Each sentence of a group takes the first of the examples with that
+	sentence not already taken, so repeated sentences are told apart by the
+	order they appear in. Examples in no group are each put in a group of
+	their own.
+
+	Args:
+	examples: The word's examples as given to the prediction method,
+	dictionaries with key 'sent'.
+	predictedGroups: The groups predicted for the word as lists of sentences.
+
+	Returns:
+	A list with the predicted label of each example.
+	"""
+	positionsBySent = {}
+	for position, example in enumerate(examples):
+		positionsBySent.setdefault(example['sent'], []).append(position)
+	taken = dict((sent, 0) for sent in positionsBySent)
+	labels = [None] * len(examples)
+	for groupNum, group in enumerate(predictedGroups):
+		for sent in group:
+			if sent not in positionsBySent:
+				continue
+			positions = positionsBySent[sent]
+			labels[positions[min(taken[sent], len(positions) - 1)]] = groupNum
+			taken[sent] += 1
+	nextLabel = len(predictedGroups)
+	for position, label in enumerate(labels):
+		if label is None:
+			labels[position] = nextLabel
+			nextLabel += 1
+	return labels
+
+def stackLabels(labelLists):
+	"""
+	Stacks the label lists of several words into one array, padding the
+	shorter lists with -1.
+
+	Args:
+	labelLists: A list with a list of non negative integer labels for each
+	word.
+
+	Returns:
+	An integer array with a row for each word.
+	"""
+	stacked = full((len(labelLists), max(len(labels) for labels in
+		labelLists)), -1, dtype=int)
+	for row, labels in enumerate(labelLists):
+		stacked[row, :len(labels)] = labels
+	return stacked
+
+def getContingencyTables(actual, predicted):
+	"""
+	Counts the examples of each word with each pair of actual and predicted
+	label.
+
+	Args:
+	actual: The stacked actual labels with a row for each word.
+	predicted: The stacked predicted labels in the same positions.
+
+	Returns:
+	An array of shape (words, labels, labels) where [w, i, j] is the number
+	of examples of word w with actual label i and predicted label j.
+	"""
+	actual = asarray(actual)
+	predicted = asarray(predicted)
+	valid = actual >= 0
+	labelNum = int(max(actual.max(), predicted.max())) + 1
+	words = valid.nonzero()[0]
+	cells = (words * labelNum + actual[valid]) * labelNum + predicted[valid]
+	return bincount(cells, minlength=len(actual) * labelNum ** 2).reshape(
+		len(actual), labelNum, labelNum)
+
+def calculateGroupedAccuracies(actual, predicted):
+	"""
+	Calculates every grouped accuracy measure of each word from its actual
+	and predicted labels. Two examples share a group in both the actual and
+	predicted grouping once for each pair of examples in the same cell of the
+	contingency table, so the pairs the co-assignment matrices agree on are
+	counted from the cells without building the matrices.
+
+	'total' is 1 if the groupings are the same, which is when the pairs
+	grouped together are the same, else 0. 'pairs' is the fraction of the
+	pairs of examples of the same sense that are grouped together. 'ari' is
+	the adjusted Rand index and 'nmi' the mutual information of the labels
+	normalised by the mean of their entropies. Both are 1 when the groupings
+	are the same, and 'ari' is 0 when they agree as often as by chance.
+
+	Args:
+	actual: The stacked actual labels with a row for each word, padded with
+	-1.
+	predicted: The stacked predicted labels in the same positions.
+
+	Returns:
+	A dictionary with each measure in groupedAccuracyMeasures as keys and an
+	array of each word's accuracy as values.
+	"""
+	cells = getContingencyTables(actual, predicted).astype(float)
+	actualSizes = cells.sum(axis=2)
+	predictedSizes = cells.sum(axis=1)
+	exampleNums = actualSizes.sum(axis=1)
+	bothPairs = (cells * (cells - 1) / 2).sum(axis=(1, 2))
+	actualPairs = (actualSizes * (actualSizes - 1) / 2).sum(axis=1)
+	predictedPairs = (predictedSizes * (predictedSizes - 1) / 2).sum(axis=1)
+	allPairs = exampleNums * (exampleNums - 1) / 2
+	with errstate(divide='ignore', invalid='ignore'):
+		expectedPairs = actualPairs * predictedPairs / allPairs
+		adjustedRange = (actualPairs + predictedPairs) / 2 - expectedPairs
+		ari = where(adjustedRange == 0, 1.0,
+			(bothPairs - expectedPairs) / adjustedRange)
+
+		cellFractions = cells / exampleNums[:, None, None]
+		actualFractions = actualSizes / exampleNums[:, None]
+		predictedFractions = predictedSizes / exampleNums[:, None]
+		expectedFractions = actualFractions[:, :, None] * \
+			predictedFractions[:, None, :]
+		mutualInformation = where(cells > 0, cellFractions *
+			log(cellFractions / expectedFractions), 0).sum(axis=(1, 2))
+		actualEntropy = -where(actualSizes > 0, actualFractions *
+			log(actualFractions), 0).sum(axis=1)
+		predictedEntropy = -where(predictedSizes > 0, predictedFractions *
+			log(predictedFractions), 0).sum(axis=1)
+		meanEntropy = (actualEntropy + predictedEntropy) / 2
+		nmi = where(meanEntropy == 0, 1.0, mutualInformation / meanEntropy)
+	return {'total':((bothPairs == actualPairs) &
+		(bothPairs == predictedPairs)).astype(float),
+		'pairs':bothPairs / actualPairs, 'ari':ari, 'nmi':nmi}
+
+def getGroupedLabels(results, dataSet, senseLabels=None):
+	"""
+	Gives the stacked actual and predicted labels of the examples of every
+	word of a grouped evaluation.
+
+	Args:
+	results: The predicted groups of sentences for each word.
+	dataSet: The data provided to the prediction method to get the results.
+	senseLabels: A dictionary with the same keys holding the sense label of
+	each example, or None if the examples are ordered by sense in groups of
+	equal size.
+
+	Returns:
+	A pair of the stacked actual and predicted labels with a row for each
+	word.
+	"""
+	actual = []
+	predicted = []
+	for key in dataSet:
+		labels = None if senseLabels is None else senseLabels[key]
+		actual.append(getActualLabels(dataSet[key], results[key], labels))
+		predicted.append(getPredictedLabels(dataSet[key], results[key]))
+	return stackLabels(actual), stackLabels(predicted)
+
+def calculateOFMAccuracy(selections, correctChoices):
+	"""
+	Calculates the accuracy of select one sentence from many options
+	predictions.
+
+	Args:
+	selections: The option selected for each problem.
+	correctChoices: The correct option of each problem in the same order.
+
+	Returns:
+	The fraction of the problems answered correctly as a float.
+	"""
+	selections = asarray(selections, dtype=object)
+	return (selections == asarray(correctChoices, dtype=object)).sum() / \
+		float(len(selections))
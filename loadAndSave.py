@@ -1,3 +1,4 @@
+import os
 import cPickle as pickle
 
 def saveDataToFile(fileName, dataToSave):
@@ -23,6 +24,16 @@ def loadDataFromFile(fileName):
 	"""
 	return pickle.load(open(fileName, 'rb'))		
 
+def getFileSignature(filePath):
+	"""
+	Identifies a file by its absolute path, size and modification time so a
+	file that is changed or replaced can be noticed without having to read the
+	whole of a large model binary.
+	"""
+	fileStat = os.stat(filePath)
+	return '{} {} {}'.format(os.path.abspath(filePath), fileStat.st_size,
+		int(fileStat.st_mtime))
+
 def saveFullDatasetToFileAsText(fileName, dataDict, includeMeta=True):		
 	""" 
 	Saves a dictionary containing a dataset to a text file. Intended to be 
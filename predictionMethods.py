@@ -0,0 +1,275 @@
+from crossoverSimilarity import createCountMatrix
+from crossoverSimilarity import crossoverMatricesByKey
+from crossoverSimilarity import crossoverRows
+from embeddingSimilarity import getCosineDistanceMatrices
+from embeddingSimilarity import getCosineDistanceRows
+from embeddingSimilarity import getSentenceVectors
+from embeddingSimilarity import getUnitVectorSums
+from embeddingSimilarity import word2vecWordSimilarityRows
+
+class PredictionMethod:
+	"""
+	A way of predicting the answers to the evaluation problems. Methods that
+	score examples against each other implement scoreBatch, which scores many
+	pairs of examples at once, and scoreMatrices, which scores every pair of
+	examples of many words at once. The predictors then choose their answers
+	from the scores.
+	"""
+
+	# The evaluation problems the method can be used for
+	ofm = True
+	grouped = True
+	# If the method needs a word2vec model
+	usesModel = False
+	# If the method scores sentence vectors that can be read from a store
+	usesEmbeddingStore = False
+	# If the smallest score rather than the largest marks the most similar
+	minValue = False
+
+	def scoreBatch(self, examples1, examples2, model=None, vocabulary=None,
+		embeddingStore=None):
+		"""
+		Scores each example against the example at the same position of
+		another list.
+
+		Args:
+		examples1: A list of examples, dictionaries with keys 'sent' and
+		'tokens'.
+		examples2: A list of examples the same length as examples1.
+		model: A trained word2vec model or EmbeddingBackend if the method uses
+		one else None.
+		vocabulary: The TokenVocabulary the examples' tokens were interned with
+		or None.
+		embeddingStore: A SentenceEmbeddingStore holding the sentence vectors
+		of the examples or None.
+
+		Returns:
+		An array with entry i holding the score of examples1[i] against
+		examples2[i].
+		"""
+		raise NotImplementedError
+
+	def scoreMatrices(self, examplesByKey, model=None, vocabulary=None,
+		embeddingStore=None):
+		"""
+		Scores every pair of examples of each word.
+
+		Args:
+		examplesByKey: A dictionary with words as keys and a list of examples
+		as values. Each example is a dictionary with keys 'sent' and 'tokens'.
+		model: A trained word2vec model or EmbeddingBackend if the method uses
+		one else None.
+		vocabulary: The TokenVocabulary the examples' tokens were interned with
+		or None.
+		embeddingStore: A SentenceEmbeddingStore holding the sentence vectors
+		of the examples or None.
+
+		Returns:
+		A dictionary with the same keys holding the matrix of scores between
+		all pairs of the word's examples.
+		"""
+		raise NotImplementedError
+
+	def selectOFM(self, predictor, dataToSelectFrom, model=None):
+		"""
+		Answers select one sentence from many options problems with an
+		OFMPredictions.
+		"""
+		return predictor.selectByScores(dataToSelectFrom, self, model)
+
+	def selectGrouped(self, predictor, dataToSelectFrom, groupSize, model=None,
+		solver='bruteForce'):
+		"""
+		Answers grouped problems with a GroupedPredictions.
+		"""
+		return predictor.groupByScores(dataToSelectFrom, groupSize, self, model,
+			solver)
+
+class RandomMethod(PredictionMethod):
+	"""
+	Answers at random without scoring any examples.
+	"""
+
+	def selectOFM(self, predictor, dataToSelectFrom, model=None):
+		return predictor.randomSelection(dataToSelectFrom)
+
+	def selectGrouped(self, predictor, dataToSelectFrom, groupSize, model=None,
+		solver='bruteForce'):
+		return predictor.randomSelection(dataToSelectFrom, groupSize)
+
+class WordCrossoverMethod(PredictionMethod):
+	"""
+	Scores examples by the tokens they share.
+	"""
+
+	def __init__(self, pairs=False):
+		"""
+		Args:
+		pairs: Boolean indicating if the scoring should be done by counting
+		matching word pairs (if True) or by set intersect on set union.
+		"""
+		self.pairs = pairs
+
+	def scoreBatch(self, examples1, examples2, model=None, vocabulary=None,
+		embeddingStore=None):
+		counts1, countVocabulary = createCountMatrix([example['tokens']
+			for example in examples1])
+		counts2, countVocabulary = createCountMatrix([example['tokens']
+			for example in examples2], countVocabulary)
+		return crossoverRows(counts1, counts2, self.pairs)
+
+	def scoreMatrices(self, examplesByKey, model=None, vocabulary=None,
+		embeddingStore=None):
+		return crossoverMatricesByKey(dict((key, [example['tokens']
+			for example in examplesByKey[key]]) for key in examplesByKey),
+			self.pairs)
+
+class Word2VecWordSimMethod(PredictionMethod):
+	"""
+	Scores examples by the sum of the word2vec similarity between every pair
+	of their tokens.
+	"""
+
+	grouped = False
+	usesModel = True
+
+	def scoreBatch(self, examples1, examples2, model=None, vocabulary=None,
+		embeddingStore=None):
+		return word2vecWordSimilarityRows([example['tokens']
+			for example in examples1], [example['tokens']
+			for example in examples2], model, vocabulary)
+
+	def scoreMatrices(self, examplesByKey, model=None, vocabulary=None,
+		embeddingStore=None):
+		keys = list(examplesByKey.keys())
+		sums = getUnitVectorSums([example['tokens'] for key in keys
+			for example in examplesByKey[key]], model, vocabulary)
+		matricesByKey = {}
+		start = 0
+		for key in keys:
+			end = start + len(examplesByKey[key])
+			matricesByKey[key] = sums[start:end].dot(sums[start:end].T)
+			start = end
+		return matricesByKey
+
+class Word2VecCosineMethod(PredictionMethod):
+	"""
+	Scores examples by the cosine distance between the sums of the word2vec
+	vectors of their tokens.
+	"""
+
+	usesModel = True
+	usesEmbeddingStore = True
+	minValue = True
+
+	def __init__(self, ofm=True, grouped=True):
+		"""
+		Args:
+		ofm: Boolean indicating if the method is offered for the select one
+		sentence from many options problem.
+		grouped: Boolean indicating if the method is offered for the grouped
+		problem.
+		"""
+		self.ofm = ofm
+		self.grouped = grouped
+
+	def scoreBatch(self, examples1, examples2, model=None, vocabulary=None,
+		embeddingStore=None):
+		# Examples repeated in the batch, such as the example every option of
+		# a word is scored against, are embedded once
+		rows = {}
+		sentences = []
+		for example in list(examples1) + list(examples2):
+			if example['sent'] not in rows:
+				rows[example['sent']] = len(sentences)
+				sentences.append(example)
+		vectors = embedSentences(sentences, model, vocabulary, embeddingStore)
+		return getCosineDistanceRows(
+			vectors[[rows[example['sent']] for example in examples1]],
+			vectors[[rows[example['sent']] for example in examples2]])
+
+	def scoreMatrices(self, examplesByKey, model=None, vocabulary=None,
+		embeddingStore=None):
+		keys = list(examplesByKey.keys())
+		vectors = embedSentences([example for key in keys
+			for example in examplesByKey[key]], model, vocabulary,
+			embeddingStore)
+		vectorsByKey = {}
+		start = 0
+		for key in keys:
+			end = start + len(examplesByKey[key])
+			vectorsByKey[key] = vectors[start:end]
+			start = end
+		return getCosineDistanceMatrices(vectorsByKey)
+
+# The prediction methods that can be selected by name with baseLineMethod
+predictionMethods = {}
+
+def registerPredictionMethod(name, method):
+	"""
+	Makes a prediction method available by name.
+
+	Args:
+	name: The name baseLineMethod selects the method with.
+	method: A PredictionMethod.
+	"""
+	predictionMethods[name] = method
+
+def getPredictionMethod(name):
+	"""
+	Gives the prediction method registered with a name.
+
+	Args:
+	name: The name of the method.
+
+	Returns:
+	The PredictionMethod.
+
+	Raises:
+	ValueError: If no method is registered with the name.
+	"""
+	if name not in predictionMethods:
+		raise ValueError(str(name) + ' is not a recognised prediction method.')
+	return predictionMethods[name]
+
+def getMethodNames(grouped):
+	"""
+	Gives the names of the methods for one of the evaluation problems.
+
+	Args:
+	grouped: Boolean indicating if the names of the grouped methods (if True)
+	or of the select one sentence from many options methods are wanted.
+
+	Returns:
+	A sorted list of the names.
+	"""
+	return sorted(name for name, method in predictionMethods.items()
+		if (method.grouped if grouped else method.ofm))
+
+def embedSentences(sentences, model, vocabulary=None, embeddingStore=None):
+	"""
+	Gives the unit length sentence vector of each sentence, reading it from
+	an embedding store if one is given and otherwise embedding the sentences
+	with the model.
+
+	Args:
+	sentences: A list of sentences as dictionaries with keys 'sent' and
+	'tokens'.
+	model: A trained word2vec model, may be None if embeddingStore is given.
+	vocabulary: The TokenVocabulary the tokens were interned with or None.
+	embeddingStore: A SentenceEmbeddingStore holding every sentence or None.
+
+	Returns:
+	A float32 matrix with a row for each sentence as getSentenceVectors gives.
+	"""
+	if embeddingStore is not None:
+		return embeddingStore.getVectors([sentence['sent']
+			for sentence in sentences])
+	return getSentenceVectors([sentence['tokens'] for sentence in sentences],
+		model, vocabulary)
+
+registerPredictionMethod('random', RandomMethod())
+registerPredictionMethod('wordCrossover', WordCrossoverMethod())
+registerPredictionMethod('word2vecWordSim', Word2VecWordSimMethod())
+registerPredictionMethod('word2vecCosine', Word2VecCosineMethod(grouped=False))
+registerPredictionMethod('word2vec', Word2VecCosineMethod(ofm=False))
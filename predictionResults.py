@@ -0,0 +1,164 @@
+from numpy import asarray
+from numpy import int8
+from numpy import int16
+from numpy import int32
+from labelAccuracy import calculateGroupedAccuracies
+from labelAccuracy import stackLabels
+
+def getLabelDtype(largestLabel):
+	"""
+	Gives the smallest signed integer type that holds labels up to the
+	largest label and the -1 used for padding.
+	"""
+	for dtype in [int8, int16]:
+		if largestLabel < 2 ** (8 * dtype().itemsize - 1):
+			return dtype
+	return int32
+
+class OFMIndexResults:
+	"""
+	The results of select one sentence from many options predictions as the
+	position of the option selected for each word, instead of the sentences of
+	the example and the selected option.
+	"""
+
+	def __init__(self, keys, selections):
+		"""
+		Args:
+		keys: A list of the words predicted.
+		selections: The position in each word's list of options of the option
+		selected, in the order of keys.
+		"""
+		self.keys = list(keys)
+		selections = asarray(selections)
+		self.selections = selections.astype(getLabelDtype(
+			selections.max() if len(selections) else 0))
+
+	def calculateAccuracy(self):
+		"""
+		Calculates the accuracy of the selections, the correct option being
+		the first option of each word.
+
+		Returns:
+		The accuracy as a float.
+		"""
+		return (self.selections == 0).sum() / float(len(self.selections))
+
+	def toSentences(self, dataToSelectFrom):
+		"""
+		Converts the selections to the format the prediction methods give
+		sentences in.
+
+		Args:
+		dataToSelectFrom: The data the predictions were made on, a dictionary
+		with keys 'example' and 'options' for each word.
+
+		Returns:
+		A dictionary with the words as keys with values being a dictionary with
+		keys 'example' and 'solution'. Both return a single string.
+		"""
+		return dict((key, {'example':dataToSelectFrom[key]['example']['sent'],
+			'solution':dataToSelectFrom[key]['options'][selection]['sent']})
+			for key, selection in zip(self.keys, self.selections.tolist()))
+
+class GroupedIndexResults:
+	"""
+	The results of grouped predictions as the position of the predicted group
+	of each example of each word, stacked into one array, instead of lists of
+	the sentences of each group.
+	"""
+
+	def __init__(self, keys, labels):
+		"""
+		Args:
+		keys: A list of the words predicted.
+		labels: A list holding for each word, in the order of keys, a list of
+		the predicted group of each of its examples in the order they were
+		given.
+		"""
+		self.keys = list(keys)
+		stacked = stackLabels(labels)
+		self.labels = stacked.astype(getLabelDtype(stacked.max()))
+
+	def calculateAccuracies(self, dataToGroup, senseLabels=None):
+		"""
+		Calculates every grouped accuracy measure of each word.
+
+		Args:
+		dataToGroup: The data the predictions were made on, a dictionary with
+		words as keys and a list of examples as values.
+		senseLabels: A dictionary with the same keys holding the sense label of
+		each example, or None if the examples are ordered by sense in groups of
+		equal size.
+
+		Returns:
+		A dictionary with each measure in groupedAccuracyMeasures as keys and an
+		array of the accuracy of each word, in the order of keys, as values.
+		"""
+		actual = []
+		for row, key in enumerate(self.keys):
+			examples = dataToGroup[key]
+			if senseLabels is None:
+				# Examples are in order so split into group size to find the senses
+				groupSize = len(examples) // (int(self.labels[row].max()) + 1)
+				actual.append([position // groupSize
+					for position in range(len(examples))])
+			else:
+				actual.append(list(senseLabels[key]))
+		return calculateGroupedAccuracies(stackLabels(actual), self.labels)
+
+	def getGroups(self, row):
+		"""
+		Gives the positions of the examples of each predicted group of a word.
+
+		Args:
+		row: The position of the word in keys.
+
+		Returns:
+		A list of lists of example positions, one for each group.
+		"""
+		labels = self.labels[row].tolist()
+		groups = [[] for group in range(max(labels) + 1)]
+		for position, label in enumerate(labels):
+			if label >= 0:
+				groups[label].append(position)
+		return groups
+
+	def toSentences(self, dataToGroup):
+		"""
+		Converts the predicted groups to the format the prediction methods give
+		sentences in.
+
+		Args:
+		dataToGroup: The data the predictions were made on, a dictionary with
+		words as keys and a list of examples as values.
+
+		Returns:
+		A dictionary with the words as keys and a list of lists as values, each
+		inner list holding the sentences of a predicted group.
+		"""
+		return dict((key, [[dataToGroup[key][position]['sent']
+			for position in group] for group in self.getGroups(row)])
+			for row, key in enumerate(self.keys))
+
+def getGroupedIndexResults(keys, groupings, lengths):
+	"""
+	Creates the GroupedIndexResults of groupings of example positions.
+
+	Args:
+	keys: A list of the words predicted.
+	groupings: A list holding for each word, in the order of keys, a list of
+	the groups predicted as lists of example positions.
+	lengths: A list of the number of examples of each word.
+
+	Returns:
+	A GroupedIndexResults.
+	"""
+	labels = []
+	for grouping, length in zip(groupings, lengths):
+		wordLabels = [-1] * length
+		for groupNum, group in enumerate(grouping):
+			for position in group:
+				wordLabels[position] = groupNum
+		labels.append(wordLabels)
+	return GroupedIndexResults(keys, labels)
@@ -0,0 +1,170 @@
+from collections import Counter
+from itertools import product
+from math import factorial
+
+def fallingFactorial(n, k):
+	"""
+	Gives n * (n - 1) * ... * (n - k + 1), the number of ordered selections
+	of k of n items.
+	"""
+	result = 1
+	for i in range(k):
+		result *= n - i
+	return result
+
+def binomial(n, k):
+	"""
+	Gives the number of ways to choose k of n items.
+	"""
+	if k < 0 or k > n:
+		return 0
+	return fallingFactorial(n, k) // factorial(k)
+
+def getOFMMoments(numOptions):
+	"""
+	Gives the mean and mean square of the accuracy of a random selection for
+	a word of the select one sentence from many options problem, which is
+	correct with probability one over the number of options.
+
+	Args:
+	numOptions: The number of options of the word.
+
+	Returns:
+	A pair of the mean and the mean of the square of the word's accuracy.
+	"""
+	probability = 1.0 / numOptions
+	return probability, probability
+
+def getGroupedTotalMoments(groupSizes):
+	"""
+	Gives the mean and mean square of the 'total' accuracy of a random
+	grouping of a word's examples. The random grouping shuffles the examples
+	and splits them into groups of the sizes of the senses, so it is correct
+	if each block of the shuffled order is one sense. Of the n! orders the
+	product of the factorials of the group sizes order the examples within
+	each block, and the factorial of the number of senses of each size order
+	the senses of that size between the blocks of that size.
+
+	Args:
+	groupSizes: A list of the number of examples of each of the word's senses.
+
+	Returns:
+	A pair of the mean and the mean of the square of the word's accuracy,
+	which is 1 or 0 so the two are the same.
+	"""
+	correctOrders = 1
+	for size in groupSizes:
+		correctOrders *= factorial(size)
+	for count in Counter(groupSizes).values():
+		correctOrders *= factorial(count)
+	probability = correctOrders / float(factorial(sum(groupSizes)))
+	return probability, probability
+
+def getGroupedPairsMoments(groupSizes):
+	"""
+	Gives the mean and mean square of the 'pairs' accuracy of a random
+	grouping of a word's examples, the fraction of the pairs of examples of
+	the same sense that are grouped together. A pair of examples is grouped
+	together with the probability that a random pair of positions falls in one
+	block of the shuffled order, two pairs sharing an example with the
+	probability that three positions do, and two pairs with no example in
+	common with the probability that they fall in one block or two blocks.
+
+	Args:
+	groupSizes: A list of the number of examples of each of the word's senses.
+
+	Returns:
+	A pair of the mean and the mean of the square of the word's accuracy.
+	"""
+	total = sum(groupSizes)
+	actualPairs = sum(binomial(size, 2) for size in groupSizes)
+	# Ordered pairs of actual pairs sharing one example and sharing none
+	sharedPairs = sum(fallingFactorial(size, 3) for size in groupSizes)
+	disjointPairs = actualPairs ** 2 - actualPairs - sharedPairs
+
+	def sameBlock(k):
+		return sum(fallingFactorial(size, k) for size in groupSizes) / \
+			float(fallingFactorial(total, k))
+	pairProbability = sameBlock(2)
+	meanMatches = actualPairs * pairProbability
+	meanSquareMatches = meanMatches
+	if sharedPairs:
+		meanSquareMatches += sharedPairs * sameBlock(3)
+	if disjointPairs:
+		pairCounts = [fallingFactorial(size, 2) for size in groupSizes]
+		twoBlocks = sum(pairCounts) ** 2 - sum(count ** 2 for count in pairCounts)
+		meanSquareMatches += disjointPairs * (sameBlock(4) + twoBlocks /
+			float(fallingFactorial(total, 4)))
+	return pairProbability, meanSquareMatches / float(actualPairs ** 2)
+
+def getSelectedWordMoments(senseSizes, numSenses, grouped, accuracyMeasure):
+	"""
+	Gives the mean and mean square of the accuracy of a random selection for a
+	word whose senses are chosen at random, averaging over every choice of
+	numSenses of its senses. Choices are counted by how many senses of each
+	size they take, as the accuracy only depends on the sizes.
+
+	Args:
+	senseSizes: A list of the number of examples selected from each of the
+	word's senses.
+	numSenses: The number of senses selected.
+	grouped: Boolean indicating if the problem is the grouped problem (if
+	True) or the select one sentence from many options problem.
+	accuracyMeasure: The grouped accuracy measure, 'total' or 'pairs'.
+
+	Returns:
+	A pair of the mean and the mean of the square of the word's accuracy.
+	"""
+	if not grouped:
+		return getOFMMoments(numSenses)
+	getMoments = getGroupedTotalMoments if accuracyMeasure == 'total' \
+		else getGroupedPairsMoments
+	sizeCounts = sorted(Counter(senseSizes).items())
+	mean = 0.0
+	meanSquare = 0.0
+	for taken in product(*[range(count + 1) for size, count in sizeCounts]):
+		if sum(taken) != numSenses:
+			continue
+		choices = 1
+		groupSizes = []
+		for (size, count), takenNum in zip(sizeCounts, taken):
+			choices *= binomial(count, takenNum)
+			groupSizes += [size] * takenNum
+		wordMean, wordMeanSquare = getMoments(groupSizes)
+		mean += choices * wordMean
+		meanSquare += choices * wordMeanSquare
+	allChoices = float(binomial(len(senseSizes), numSenses))
+	return mean / allChoices, meanSquare / allChoices
+
+def expectedRandomAccuracy(dataset, numSenses, numExamp, grouped,
+	accuracyMeasure='total'):
+	"""
+	Gives the exact expected accuracy of the random prediction method on an
+	evaluation dataset and its variance between test iterations, without
+	running the iterations. Each iteration's accuracy is the mean of the
+	words' accuracies, which are independent, so its variance is the sum of
+	the words' variances over the square of the number of words.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples', every word having
+	at least numSenses senses.
+	numSenses: The number of senses selected for each word.
+	numExamp: The largest number of examples selected from each sense.
+	grouped: Boolean indicating if the problem is the grouped problem (if
+	True) or the select one sentence from many options problem.
+	accuracyMeasure: The grouped accuracy measure, 'total' or 'pairs'.
+
+	Returns:
+	A pair of the expected accuracy of a test iteration and its variance.
+	"""
+	means = []
+	variances = []
+	for key in dataset:
+		senseSizes = [min(len(sense['examples']), numExamp)
+			for sense in dataset[key]]
+		mean, meanSquare = getSelectedWordMoments(senseSizes, numSenses,
+			grouped, accuracyMeasure)
+		means.append(mean)
+		variances.append(max(meanSquare - mean ** 2, 0.0))
+	return sum(means) / len(means), sum(variances) / float(len(means) ** 2)
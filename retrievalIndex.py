@@ -0,0 +1,287 @@
+from random import choice
+from numpy import arange
+from numpy import argpartition
+from numpy import argsort
+from numpy import asarray
+from numpy import bincount
+from numpy import concatenate
+from numpy import empty
+from numpy import float32
+from numpy import full
+from numpy import inf
+from numpy import int64
+from numpy import isnan
+from numpy import mean
+from numpy import unique
+from numpy import zeros
+from numpy.random import RandomState
+
+class RetrievalIndex:
+	"""
+	Exact top k retrieval over a matrix of unit length sentence vectors. A
+	block of queries is scored against one block of candidate rows at a time
+	with a matrix product and the best k candidates of each query are kept as
+	the blocks are read, so the full matrix of query to candidate scores is
+	never held.
+	"""
+
+	def __init__(self, vectors, blockRows=4096, queryBlockRows=256):
+		"""
+		Args:
+		vectors: A matrix of unit length sentence vectors as given by
+		getSentenceVectors. Rows of NaN, sentences without any tokens in the
+		model, can not be retrieved.
+		blockRows: The number of candidate rows scored at a time.
+		queryBlockRows: The number of queries scored at a time.
+		"""
+		vectors = asarray(vectors, dtype=float32)
+		self.valid = ~isnan(vectors).any(axis=1)
+		self.vectors = vectors.copy()
+		self.vectors[~self.valid] = 0
+		self.blockRows = blockRows
+		self.queryBlockRows = queryBlockRows
+
+	def getIndexBytes(self):
+		"""
+		Gives the number of bytes the index holds.
+		"""
+		return self.vectors.nbytes + self.valid.nbytes
+
+	def getScratchBytes(self):
+		"""
+		Gives the number of bytes of the largest block of scores held while
+		searching.
+		"""
+		return self.queryBlockRows * self.blockRows * 4
+
+	def topK(self, queries, k, excludeRows=None):
+		"""
+		Finds the k candidate rows most similar to each query.
+
+		Args:
+		queries: A matrix of unit length query vectors.
+		k: The number of rows to find for each query.
+		excludeRows: An array of a row that may not be retrieved for each
+		query, such as the row of the query itself, or None.
+
+		Returns:
+		A pair of matrices with a row for each query, the first holding the
+		rows found from most to least similar and the second their cosine
+		similarities. Where fewer than k rows can be retrieved the remaining
+		entries are -1 and -inf.
+		"""
+		queries = asarray(queries, dtype=float32)
+		rows = empty((len(queries), k), dtype=int64)
+		scores = empty((len(queries), k), dtype=float32)
+		for start in range(0, len(queries), self.queryBlockRows):
+			end = min(start + self.queryBlockRows, len(queries))
+			excluded = None
+			if excludeRows is not None:
+				excluded = asarray(excludeRows, dtype=int64)[start:end]
+			rows[start:end], scores[start:end] = self.queryBlockTopK(
+				queries[start:end], k, excluded)
+		return rows, scores
+
+	def queryBlockTopK(self, queries, k, excludeRows):
+		"""
+		Finds the k most similar candidate rows of a block of queries.
+		"""
+		queryNums = arange(len(queries)).reshape(-1, 1)
+		bestRows = zeros((len(queries), 0), dtype=int64)
+		bestScores = zeros((len(queries), 0), dtype=float32)
+		for start in range(0, len(self.vectors), self.blockRows):
+			end = min(start + self.blockRows, len(self.vectors))
+			blockScores = queries.dot(self.vectors[start:end].T)
+			blockScores[:, ~self.valid[start:end]] = -inf
+			if excludeRows is not None:
+				inBlock = ((excludeRows >= start) & (excludeRows < end)).nonzero()[0]
+				blockScores[inBlock, excludeRows[inBlock] - start] = -inf
+			blockRows = arange(start, end, dtype=int64).reshape(1, -1)\
+				.repeat(len(queries), axis=0)
+			bestRows = concatenate([bestRows, blockRows], axis=1)
+			bestScores = concatenate([bestScores, blockScores], axis=1)
+			if bestScores.shape[1] > k:
+				kept = argpartition(-bestScores, k - 1, axis=1)[:, :k]
+				bestRows = bestRows[queryNums, kept]
+				bestScores = bestScores[queryNums, kept]
+		return sortTopK(bestRows, bestScores, k)
+
+class LSHIndex:
+	"""
+	Approximate top k retrieval with random projection locality sensitive
+	hashing. Each table hashes a sentence vector to the signs of its
+	projections onto numBits random directions, so vectors at a small angle
+	tend to share a bucket. The candidates in the query's bucket of each table
+	are then scored exactly against the vectors of a RetrievalIndex.
+	"""
+
+	def __init__(self, index, numBits=16, numTables=8, seed=0):
+		"""
+		Args:
+		index: The RetrievalIndex holding the sentence vectors.
+		numBits: The number of random directions of each table, at most 62.
+		numTables: The number of hash tables.
+		seed: The seed of the random directions.
+		"""
+		self.index = index
+		self.planes = RandomState(seed).standard_normal((numTables, numBits,
+			index.vectors.shape[1])).astype(float32)
+		self.bitValues = 2 ** arange(numBits, dtype=int64)
+		validRows = index.valid.nonzero()[0]
+		codes = self.getCodes(index.vectors[validRows])
+		self.sortedCodes = []
+		self.sortedRows = []
+		for table in range(numTables):
+			order = argsort(codes[table], kind='mergesort')
+			self.sortedCodes.append(codes[table][order])
+			self.sortedRows.append(validRows[order])
+
+	def getCodes(self, vectors):
+		"""
+		Gives the bucket of each vector in each table as a matrix with a row
+		for each table.
+		"""
+		return asarray([(vectors.dot(planes.T) > 0).dot(self.bitValues)
+			for planes in self.planes], dtype=int64).reshape(len(self.planes), -1)
+
+	def getIndexBytes(self):
+		"""
+		Gives the number of bytes the hash tables hold, not counting the
+		sentence vectors they share with the RetrievalIndex.
+		"""
+		return self.planes.nbytes + sum(codes.nbytes + rows.nbytes
+			for codes, rows in zip(self.sortedCodes, self.sortedRows))
+
+	def getCandidates(self, codes):
+		"""
+		Gives the rows sharing a bucket with a query in any table.
+
+		Args:
+		codes: An array of the query's bucket in each table.
+		"""
+		candidates = []
+		for sortedCodes, sortedRows, code in zip(self.sortedCodes,
+			self.sortedRows, codes):
+			start = sortedCodes.searchsorted(code, 'left')
+			end = sortedCodes.searchsorted(code, 'right')
+			candidates.append(sortedRows[start:end])
+		return unique(concatenate(candidates))
+
+	def topK(self, queries, k, excludeRows=None):
+		"""
+		Finds up to k candidate rows similar to each query among the rows
+		sharing one of its buckets.
+
+		Args:
+		queries: A matrix of unit length query vectors.
+		k: The number of rows to find for each query.
+		excludeRows: An array of a row that may not be retrieved for each
+		query, such as the row of the query itself, or None.
+
+		Returns:
+		A pair of matrices as RetrievalIndex.topK gives. The mean number of
+		candidates scored for each query is kept in lastCandidates.
+		"""
+		queries = asarray(queries, dtype=float32)
+		rows = full((len(queries), k), -1, dtype=int64)
+		scores = full((len(queries), k), -inf, dtype=float32)
+		codes = self.getCodes(queries)
+		candidateNums = []
+		for queryNum in range(len(queries)):
+			candidates = self.getCandidates(codes[:, queryNum])
+			if excludeRows is not None:
+				candidates = candidates[candidates != excludeRows[queryNum]]
+			candidateNums.append(len(candidates))
+			candidateScores = self.index.vectors[candidates].dot(queries[queryNum])
+			order = argsort(-candidateScores, kind='mergesort')[:k]
+			rows[queryNum, :len(order)] = candidates[order]
+			scores[queryNum, :len(order)] = candidateScores[order]
+		self.lastCandidates = mean(candidateNums) if candidateNums else 0.0
+		return rows, scores
+
+def sortTopK(rows, scores, k):
+	"""
+	Orders the rows found for each query from most to least similar, padding
+	to k columns with rows of -1 and scores of -inf and marking rows that
+	could not be retrieved with -1.
+	"""
+	queryNums = arange(len(rows)).reshape(-1, 1)
+	order = argsort(-scores, axis=1, kind='mergesort')
+	rows = rows[queryNums, order]
+	scores = scores[queryNums, order]
+	paddedRows = full((len(rows), k), -1, dtype=int64)
+	paddedScores = full((len(rows), k), -inf, dtype=float32)
+	paddedRows[:, :rows.shape[1]] = rows
+	paddedScores[:, :rows.shape[1]] = scores
+	paddedRows[paddedScores == -inf] = -1
+	return paddedRows, paddedScores
+
+def createRetrievalData(dataset):
+	"""
+	Gathers every example of every sense of every word of a dataset as the
+	candidates of the retrieval evaluation problem.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'.
+
+	Returns:
+	A dictionary with key 'examples' holding the list of every example, key
+	'senses' an array of the number of the sense each example belongs to,
+	numbered across all words, and key 'keys' the list of the word of each
+	sense.
+	"""
+	examples = []
+	senses = []
+	keys = []
+	for key in sorted(dataset):
+		for sense in dataset[key]:
+			examples += sense['examples']
+			senses += [len(keys)] * len(sense['examples'])
+			keys.append(key)
+	return {'examples':examples, 'senses':asarray(senses, dtype=int64),
+		'keys':keys}
+
+def selectRetrievalQueries(retrievalData, valid):
+	"""
+	Randomly selects a query example for each word from one of its senses
+	with at least one other example that can be retrieved.
+
+	Args:
+	retrievalData: The data given by createRetrievalData.
+	valid: A boolean array marking the examples that have a sentence vector.
+
+	Returns:
+	An array of the row of each query example.
+	"""
+	rowsBySense = {}
+	for row in valid.nonzero()[0]:
+		rowsBySense.setdefault(retrievalData['senses'][row], []).append(row)
+	sensesByKey = {}
+	for sense in sorted(rowsBySense):
+		if len(rowsBySense[sense]) > 1:
+			sensesByKey.setdefault(retrievalData['keys'][sense], []).append(sense)
+	return asarray([choice(rowsBySense[choice(sensesByKey[key])])
+		for key in sorted(sensesByKey)], dtype=int64)
+
+def recallAtK(rows, queryRows, senses, valid, ks):
+	"""
+	Gives the mean fraction of the other retrievable examples of each query's
+	sense found in the first k rows retrieved.
+
+	Args:
+	rows: A matrix of the rows retrieved for each query, as topK gives.
+	queryRows: An array of the row of each query.
+	senses: An array of the sense of each row.
+	valid: A boolean array marking the rows that can be retrieved.
+	ks: A list of the values of k.
+
+	Returns:
+	A dictionary with each k as a key holding the mean recall at k.
+	"""
+	relevantNums = bincount(senses[valid], minlength=len(senses))[
+		senses[queryRows]] - 1
+	matches = (senses[rows] == senses[queryRows].reshape(-1, 1)) & (rows >= 0)
+	return dict((k, float(mean(matches[:, :k].sum(axis=1) /
+		relevantNums.astype(float)))) for k in ks)
@@ -0,0 +1,187 @@
+from numpy import asarray
+from numpy import concatenate
+from numpy import int64
+from numpy import unique
+from numpy import zeros
+from crossoverSimilarity import crossoverMatricesByKey
+from crossoverSimilarity import intersectOnUnion
+from predictionMethods import WordCrossoverMethod
+from predictionMethods import getPredictionMethod
+from tokenInterning import isInterned
+
+class SimilarityCache:
+	"""
+	The similarity between every pair of a word's examples for each word of a
+	dataset, computed once so the problems of every test iteration can be
+	scored by indexing the rows and columns of their examples. The matrices of
+	all words are held row by row in a single flat array so the scores of 
+	every word of an iteration are read with one index.
+	"""
+
+	def __init__(self, matricesByKey, sentRowsByKey, tokenNumsByKey=None):
+		"""
+		Args:
+		matricesByKey: A dictionary with words as keys and the matrix of
+		similarities between all the word's examples as values. For set
+		intersect on set union scores the matrix holds the intersect sizes.
+		sentRowsByKey: A dictionary with the same keys holding a dictionary
+		from each example sentence of the word to its row.
+		tokenNumsByKey: A dictionary with the same keys holding an array of the
+		number of distinct tokens of each example if the matrices hold
+		intersect sizes, else None.
+		"""
+		keys = list(matricesByKey.keys())
+		self.sentRowsByKey = sentRowsByKey
+		self.sizes = dict((key, len(matricesByKey[key])) for key in keys)
+		self.blockStarts = {}
+		self.rowStarts = {}
+		blockStart = 0
+		rowStart = 0
+		for key in keys:
+			self.blockStarts[key] = blockStart
+			self.rowStarts[key] = rowStart
+			blockStart += self.sizes[key] ** 2
+			rowStart += self.sizes[key]
+		self.scores = concatenate([asarray(matricesByKey[key]).ravel() 
+			for key in keys] or [zeros(0)])
+		self.tokenNums = None
+		if tokenNumsByKey is not None:
+			self.tokenNums = concatenate([tokenNumsByKey[key] for key in keys] 
+				or [zeros(0, dtype=int64)])
+
+	def getScores(self, keys, rowSents, columnSents):
+		"""
+		Gives the similarity of pairs of examples.
+
+		Args:
+		keys: A list of the word each pair of examples belongs to.
+		rowSents: A list of the first example sentence of each pair.
+		columnSents: A list of the second example sentence of each pair.
+
+		Returns:
+		An array with entry i holding the similarity between rowSents[i] and
+		columnSents[i].
+		"""
+		indices = []
+		rows = []
+		columns = []
+		for key, rowSent, columnSent in zip(keys, rowSents, columnSents):
+			sentRows = self.sentRowsByKey[key]
+			row = sentRows[rowSent]
+			column = sentRows[columnSent]
+			indices.append(self.blockStarts[key] + row * self.sizes[key] + column)
+			rows.append(self.rowStarts[key] + row)
+			columns.append(self.rowStarts[key] + column)
+		scores = self.scores[asarray(indices, dtype=int64)]
+		if self.tokenNums is None:
+			return scores
+		union = self.tokenNums[rows] + self.tokenNums[columns] - scores
+		return intersectOnUnion(scores, union)
+
+	def getSimilarityMatrix(self, key, sents):
+		"""
+		Gives the similarity between every pair of the given example sentences
+		of a word, as the grouped prediction methods score them.
+		"""
+		size = len(sents)
+		return self.getScores([key] * size ** 2, [sent for sent in sents 
+			for i in range(size)], sents * size).reshape(size, size)
+
+	def getOptionScores(self, keys, exampleSents, optionSentsByKey):
+		"""
+		Gives the similarity of an example sentence of each word to each of a 
+		list of option sentences, as the select one from many options 
+		prediction methods score them.
+
+		Args:
+		keys: A list of words.
+		exampleSents: A list of the example sentence of each word.
+		optionSentsByKey: A list of the list of option sentences of each word.
+
+		Returns:
+		An array holding the scores of the first word's options followed by 
+		those of each following word.
+		"""
+		return self.getScores([key for key, optionSents in zip(keys, 
+			optionSentsByKey) for sent in optionSents], [exampleSent 
+			for exampleSent, optionSents in zip(exampleSents, optionSentsByKey) 
+			for sent in optionSents], [sent for optionSents in optionSentsByKey 
+			for sent in optionSents])
+
+def getExamplesByKey(dataset):
+	"""
+	Gathers every example of each word of a dataset once.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'.
+
+	Returns:
+	A dictionary with the same keys holding a list of the word's examples,
+	each example sentence appearing only once.
+	"""
+	examplesByKey = {}
+	for key in dataset:
+		examples = []
+		seen = set()
+		for sense in dataset[key]:
+			for example in sense['examples']:
+				if example['sent'] not in seen:
+					seen.add(example['sent'])
+					examples.append(example)
+		examplesByKey[key] = examples
+	return examplesByKey
+
+def buildSimilarityCache(dataset, method, model=None, vocabulary=None,
+	embeddingStore=None, pairs=False):
+	"""
+	Scores every pair of examples of each word of a dataset once with the
+	similarity a prediction method uses.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'.
+	method: The name of a registered prediction method that scores examples,
+	any but 'random'.
+	model: A trained word2vec model or EmbeddingBackend for the word2vec
+	methods else None.
+	vocabulary: The TokenVocabulary the examples' tokens were interned with or
+	None.
+	embeddingStore: A SentenceEmbeddingStore holding the sentence vectors of
+	the examples or None.
+	pairs: Boolean indicating if word crossover should be scored by counting
+	matching word pairs (if True) or by set intersect on set union.
+
+	Returns:
+	A SimilarityCache.
+	"""
+	examplesByKey = getExamplesByKey(dataset)
+	keys = list(examplesByKey.keys())
+	sentRowsByKey = dict((key, dict((example['sent'], row)
+		for row, example in enumerate(examplesByKey[key]))) for key in keys)
+	tokenNumsByKey = None
+	if method == 'wordCrossover' and not pairs:
+		# Counting matching pairs of distinct tokens gives the intersect sizes,
+		# which are divided by the union sizes as they are looked up so that
+		# examples without tokens only fail if they are compared
+		tokenListsByKey = dict((key, [getDistinctTokens(example['tokens'])
+			for example in examplesByKey[key]]) for key in keys)
+		matricesByKey = crossoverMatricesByKey(tokenListsByKey, True)
+		tokenNumsByKey = dict((key, asarray([len(tokens)
+			for tokens in tokenListsByKey[key]], dtype=int64)) for key in keys)
+	elif method == 'wordCrossover':
+		matricesByKey = WordCrossoverMethod(True).scoreMatrices(examplesByKey)
+	else:
+		matricesByKey = getPredictionMethod(method).scoreMatrices(examplesByKey,
+			model, vocabulary, embeddingStore)
+	return SimilarityCache(matricesByKey, sentRowsByKey, tokenNumsByKey)
+
+def getDistinctTokens(tokens):
+	"""
+	Gives each token of a list of tokens, or array of token IDs, once.
+	"""
+	if isInterned([tokens]):
+		return unique(tokens)
+	return list(set(tokens))
@@ -0,0 +1,53 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import random
+from embeddingBackends import SyntheticBackend
+
+# The vocabulary every synthetic example's tokens are drawn from
+syntheticWords = ['the', 'big', 'cat', 'dog', 'ran', 'red', 'apples', 'are',
+	'green', 'boats']
+
+def createSyntheticModel():
+	"""
+	Creates a small embedding model covering the synthetic vocabulary.
+
+	Returns:
+	A SyntheticBackend with a vector of size 10 for each of syntheticWords.
+	"""
+	return SyntheticBackend(syntheticWords, vectorSize=10)
+
+def createSyntheticDataset(keys, seed, senseNum, exampNum, maxTokens):
+	"""
+	Creates a dataset in the loaded dictionary format whose examples are
+	random sequences of the synthetic vocabulary. Every sentence is unique.
+
+	Args:
+	keys: The words of the dataset.
+	seed: The seed of the random generator the counts and tokens are drawn
+	from.
+	senseNum: The number of senses of each word or a tuple of the smallest
+	and largest number to draw from.
+	exampNum: The number of examples of each sense or a tuple of the smallest
+	and largest number to draw from.
+	maxTokens: The largest number of tokens in an example.
+
+	Returns:
+	A dictionary with the keys given as keys and values of a list of senses,
+	each sense being a dictionary with key 'examples' holding a list of
+	examples with keys 'sent' and 'tokens'.
+	"""
+	randomWords = random.Random(seed)
+	def drawCount(count):
+		if isinstance(count, tuple):
+			return randomWords.randint(*count)
+		return count
+	dataset = {}
+	for key in keys:
+		dataset[key] = [{'examples':[{'sent':'{} {} {}'.format(key, sense,
+			example), 'tokens':[randomWords.choice(syntheticWords)
+			for i in range(randomWords.randint(1, maxTokens))]}
+			for example in range(drawCount(exampNum))]}
+			for sense in range(drawCount(senseNum))]
+	return dataset
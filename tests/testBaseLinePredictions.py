@@ -7,16 +7,25 @@ import dataSelection as ds
 from baseLinePredictions import OFMPredictions
 from baseLinePredictions import GroupedPredictions
 import baseLinePredictions as blp
-from gensim.models import Word2Vec
-from numpy import zeros
+from embeddingBackends import SyntheticBackend
+from copy import deepcopy
+from random import Random
+from numpy import array
 from numpy import array_equal
+from numpy import nan
+from numpy import zeros
 from nltk import word_tokenize
 from scipy.spatial.distance import cosine
 
 class TestRandomSelection(unittest.TestCase):
 
 	def setUp(self):
-		self.brownFilePath = '../models/brownModel'
+		# Random vectors stand in for a trained model, 'foo' is left out
+		self.model = SyntheticBackend(['The', 'the', 'car', 'ran', 'over', 
+			'big', 'cat', '.', 'man', 'and', 'Some', 'people', 'like', 'forever',
+			'dog', 'horse', 'apple', 'orange', 'lemon', 'England', 'France', 
+			'Spain', 'boy', 'girl', 'bus', 'boat', 'pencil', 'pen', 'rubber', 
+			'black', 'brown', 'defense', 'force'])
 
 	def test_ofm_random_selection(self):
 		ofmPredictor = OFMPredictions()
@@ -58,7 +67,7 @@ class TestRandomSelection(unittest.TestCase):
 		return 	testData
 
 	def test_ofm_word2vec_word_similarity_selection(self):
-		model = Word2Vec.load(self.brownFilePath)
+		model = self.model
 		ofmPredictor = OFMPredictions()
 		testData = self.getOFMTestData()
 		pred = ofmPredictor.word2VecSimilaritySelectionWordSim(testData, model)
@@ -66,7 +75,7 @@ class TestRandomSelection(unittest.TestCase):
 		self.assertTrue(pred['word1']['solution'] in optionSentences)
 
 	def test_ofm_word2vec_cosine_selection(self):
-		model = Word2Vec.load(self.brownFilePath)
+		model = self.model
 		ofmPredictor = OFMPredictions()
 		testData = self.getOFMTestData()
 		pred = ofmPredictor.word2VecSimilaritySelectionCosine(testData, model)
@@ -135,7 +144,7 @@ class TestRandomSelection(unittest.TestCase):
 		self.assertEqual(set(letters), set(used))			
 
 	def test_grouped_word2vec_selection_3_by_3(self):
-		model = Word2Vec.load(self.brownFilePath)
+		model = self.model
 		groupedPredictor = GroupedPredictions()
 		examples1 = ['cat','dog','horse','apple','orange','lemon',\
 		'England','France','Spain']
@@ -162,7 +171,7 @@ class TestRandomSelection(unittest.TestCase):
 	# Takes too long to run
 	""" 
 	def test_grouped_word2vec_selection_4_by_4(self):
-		model = Word2Vec.load(self.brownFilePath)
+		model = self.model
 		groupedPredictor = GroupedPredictions()
 		examples = ['cat','dog','horse','apple','orange','lemon',\
 		'England','France','Spain','boy','girl','man','bus','car','boat','pencil'] 
@@ -282,7 +291,97 @@ class TestRandomSelection(unittest.TestCase):
 					[4, 4, 4, 4, 4, -1, 0, 4, -1],
 					[4, 4, -1, 4, -1, 4, 4, 0, 4],
 					[4, 4, 4, 4, 4, -1, -1, 4, 0]]
-		return simValues	
+		return simValues
+
+	def test_group_by_similarity_exact(self):
+		groupedPredictor = GroupedPredictions()
+		examples = [{'sent':letter, 'tokens':[letter]} for letter in 'abcdefghi']
+		correctGroupings = [set(['a','b','d']),set(['c','e','h']),set(['f','g','i'])]
+		results = groupedPredictor.groupBySimilarityExact(examples, 
+			self.get_sim_values(), 3, False)
+		for group in results:
+			self.assertTrue(set(group) in correctGroupings)
+
+		results = groupedPredictor.groupBySimilarity(examples, 
+			self.get_sim_values_inverse(), 3, True, 'exact')
+		for group in results:
+			self.assertTrue(set(group) in correctGroupings)
+
+	def test_group_by_similarity_heuristic_compared(self):
+		groupedPredictor = GroupedPredictions(maxIterations=10, 
+			compareToExact=True)
+		examples = [{'sent':letter, 'tokens':[letter]} for letter in 'abcdefghi']
+		correctGroupings = [set(['a','b','d']),set(['c','e','h']),set(['f','g','i'])]
+		for solver in GroupedPredictions.heuristicSolvers:
+			results = groupedPredictor.groupAllBySimilarity({'word1':examples}, 
+				{'word1':self.get_sim_values()}, 3, False, solver)
+			for group in results['word1']:
+				self.assertTrue(set(group) in correctGroupings)
+			for group in groupedPredictor.exactResults['word1']:
+				self.assertTrue(set(group) in correctGroupings)
+			self.assertEqual(groupedPredictor.gapReport['word1']['gap'], 0.0)
+		summary = groupedPredictor.summariseGapReport()
+		self.assertEqual(summary['words'], 1)
+		self.assertEqual(summary['meanGap'], 0.0)
+
+	def test_group_by_similarity_compared_skips_large_words(self):
+		groupedPredictor = GroupedPredictions(maxIterations=2, 
+			compareToExact=True)
+		# 5 senses by 5 examples is too many examples to solve exactly
+		examples = [{'sent':str(i), 'tokens':['sense' + str(i // 5)]} 
+			for i in range(25)]
+		simValues = [[1 if i // 5 == j // 5 else 0 for j in range(25)] 
+			for i in range(25)]
+		results = groupedPredictor.groupAllBySimilarity({'word1':examples}, 
+			{'word1':simValues}, 5, False, 'localSearch')
+		self.assertEqual(len(results['word1']), 5)
+		self.assertEqual(groupedPredictor.exactResults, {})
+		summary = groupedPredictor.summariseGapReport()
+		self.assertEqual(summary['words'], 0)
+		self.assertEqual(summary['skipped'], 1)
+
+	def test_group_by_similarity_pairs(self):
+		groupedPredictor = GroupedPredictions()
+		# 8 senses with 2 examples each, examples of a sense share a token
+		examples = [{'sent':str(i), 'tokens':['sense' + str(i // 2)]} 
+			for i in range(16)]
+		simValues = [[1 if i // 2 == j // 2 else 0 for j in range(16)] 
+			for i in range(16)]
+		for solver in ['matching', 'bruteForce', 'batch', 'exact']:
+			results = groupedPredictor.groupAllBySimilarity({'word1':examples}, 
+				{'word1':simValues}, 2, False, solver)
+			for group in results['word1']:
+				self.assertEqual(int(group[0]) // 2, int(group[1]) // 2)
+		self.assertRaises(ValueError, groupedPredictor.groupBySimilarity, 
+			examples[:9], [row[:9] for row in simValues[:9]], 3, False, 'matching')
+
+	def test_group_by_similarity_batch(self):
+		groupedPredictor = GroupedPredictions()
+		examples = [{'sent':letter, 'tokens':[letter]} for letter in 'abcdefghi']
+		correctGroupings = [set(['a','b','d']),set(['c','e','h']),set(['f','g','i'])]
+		results = groupedPredictor.groupBySimilarityBatch(
+			{'word1':examples, 'word2':examples}, 
+			{'word1':self.get_sim_values(), 'word2':self.get_sim_values()}, 3, False)
+		self.assertEqual(set(results), set(['word1', 'word2']))
+		for key in results:
+			for group in results[key]:
+				self.assertTrue(set(group) in correctGroupings)
+
+		results = groupedPredictor.groupAllBySimilarity({'word1':examples}, 
+			{'word1':self.get_sim_values_inverse()}, 3, True, 'batch')
+		for group in results['word1']:
+			self.assertTrue(set(group) in correctGroupings)
+
+	def test_group_by_similarity_brute_force_duplicate_tokens(self):
+		groupedPredictor = GroupedPredictions()
+		# All examples tokenise the same but must still be kept apart
+		examples = [{'sent':letter, 'tokens':['x']} for letter in 'abcdefghi']
+		simValues = self.get_sim_values()
+		results = groupedPredictor.groupBySimilarityBF(examples, simValues, 3, False)
+		correctGroupings = [set(['a','b','d']),set(['c','e','h']),set(['f','g','i'])]
+		self.assertEqual(len(results), 3)
+		for group in results:
+			self.assertTrue(set(group) in correctGroupings)
 
 	def test_creation_of_all_possible_groups_of_3_by_3_and_4_by_4(self):
 		groupedPredictor = GroupedPredictions()
@@ -387,6 +486,75 @@ class TestRandomSelection(unittest.TestCase):
 		accuracy = groupedPredictor.calculateAccuracyPairs(results, testData)
 		self.assertEqual(accuracy, 0/float(9))
 
+	def test_grouped_calculate_accuracy_unequal_sizes(self):
+		groupedPredictor = GroupedPredictions()
+		testData = {'word1':[{'sent':sent, 'tokens':[sent]} 
+			for sent in ['a1','a2','b1','b2','b3','b4','c1','c2','c3']]}
+		senseLabels = {'word1':[0, 0, 1, 1, 1, 1, 2, 2, 2]}
+
+		results = {'word1':[['b3','b1','b2','b4'],['c2','c1','c3'],['a1','a2']]}
+		accuracy = groupedPredictor.calculateAccuracy(results, testData, 
+			senseLabels)
+		self.assertEqual(accuracy, 1)
+		accuracy = groupedPredictor.calculateAccuracyPairs(results, testData, 
+			senseLabels)
+		self.assertEqual(accuracy, 10/float(10))
+
+		# 5 of the 10 pairs correct: a1a2 b1b2 b1b3 b2b3 c2c3
+		results = {'word1':[['b3','b1','b2'],['c2','c3','b4'],['a1','c1','a2']]}
+		accuracy = groupedPredictor.calculateAccuracy(results, testData, 
+			senseLabels)
+		self.assertEqual(accuracy, 0)
+		accuracy = groupedPredictor.calculateAccuracyPairs(results, testData, 
+			senseLabels)
+		self.assertEqual(accuracy, 5/float(10))
+
+	def test_group_by_similarity_dp(self):
+		groupedPredictor = GroupedPredictions()
+		examples = [{'sent':letter, 'tokens':[letter]} for letter in 'abcdefghi']
+		correctGroupings = [set(['a','b','d']),set(['c','e','h']),set(['f','g','i'])]
+		results = groupedPredictor.groupBySimilarity(examples, 
+			self.get_sim_values(), 3, False, 'subsetDP')
+		for group in results:
+			self.assertTrue(set(group) in correctGroupings)
+
+		results = groupedPredictor.groupAllBySimilarity({'word1':examples}, 
+			{'word1':self.get_sim_values_inverse()}, {'word1':[3, 3, 3]}, True, 
+			'subsetDP')
+		for group in results['word1']:
+			self.assertTrue(set(group) in correctGroupings)
+
+		# Groups of unequal size
+		results = groupedPredictor.groupBySimilarityDP(examples, 
+			self.get_sim_values(), [2, 3, 4], False)
+		self.assertEqual(sorted(len(group) for group in results), [2, 3, 4])
+		self.assertRaises(ValueError, groupedPredictor.groupAllBySimilarity, 
+			{'word1':examples}, {'word1':self.get_sim_values()}, 
+			{'word1':[2, 3, 4]}, False, 'exact')
+
+		# Too many examples for the subset DP fall back to a heuristic
+		rand = Random(2)
+		senses = [i // 8 for i in range(24)]
+		examples = [{'sent':'s{}'.format(i), 'tokens':['s{}'.format(i)]} 
+			for i in range(24)]
+		simValues = [[(1 if senses[i] == senses[j] else 0) + rand.random() * 0.3
+			for j in range(24)] for i in range(24)]
+		results = groupedPredictor.groupAllBySimilarity({'word1':examples}, 
+			{'word1':simValues}, {'word1':[8, 8, 8]}, False, 'subsetDP')
+		self.assertEqual(sorted(len(group) for group in results['word1']), 
+			[8, 8, 8])
+		self.assertEqual(sorted(sum(results['word1'], [])), 
+			sorted(example['sent'] for example in examples))
+
+	def test_grouped_random_selection_unequal_sizes(self):
+		groupedPredictor = GroupedPredictions()
+		testData = {'word1':[{'sent':sent, 'tokens':[sent]} 
+			for sent in ['a1','a2','b1','b2','b3','b4','c1','c2','c3']]}
+		results = groupedPredictor.randomSelection(testData, {'word1':[2, 4, 3]})
+		self.assertEqual([len(group) for group in results['word1']], [2, 4, 3])
+		self.assertEqual(sorted(sum(results['word1'], [])), 
+			sorted(example['sent'] for example in testData['word1']))
+
 	def formatTestData(self, testData):
 		newData = {}
 		for key in testData:
@@ -427,7 +595,7 @@ class TestRandomSelection(unittest.TestCase):
 		self.assertEqual(accuracy, 0/float(24))
 
 	def test_cosine_similarity(self):
-		model = Word2Vec.load(self.brownFilePath)
+		model = self.model
 		sentence1 = {'tokens':['the','black','cat']}
 		sentence2 = {'tokens':['the','brown','cat']}
 		sim = blp.cosineSimilarity(sentence1, sentence2, model)
@@ -438,7 +606,7 @@ class TestRandomSelection(unittest.TestCase):
 		self.assertEqual(sim, sim2)
 
 	def test_word2vec_word_similarity(self):
-		model = Word2Vec.load(self.brownFilePath)
+		model = self.model
 
 		sentence1 = {'tokens':['the', 'man', 'cat']}
 		sentence2 = {'tokens':['the', 'boy']}
@@ -498,17 +666,44 @@ class TestRandomSelection(unittest.TestCase):
 		self.assertEqual(match, 1)
 
 	def test_get_vector_sum(self):
-		model = Word2Vec.load(self.brownFilePath)
-		self.assertFalse('foo' in model.vocab)
+		model = self.model
+		self.assertFalse('foo' in model)
 		inputList = ['foo']
 		vectorSum = blp.getVectorSum(inputList, model)
 		self.assertTrue(array_equal(vectorSum, zeros(100)))
-		self.assertTrue('defense' in model.vocab)
-		self.assertTrue('force' in model.vocab)
+		self.assertTrue('defense' in model)
+		self.assertTrue('force' in model)
 		inputList = ['defense', 'force']
 		vectorSum = blp.getVectorSum(inputList, model)
 		correctValue = model['defense'] + model['force']
 		self.assertTrue(array_equal(vectorSum, correctValue))	
 
+	def test_select_best_in_segments(self):
+		scores = array([1.0, 3.0, 3.0, 2.0, nan, 5.0, 0.0, 0.0, -1.0])
+		self.assertEqual(blp.selectBestInSegments(scores, [3, 3, 3], 
+			False).tolist(), [1, 1, 0])
+		self.assertEqual(blp.selectBestInSegments(scores, [3, 3, 3], 
+			True).tolist(), [0, 1, 2])
+		self.assertEqual(blp.selectBestInSegments(scores, [1, 8], 
+			False).tolist(), [0, 3])
+		self.assertEqual(blp.selectBestInSegments(scores, [], True).tolist(), [])
+
+	def test_predictions_leave_data_unchanged(self):
+		ofmData = {'word1':{'example':{'sent':'a', 'tokens':['the', 'cat']},
+			'options':[{'sent':'a{}'.format(i), 'tokens':['the', 'dog', 'cat'][:i]}
+			for i in range(1, 4)]}}
+		ofmCopy = deepcopy(ofmData)
+		options = ofmData['word1']['options']
+		OFMPredictions().wordCrossoverSelection(ofmData)
+		OFMPredictions().word2VecSimilaritySelectionCosine(ofmData, self.model)
+		self.assertEqual(ofmData, ofmCopy)
+		self.assertTrue(ofmData['word1']['options'] is options)
+		groupData = {'word1':[{'sent':'a{}'.format(i), 'tokens':['the', 'dog', 
+			'cat', 'big'][i % 4:]} for i in range(4)]}
+		groupCopy = deepcopy(groupData)
+		GroupedPredictions().wordCrossoverSelection(groupData, 2)
+		GroupedPredictions().randomSelection(groupData, 2)
+		self.assertEqual(groupData, groupCopy)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -56,6 +56,30 @@ class TestConfigValidation(unittest.TestCase):
 		parser.read(self.configFN)
 		self.assertFalse(cv.validateBoolean(parser))
 
+	def test_validate_optional_boolean(self):
+		parser = SafeConfigParser()
+
+		# Optional so a missing key is valid
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateBoolean(parser))
+
+		self.configDict['internTokens'] = True
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateBoolean(parser))
+
+		self.configDict['internTokens'] = 'often'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateBoolean(parser))
+
+		self.configDict['internTokens'] = True
+		self.configDict['comparePrecision'] = 'sometimes'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateBoolean(parser))
+
 	def test_validate_int(self):
 		parser = SafeConfigParser()
 
@@ -108,7 +132,7 @@ class TestConfigValidation(unittest.TestCase):
 		parser = SafeConfigParser()
 
 		validMethods = ['random', 'wordCrossover', 'word2vec']
-		validAccuracyMethods = ['total', 'pairs']
+		validAccuracyMethods = ['total', 'pairs', 'ari', 'nmi']
 		self.configDict['grouped'] = True
 		for method in validMethods:
 			self.configDict['baseLineMethod'] = method
@@ -185,7 +209,22 @@ class TestConfigValidation(unittest.TestCase):
 			parser.read(self.configFN)
 			self.assertTrue(cv.validateSenseAndExampNum(parser))
 
-		invalidNum = [-1, 0, 1, 2, 5]
+		# Pairs are found by matching so any number of senses can be grouped
+		for solver in ['bruteForce', 'batch']:
+			self.configDict['groupingSolver'] = solver
+			for senseNum in [2, 8]:
+				self.configDict['numOfSenses'] = senseNum
+				self.configDict['numOfExamp'] = 2
+				self.write_dict_to_config(self.configDict)
+				parser.read(self.configFN)
+				self.assertTrue(cv.validateSenseAndExampNum(parser))
+		self.configDict['numOfSenses'] = 1
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateSenseAndExampNum(parser))
+		del self.configDict['groupingSolver']
+
+		invalidNum = [-1, 0, 1, 5]
 		for num in invalidNum:
 			self.configDict['numOfSenses'] = num
 			self.configDict['numOfExamp'] = num
@@ -205,6 +244,288 @@ class TestConfigValidation(unittest.TestCase):
 		parser.read(self.configFN)
 		self.assertFalse(cv.validateSenseAndExampNum(parser))	
 
+	def test_validate_sense_and_example_num_grouped_exact(self):
+		parser = SafeConfigParser()
+
+		self.configDict['grouped'] = True
+		self.configDict['groupingSolver'] = 'exact'
+		
+		validNum = [(2, 2), (4, 5), (5, 4), (6, 3), (3, 6), (30, 2)]
+		for senseNum, exampNum in validNum:
+			self.configDict['numOfSenses'] = senseNum
+			self.configDict['numOfExamp'] = exampNum
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateSenseAndExampNum(parser))
+
+		invalidNum = [(1, 4), (4, 1), (0, 0), (-1, 3), (5, 5), (6, 6), (8, 3),
+			(3, 7)]
+		for senseNum, exampNum in invalidNum:
+			self.configDict['numOfSenses'] = senseNum
+			self.configDict['numOfExamp'] = exampNum
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateSenseAndExampNum(parser))
+
+	def test_validate_sense_and_example_num_grouped_subset_dp(self):
+		parser = SafeConfigParser()
+
+		self.configDict['grouped'] = True
+		self.configDict['groupingSolver'] = 'subsetDP'
+		
+		# Words with too many examples for the subset DP are grouped 
+		# heuristically
+		validNum = [(2, 2), (10, 2), (4, 5), (5, 4), (6, 3), (6, 6), (3, 7)]
+		for senseNum, exampNum in validNum:
+			self.configDict['numOfSenses'] = senseNum
+			self.configDict['numOfExamp'] = exampNum
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateSenseAndExampNum(parser))
+
+		invalidNum = [(1, 4), (4, 1), (0, 0)]
+		for senseNum, exampNum in invalidNum:
+			self.configDict['numOfSenses'] = senseNum
+			self.configDict['numOfExamp'] = exampNum
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateSenseAndExampNum(parser))
+
+	def test_validate_sense_and_example_num_grouped_matching(self):
+		parser = SafeConfigParser()
+
+		self.configDict['grouped'] = True
+		self.configDict['groupingSolver'] = 'matching'
+		
+		validNum = [(2, 2), (3, 2), (8, 2), (30, 2)]
+		for senseNum, exampNum in validNum:
+			self.configDict['numOfSenses'] = senseNum
+			self.configDict['numOfExamp'] = exampNum
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateSenseAndExampNum(parser))
+
+		invalidNum = [(1, 2), (3, 3), (8, 4), (4, 1)]
+		for senseNum, exampNum in invalidNum:
+			self.configDict['numOfSenses'] = senseNum
+			self.configDict['numOfExamp'] = exampNum
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateSenseAndExampNum(parser))
+
+	def test_validate_grouping_solver(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateGroupingSolver(parser))
+
+		for solver in ['bruteForce', 'exact', 'batch', 'subsetDP', 'matching', 
+			'greedy', 'localSearch', 'kMedoids']:
+			self.configDict['groupingSolver'] = solver
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateGroupingSolver(parser))
+
+		self.configDict['groupingSolver'] = 'fast'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateGroupingSolver(parser))
+
+	def test_validate_embedding_backend(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateEmbeddingBackend(parser))
+
+		for backend in ['gensim', 'mmap', 'matrix']:
+			self.configDict['embeddingBackend'] = backend
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateEmbeddingBackend(parser))
+
+		self.configDict['embeddingBackend'] = 'fast'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateEmbeddingBackend(parser))
+
+		self.configDict['embeddingBackend'] = 'gensim'
+		for precision in ['float32', 'float16', 'int8']:
+			self.configDict['embeddingPrecision'] = precision
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateEmbeddingBackend(parser))
+
+		self.configDict['embeddingPrecision'] = 'int4'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateEmbeddingBackend(parser))
+
+	def test_validate_random_baseline(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateRandomBaseline(parser))
+
+		for randomBaseline in ['sampled', 'analytic']:
+			self.configDict['randomBaseline'] = randomBaseline
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateRandomBaseline(parser))
+
+		self.configDict['randomBaseline'] = 'exact'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateRandomBaseline(parser))
+
+		# Only the 'total' and 'pairs' measures have a closed form
+		self.configDict['randomBaseline'] = 'analytic'
+		self.configDict['grouped'] = True
+		self.configDict['groupedAccuracyMeasure'] = 'ari'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertFalse(cv.validateRandomBaseline(parser))
+
+	def test_validate_retrieval(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateRetrieval(parser))
+
+		self.configDict['retrieval'] = True
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateRetrieval(parser))
+		self.assertEqual(cv.getRetrievalKs(parser), [1, 5, 10])
+
+		self.configDict['retrievalK'] = '20,1'
+		self.configDict['retrievalIndex'] = 'lsh'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateRetrieval(parser))
+		self.assertEqual(cv.getRetrievalKs(parser), [1, 20])
+
+		for key, value in [('retrievalK', '0,5'), ('retrievalK', 'a'), 
+			('retrievalIndex', 'tree'), ('lshBits', '63'), ('lshTables', '0'),
+			('baseLineMethod', 'wordCrossover'), ('grouped', True)]:
+			configDict = dict(self.configDict)
+			configDict[key] = value
+			self.write_dict_to_config(configDict)
+			parser = SafeConfigParser()
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateRetrieval(parser))
+
+	def test_validate_exhaustive_ofm(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateExhaustiveOFM(parser))
+
+		self.configDict['exhaustiveOFM'] = True
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateExhaustiveOFM(parser))
+
+		for key in ['grouped', 'retrieval']:
+			configDict = dict(self.configDict)
+			configDict[key] = True
+			self.write_dict_to_config(configDict)
+			parser = SafeConfigParser()
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateExhaustiveOFM(parser))
+
+	def test_validate_workers(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateWorkers(parser))
+
+		self.configDict['workers'] = 32
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateWorkers(parser))
+
+		for workers in [0, -2, 1.5, 'all']:
+			self.configDict['workers'] = workers
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateWorkers(parser))
+
+	def test_validate_solver_budget(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateSolverBudget(parser))
+
+		self.configDict['solverTimeLimit'] = 0.5
+		self.configDict['solverIterations'] = 50
+		self.configDict['compareToExact'] = True
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateSolverBudget(parser))
+
+		invalidValues = [('solverTimeLimit', 'soon'), ('solverTimeLimit', -1), 
+			('solverIterations', 2.5), ('solverIterations', -3), 
+			('compareToExact', 'perhaps')]
+		for key, value in invalidValues:
+			validValue = self.configDict[key]
+			self.configDict[key] = value
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateSolverBudget(parser))
+			self.configDict[key] = validValue
+
+	def test_validate_unequal_groups(self):
+		parser = SafeConfigParser()
+
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateUnequalGroups(parser))
+
+		self.configDict['grouped'] = True
+		self.configDict['baseLineMethod'] = 'wordCrossover'
+		self.configDict['unequalGroups'] = True
+		self.configDict['maxExamp'] = 5
+		self.configDict['groupingSolver'] = 'subsetDP'
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateUnequalGroups(parser))
+
+		# Too many examples for the subset DP or a heuristic solver
+		for solver in ['subsetDP', 'greedy', 'localSearch', 'kMedoids']:
+			self.configDict['groupingSolver'] = solver
+			self.configDict['maxExamp'] = 8
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertTrue(cv.validateUnequalGroups(parser))
+		self.configDict['groupingSolver'] = 'subsetDP'
+		self.configDict['maxExamp'] = 5
+
+		invalidValues = [('unequalGroups', 'sometimes'), ('maxExamp', 'many'), 
+			('maxExamp', 1), ('groupingSolver', 'exact'), 
+			('groupingSolver', 'matching')]
+		for key, value in invalidValues:
+			validValue = self.configDict[key]
+			self.configDict[key] = value
+			self.write_dict_to_config(self.configDict)
+			parser.read(self.configFN)
+			self.assertFalse(cv.validateUnequalGroups(parser))
+			self.configDict[key] = validValue
+
+		# Random groupings do not need a solver
+		self.configDict['baseLineMethod'] = 'random'
+		self.configDict['groupingSolver'] = 'bruteForce'
+		self.configDict['maxExamp'] = 7
+		self.write_dict_to_config(self.configDict)
+		parser.read(self.configFN)
+		self.assertTrue(cv.validateUnequalGroups(parser))
+
 	def write_dict_to_config(self, configDict):
 		with open(self.configFN, 'w') as f:
 			f.write('[evaluation_params]'+'\n')
@@ -0,0 +1,86 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import crossoverSimilarity as cs
+import baseLinePredictions as blp
+from random import Random
+from tokenInterning import TokenVocabulary
+
+class TestCrossoverSimilarity(unittest.TestCase):
+
+	def setUp(self):
+		rand = Random(2)
+		tokens = ['the', 'big', 'cat', 'dog', 'ran', 'red', 'apples', 'are']
+		self.tokenLists = dict((key, [[rand.choice(tokens) 
+			for i in range(rand.randint(1, 8))] for example in range(size)])
+			for key, size in [('word1', 9), ('word2', 4), ('word3', 16)])
+
+	def test_count_matrix(self):
+		counts, vocabulary = cs.createCountMatrix([['a', 'b', 'a'], [], ['c']])
+		self.assertEqual(counts.shape, (3, 3))
+		self.assertEqual(counts[0, vocabulary['a']], 2)
+		self.assertEqual(counts[0, vocabulary['b']], 1)
+		self.assertEqual(counts[1].nnz, 0)
+		counts, vocabulary = cs.createCountMatrix([['d', 'a']], vocabulary)
+		self.assertEqual(sorted(vocabulary.values()), [0, 1, 2, 3])
+		self.assertEqual(counts[0, vocabulary['a']], 1)
+
+	def test_crossover_matrix_matches_functions(self):
+		for pairs, score in [(False, blp.getCrossoverIntersect), 
+			(True, blp.getCrossoverMatchingWordPairs)]:
+			tokenLists = self.tokenLists['word1']
+			counts, vocabulary = cs.createCountMatrix(tokenLists)
+			matrix = cs.crossoverMatrix(counts, counts, pairs)
+			sentences = [{'tokens':tokens} for tokens in tokenLists]
+			self.assertEqual(matrix.tolist(), [[score(sentence1, sentence2) 
+				for sentence2 in sentences] for sentence1 in sentences])
+
+	def test_crossover_matrices_by_key_match_functions(self):
+		for pairs, score in [(False, blp.getCrossoverIntersect), 
+			(True, blp.getCrossoverMatchingWordPairs)]:
+			matrices = cs.crossoverMatricesByKey(self.tokenLists, pairs)
+			self.assertEqual(set(matrices), set(self.tokenLists))
+			for key in self.tokenLists:
+				sentences = [{'tokens':tokens} for tokens in self.tokenLists[key]]
+				self.assertEqual(matrices[key].tolist(), [[score(sentence1, 
+					sentence2) for sentence2 in sentences] 
+					for sentence1 in sentences])
+
+	def test_crossover_rows_match_functions(self):
+		examples = self.tokenLists['word1']
+		options = self.tokenLists['word3'][:9]
+		for pairs, score in [(False, blp.getCrossoverIntersect), 
+			(True, blp.getCrossoverMatchingWordPairs)]:
+			exampleCounts, vocabulary = cs.createCountMatrix(examples)
+			optionCounts, vocabulary = cs.createCountMatrix(options, vocabulary)
+			rows = cs.crossoverRows(exampleCounts, optionCounts, pairs)
+			self.assertEqual(rows.tolist(), [score({'tokens':example}, 
+				{'tokens':option}) for example, option in zip(examples, options)])
+
+	def test_interned_tokens_match_tokens(self):
+		vocabulary = TokenVocabulary()
+		interned = dict((key, [vocabulary.intern(tokens) for tokens in 
+			self.tokenLists[key]]) for key in self.tokenLists)
+		for pairs in [False, True]:
+			matrices = cs.crossoverMatricesByKey(self.tokenLists, pairs)
+			internedMatrices = cs.crossoverMatricesByKey(interned, pairs)
+			for key in self.tokenLists:
+				self.assertEqual(internedMatrices[key].tolist(), 
+					matrices[key].tolist())
+			counts, tokens = cs.createCountMatrix(self.tokenLists['word3'])
+			internedCounts, internedTokens = cs.createCountMatrix(
+				interned['word3'], vocabulary)
+			self.assertTrue(internedTokens is vocabulary)
+			self.assertEqual(cs.crossoverMatrix(internedCounts, internedCounts, 
+				pairs).tolist(), cs.crossoverMatrix(counts, counts, pairs).tolist())
+
+	def test_sentences_without_tokens(self):
+		counts, vocabulary = cs.createCountMatrix([['a'], []])
+		self.assertEqual(cs.crossoverMatrix(counts, counts, True).tolist(), 
+			[[1, 0], [0, 0]])
+		self.assertRaises(ZeroDivisionError, cs.crossoverMatrix, counts, counts)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -91,6 +91,26 @@ class TestRandomSelection(unittest.TestCase):
 					if token in lemmatizedDict:
 						lemmatizedDict[token] in example['tokens']					
 
+	def test_intern_tokens(self):
+		testDict = {'word1':[{'pos':'Noun', 'examples':[
+			{'sent':'a cat', 'tokens':['a', 'cat']}, 
+			{'sent':'the cat', 'tokens':['the', 'cat']}]}], 
+			'word2':[{'pos':'Verb', 'examples':[{'sent':'', 'tokens':[]}]}]}
+		internedDict, vocabulary = ds.internTokens(testDict)
+		self.assertEqual(len(vocabulary), 3)
+		for key in testDict:
+			for sense, internedSense in zip(testDict[key], internedDict[key]):
+				self.assertEqual(internedSense['pos'], sense['pos'])
+				for example, internedExample in zip(sense['examples'], 
+					internedSense['examples']):
+					self.assertEqual(internedExample['sent'], example['sent'])
+					self.assertEqual(internedExample['tokens'].dtype.name, 'int32')
+					self.assertEqual(vocabulary.getTokens(internedExample['tokens']),
+						example['tokens'])
+		# The data given is left as it was
+		self.assertEqual(testDict['word1'][0]['examples'][0]['tokens'], 
+			['a', 'cat'])
+
 	def test_remove_stopwords(self):
 		testDict = {'word1': [{'pos':'Noun', 'def':'A', 'examples':['i myself need an apple',
 		'we have to move on billy','we wont be ourselves']}, 
@@ -175,6 +195,29 @@ class TestRandomSelection(unittest.TestCase):
 			values = groupedTestData[key]
 			self.assertTrue(len(values), numOfSenses * numOfExamples)
 
+	def test_select_examples_and_senses_keeps_data(self):
+		largerDict = self.getLargerDict()
+		selectedSenses = ds.selectExamplesAndSenses(largerDict, 4, 3)
+		selectedSenses = ds.selectExamplesAndSenses(largerDict, 4, 5)
+		self.assertEqual(sorted(len(sense['examples']) 
+			for sense in selectedSenses['break']), [3, 4, 5, 5])
+		self.assertEqual(sorted(len(sense['examples']) 
+			for sense in largerDict['break']), [3, 4, 5, 6])
+
+	def test_create_grouped_test_labels(self):
+		largerDict = self.getLargerDict()
+		selectedSenses = ds.selectExamplesAndSenses(largerDict, 4, 5)
+		groupedTestData = ds.createGroupedTestData(selectedSenses)
+		labels = ds.createGroupedTestLabels(selectedSenses)
+		groupSizes = ds.getGroupSizes(selectedSenses)
+		for key in groupedTestData:
+			self.assertEqual(len(labels[key]), len(groupedTestData[key]))
+			self.assertEqual(sum(groupSizes[key]), len(groupedTestData[key]))
+			for example, label in zip(groupedTestData[key], labels[key]):
+				self.assertTrue(example in selectedSenses[key][label]['examples'])
+			self.assertEqual([labels[key].count(sense) 
+				for sense in range(len(groupSizes[key]))], groupSizes[key])
+
 	def test_create_one_from_many_data(self):	
 		largerDict = self.getLargerDict()
 		dictLength = len(largerDict)
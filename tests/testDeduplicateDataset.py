@@ -0,0 +1,97 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+import shutil
+import tempfile
+import deduplicateDataset as dd
+
+class TestDeduplicateDataset(unittest.TestCase):
+
+	def setUp(self):
+		self.dataset = {
+			'bank':[{'def':'river', 'examples':['We walked along the river bank.',
+				'The boat was tied to the bank of the river.']},
+				{'def':'money', 'examples':['We walked along the River Bank!',
+				'She paid the cheque into the bank on Monday morning.']}],
+			'river':[{'def':'water', 'examples':['We walked along the river bank.',
+				'The river flooded the valley after the storm.']}]}
+
+	def test_shingles(self):
+		self.assertEqual(dd.getShingles('The  Cat!'), dd.getShingles('the cat'))
+		self.assertEqual(len(dd.getShingles('cat')), 1)
+		self.assertEqual(dd.getShingles('...'), set())
+		self.assertEqual(dd.getShingles(u'caf\xe9 au lait'),
+			dd.getShingles(u'Caf\xe9 au lait.'.encode('utf-8')))
+
+	def test_signatures_estimate_jaccard(self):
+		shingles1 = set(range(100))
+		shingles2 = set(range(50, 150))
+		signatures = dd.MinHasher(512, blockSentences=2).getSignatures(
+			[shingles1, shingles2, set(), shingles1])
+		self.assertEqual(signatures[0].tolist(), signatures[3].tolist())
+		self.assertEqual(set(signatures[2].tolist()), set([dd.hashPrime]))
+		estimate = (signatures[0] == signatures[1]).mean()
+		self.assertTrue(abs(estimate - 1 / 3.0) < 0.08)
+
+	def test_find_clusters(self):
+		randomWords = random.Random(1)
+		words = ['word{}'.format(i) for i in range(300)]
+		sentences = [' '.join(randomWords.choice(words) for i in range(12))
+			for sentence in range(200)]
+		# Lightly varied copies of every tenth sentence
+		for i in range(0, 200, 10):
+			sentences.append(sentences[i].upper() + '.')
+		sentences.append('')
+		sentences.append('!')
+		clusters = dd.findDuplicateClusters(sentences)
+		self.assertEqual(clusters, [[i, 200 + i // 10]
+			for i in range(0, 200, 10)])
+
+	def test_deduplicate_dataset(self):
+		cleaned, report = dd.deduplicateDataset(self.dataset)
+		self.assertEqual(report['examples'], 6)
+		self.assertEqual(report['clusters'], [[('bank', 0,
+			'We walked along the river bank.'), ('bank', 1,
+			'We walked along the River Bank!'), ('river', 0,
+			'We walked along the river bank.')]])
+		self.assertEqual(report['removed'], [('bank', 1,
+			'We walked along the River Bank!')])
+		self.assertEqual(cleaned['bank'][1]['examples'],
+			['She paid the cheque into the bank on Monday morning.'])
+		self.assertEqual(cleaned['bank'][1]['def'], 'money')
+		self.assertEqual(cleaned['river'], self.dataset['river'])
+		self.assertEqual(len(self.dataset['bank'][1]['examples']), 2)
+
+		cleaned, report = dd.deduplicateDataset(self.dataset, acrossWords=True)
+		self.assertEqual(len(report['removed']), 2)
+		self.assertEqual(cleaned['river'][0]['examples'],
+			['The river flooded the valley after the storm.'])
+
+	def test_tokenised_examples(self):
+		dataset = {'bank':[{'examples':[{'sent':sentence, 'tokens':[]}
+			for sentence in sense['examples']]}
+			for sense in self.dataset['bank']]}
+		cleaned, report = dd.deduplicateDataset(dataset)
+		self.assertEqual(len(report['removed']), 1)
+		self.assertEqual(len(cleaned['bank'][1]['examples']), 1)
+
+	def test_save_report(self):
+		cleaned, report = dd.deduplicateDataset(self.dataset)
+		tempDir = tempfile.mkdtemp()
+		fileName = os.path.join(tempDir, 'report.txt')
+		dd.saveDuplicateReport(fileName, report)
+		with open(fileName) as reportFile:
+			lines = reportFile.read().splitlines()
+		shutil.rmtree(tempDir)
+		self.assertEqual(lines[0], dd.getReportSummary(report))
+		self.assertEqual(lines[2], '<cluster>')
+		self.assertEqual(lines[3], 'bank\t0\tkept\tWe walked along the river ' +
+			'bank.')
+		self.assertEqual(lines[4], 'bank\t1\tremoved\tWe walked along the River ' +
+			'Bank!')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,136 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import shutil
+import tempfile
+import weakref
+import embeddingBackends as eb
+import baseLinePredictions as blp
+from gensim.models import Word2Vec
+from numpy import float32
+from numpy import memmap
+from numpy import zeros
+from embeddingSimilarity import getSentenceVectors
+from tokenInterning import TokenVocabulary
+
+class TestEmbeddingBackends(unittest.TestCase):
+
+	def setUp(self):
+		corpus = [[u'the', u'big', u'cat'], [u'a', u'red', u'dog', u'ran']] * 50
+		self.tempDir = tempfile.mkdtemp()
+		self.word2vecBin = os.path.join(self.tempDir, 'model.bin')
+		Word2Vec(corpus, size=8, min_count=1, seed=1, workers=1)\
+			.save_word2vec_format(self.word2vecBin, binary=True)
+		self.model = Word2Vec.load_word2vec_format(self.word2vecBin, binary=True)
+		self.words = [u'the', u'big', u'cat', u'a', u'red', u'dog', u'ran']
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def assertSameAsModel(self, backend):
+		self.assertEqual(backend.vectorSize, 8)
+		self.assertFalse(u'unseen' in backend)
+		self.assertRaises(KeyError, backend.__getitem__, u'unseen')
+		for word in self.words:
+			self.assertTrue(word in backend)
+			self.assertEqual(backend[word].tolist(), self.model[word].tolist())
+		self.assertAlmostEqual(backend.similarity(u'cat', u'dog'),
+			self.model.similarity(u'cat', u'dog'), places=6)
+
+	def test_gensim_backend(self):
+		self.assertSameAsModel(eb.GensimBackend(self.model))
+		backend = eb.getEmbeddingBackend(self.model)
+		self.assertTrue(isinstance(backend, eb.GensimBackend))
+		self.assertTrue(eb.getEmbeddingBackend(backend) is backend)
+
+	def test_mmap_backend(self):
+		backend = eb.loadGensimBackend(self.word2vecBin)
+		self.assertTrue(isinstance(backend.vectors, memmap))
+		self.assertSameAsModel(backend)
+		# The converted vectors are reused
+		modifiedTime = os.path.getmtime(self.word2vecBin + '.kv')
+		self.assertSameAsModel(eb.loadGensimBackend(self.word2vecBin))
+		self.assertEqual(os.path.getmtime(self.word2vecBin + '.kv'),
+			modifiedTime)
+
+	def test_matrix_backend(self):
+		backend = eb.convertToMatrixBackend(self.word2vecBin)
+		self.assertTrue(isinstance(backend.vectors, memmap))
+		self.assertSameAsModel(backend)
+		self.assertSameAsModel(eb.loadMatrixBackend(self.word2vecBin + '.matrix'))
+
+	def test_synthetic_backend(self):
+		backend = eb.SyntheticBackend([u'cat', u'dog'], vectorSize=5, seed=3)
+		self.assertEqual(backend.vectors.shape, (2, 5))
+		self.assertFalse(u'the' in backend)
+		self.assertEqual(backend[u'cat'].tolist(),
+			eb.SyntheticBackend([u'cat', u'dog'], 5, 3)[u'cat'].tolist())
+		self.assertAlmostEqual(backend.similarity(u'cat', u'cat'), 1.0)
+
+	def test_quantised_backends(self):
+		backend = eb.GensimBackend(self.model)
+		self.assertTrue(eb.quantiseBackend(self.model, 'float32') is self.model)
+		for precision, tolerance in [('float16', 1e-3), ('int8', 1e-2)]:
+			quantised = eb.quantiseBackend(self.model, precision)
+			if precision == 'float16':
+				self.assertEqual(quantised.getVectorBytes(), 
+					backend.getVectorBytes() / 2)
+			else:
+				# A float32 scale for each row
+				self.assertEqual(quantised.getVectorBytes(), 
+					backend.getVectorBytes() / 4 + len(self.words) * 4)
+			self.assertFalse(u'unseen' in quantised)
+			for word in self.words:
+				error = abs(quantised[word] - self.model[word]).max()
+				self.assertTrue(error <= tolerance * abs(self.model[word]).max())
+			self.assertAlmostEqual(quantised.similarity(u'cat', u'dog'),
+				self.model.similarity(u'cat', u'dog'), places=2)
+			tokenLists = [[u'the', u'cat'], [u'red', u'dog', u'unseen']]
+			self.assertTrue(abs(getSentenceVectors(tokenLists, quantised) - 
+				getSentenceVectors(tokenLists, self.model)).max() < 0.02)
+
+	def test_quantised_backends_free_full_precision(self):
+		for precision in ['float16', 'int8']:
+			backend = eb.MatrixBackend(zeros((1000, 300), dtype=float32) + 1,
+				dict((str(row), row) for row in range(1000)))
+			vectors = weakref.ref(backend.vectors)
+			quantised = eb.quantiseBackend(backend, precision)
+			del backend
+			self.assertTrue(vectors() is None)
+			self.assertEqual(quantised[u'7'].tolist(), [1.0] * 300)
+
+			model = Word2Vec.load_word2vec_format(self.word2vecBin, binary=True)
+			vectors = weakref.ref(model.syn0)
+			quantised = eb.quantiseBackend(model, precision)
+			del model
+			self.assertTrue(vectors() is None)
+			self.assertTrue(u'cat' in quantised)
+
+	def test_int8_zero_rows(self):
+		backend = eb.MatrixBackend(zeros((2, 3), dtype=float32), 
+			{u'zero':0, u'also':1})
+		quantised = eb.QuantisedBackend(backend, 'int8')
+		self.assertEqual(quantised[u'zero'].tolist(), [0.0, 0.0, 0.0])
+
+	def test_prediction_functions_accept_backends(self):
+		sentence1 = {'tokens':[u'the', u'cat', u'unseen']}
+		sentence2 = {'tokens':[u'a', u'red', u'dog']}
+		backend = eb.convertToMatrixBackend(self.word2vecBin)
+		self.assertAlmostEqual(blp.word2vecWordSimilarity(sentence1, sentence2,
+			backend), blp.word2vecWordSimilarity(sentence1, sentence2,
+			self.model), places=5)
+		self.assertEqual(blp.getVectorSum(sentence1['tokens'], backend).tolist(),
+			blp.getVectorSum(sentence1['tokens'], self.model).tolist())
+		tokenLists = [sentence1['tokens'], sentence2['tokens']]
+		self.assertEqual(getSentenceVectors(tokenLists, backend).tolist(),
+			getSentenceVectors(tokenLists, self.model).tolist())
+		vocabulary = TokenVocabulary()
+		tokenIDs = [vocabulary.intern(tokens) for tokens in tokenLists]
+		self.assertEqual(getSentenceVectors(tokenIDs, backend,
+			vocabulary).tolist(), getSentenceVectors(tokenLists,
+			self.model).tolist())
+
+if __name__ == '__main__':
+	unittest.main()
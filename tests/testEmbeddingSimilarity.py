@@ -0,0 +1,139 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import embeddingSimilarity as es
+import baseLinePredictions as blp
+from gensim.models import Word2Vec
+from random import Random
+from random import seed as seedRandom
+from numpy import allclose
+from numpy import isnan
+from tokenInterning import TokenVocabulary
+
+class TestEmbeddingSimilarity(unittest.TestCase):
+
+	def setUp(self):
+		rand = Random(1)
+		self.tokens = ['the', 'big', 'cat', 'dog', 'ran', 'red', 'apples', 'are']
+		corpus = [[rand.choice(self.tokens) for i in range(6)] 
+			for sentence in range(200)]
+		self.model = Word2Vec(corpus, size=10, min_count=1, seed=1, workers=1)
+		# Tokens the model has never seen are ignored
+		self.tokenLists = [[rand.choice(self.tokens + ['unseen']) 
+			for i in range(rand.randint(0, 8))] for sentence in range(12)]
+
+	def test_unit_vectors(self):
+		unitVectors = es.getUnitVectors({'cat':0, 'unseen':1}, self.model)
+		self.assertEqual(unitVectors.dtype.name, 'float32')
+		self.assertAlmostEqual(unitVectors[0].dot(unitVectors[0]), 1.0, places=5)
+		self.assertEqual(unitVectors[1].tolist(), [0.0] * 10)
+
+	def test_word_similarity_rows_match_function(self):
+		rows = es.word2vecWordSimilarityRows(self.tokenLists[:6], 
+			self.tokenLists[6:], self.model)
+		for score, tokens1, tokens2 in zip(rows, self.tokenLists[:6], 
+			self.tokenLists[6:]):
+			self.assertAlmostEqual(score, blp.word2vecWordSimilarity(
+				{'tokens':tokens1}, {'tokens':tokens2}, self.model), places=4)
+
+	def test_word_similarity_matrix_match_function(self):
+		matrix = es.word2vecWordSimilarityMatrix(self.tokenLists[:5], 
+			self.tokenLists, self.model)
+		self.assertEqual(matrix.shape, (5, 12))
+		for i, tokens1 in enumerate(self.tokenLists[:5]):
+			for j, tokens2 in enumerate(self.tokenLists):
+				self.assertAlmostEqual(matrix[i][j], blp.word2vecWordSimilarity(
+					{'tokens':tokens1}, {'tokens':tokens2}, self.model), places=4)
+
+	def test_word_similarity_without_known_tokens(self):
+		rows = es.word2vecWordSimilarityRows([[], ['unseen']], 
+			[['cat'], ['cat']], self.model)
+		self.assertEqual(rows.tolist(), [0.0, 0.0])
+
+	def test_ofm_word_similarity_selection(self):
+		data = {'cat':{'example':{'sent':'the cat', 'tokens':['the', 'cat']}, 
+			'options':[{'sent':'big cat', 'tokens':['big', 'cat', 'cat']}, 
+			{'sent':'unseen', 'tokens':['unseen']}]}}
+		scores = [blp.word2vecWordSimilarity(data['cat']['example'], option, 
+			self.model) for option in data['cat']['options']]
+		expected = data['cat']['options'][scores.index(max(scores))]['sent']
+		results = blp.OFMPredictions().word2VecSimilaritySelectionWordSim(data, 
+			self.model)
+		self.assertEqual(results, {'cat':{'example':'the cat', 
+			'solution':expected}})
+
+	def test_interned_tokens_match_tokens(self):
+		vocabulary = TokenVocabulary()
+		interned = [vocabulary.intern(tokens) for tokens in self.tokenLists]
+		self.assertTrue(allclose(es.word2vecWordSimilarityMatrix(interned, 
+			interned, self.model, vocabulary), es.word2vecWordSimilarityMatrix(
+			self.tokenLists, self.tokenLists, self.model)))
+		distances = es.cosineDistanceMatricesByKey({'word':self.tokenLists}, 
+			self.model)['word']
+		internedDistances = es.cosineDistanceMatricesByKey({'word':interned}, 
+			self.model, vocabulary)['word']
+		self.assertTrue(allclose(internedDistances, distances, equal_nan=True))
+		self.assertRaises(ValueError, es.getSentenceVectors, interned, 
+			self.model)
+
+	def test_cosine_distances_from_vectors(self):
+		vectors = es.getSentenceVectors(self.tokenLists, self.model)
+		self.assertTrue(allclose(es.getCosineDistanceRows(vectors[:6], 
+			vectors[6:]), es.cosineDistanceRows(self.tokenLists[:6], 
+			self.tokenLists[6:], self.model), equal_nan=True))
+		distances = es.getCosineDistanceMatrices({'word':vectors[:4]})['word']
+		self.assertTrue(allclose(distances, es.cosineDistanceMatricesByKey(
+			{'word':self.tokenLists[:4]}, self.model)['word'], equal_nan=True))
+
+	def test_sentence_vectors(self):
+		vectors = es.getSentenceVectors([['cat', 'dog', 'cat'], ['unseen']], 
+			self.model)
+		self.assertEqual(vectors.dtype.name, 'float32')
+		self.assertTrue(vectors.flags.c_contiguous)
+		self.assertAlmostEqual(vectors[0].dot(vectors[0]), 1.0, places=5)
+		self.assertTrue(isnan(vectors[1]).all())
+
+	def test_cosine_distance_rows_match_function(self):
+		tokenLists = self.tokenLists + [[], ['unseen']]
+		rows = es.cosineDistanceRows(tokenLists[:7], tokenLists[7:], self.model)
+		for distance, tokens1, tokens2 in zip(rows, tokenLists[:7], 
+			tokenLists[7:]):
+			expected = blp.cosineSimilarity({'tokens':tokens1}, 
+				{'tokens':tokens2}, self.model)
+			if isnan(expected):
+				self.assertTrue(isnan(distance))
+			else:
+				self.assertAlmostEqual(distance, expected, places=5)
+
+	def test_cosine_distance_matrices_match_function(self):
+		tokenListsByKey = {'word1':self.tokenLists[:5], 
+			'word2':self.tokenLists[5:]}
+		distancesByKey = es.cosineDistanceMatricesByKey(tokenListsByKey, 
+			self.model)
+		for key, tokenLists in tokenListsByKey.items():
+			self.assertEqual(distancesByKey[key].shape, 
+				(len(tokenLists), len(tokenLists)))
+			for i, tokens1 in enumerate(tokenLists):
+				for j, tokens2 in enumerate(tokenLists):
+					expected = blp.cosineSimilarity({'tokens':tokens1}, 
+						{'tokens':tokens2}, self.model)
+					if isnan(expected):
+						self.assertTrue(isnan(distancesByKey[key][i][j]))
+					else:
+						self.assertAlmostEqual(distancesByKey[key][i][j], expected, 
+							places=5)
+
+	def test_ofm_cosine_selection_skips_unknown_options(self):
+		data = {'cat':{'example':{'sent':'the cat', 'tokens':['the', 'cat']}, 
+			'options':[{'sent':'unseen', 'tokens':['unseen']}, 
+			{'sent':'the cat', 'tokens':['the', 'cat']}]}}
+		for seed in range(5):
+			seedRandom(seed)
+			results = blp.OFMPredictions().word2VecSimilaritySelectionCosine(data, 
+				self.model)
+			self.assertEqual(results['cat']['solution'], 'the cat')
+
+if __name__ == '__main__':
+	unittest.main()
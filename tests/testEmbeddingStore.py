@@ -0,0 +1,102 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import shutil
+import tempfile
+import embeddingStore as es
+from embeddingSimilarity import getSentenceVectors
+from baseLinePredictions import GroupedPredictions
+from gensim.models import Word2Vec
+from random import seed
+from numpy import allclose
+from numpy import isnan
+from numpy import memmap
+
+class TestEmbeddingStore(unittest.TestCase):
+
+	def setUp(self):
+		corpus = [['the', 'big', 'cat'], ['a', 'red', 'dog', 'ran']] * 50
+		self.model = Word2Vec(corpus, size=8, min_count=1, seed=1, workers=1)
+		self.dataset = {'cat':[{'examples':[
+			{'sent':'the big cat', 'tokens':['the', 'big', 'cat']},
+			{'sent':'unseen', 'tokens':['unseen']}]}, 
+			{'examples':[{'sent':'a red dog', 'tokens':['a', 'red', 'dog']}]}],
+			'dog':[{'examples':[{'sent':'a red dog', 'tokens':['a', 'red', 'dog']},
+			{'sent':'dog ran', 'tokens':['dog', 'ran']}]}]}
+		self.storeDir = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.storeDir)
+
+	def test_dataset_examples(self):
+		examples = es.getDatasetExamples(self.dataset)
+		self.assertEqual(sorted(example['sent'] for example in examples), 
+			['a red dog', 'dog ran', 'the big cat', 'unseen'])
+
+	def test_save_and_load(self):
+		self.assertTrue(es.loadEmbeddingStore(self.storeDir, 'key') is None)
+		examples = es.getDatasetExamples(self.dataset)
+		es.saveEmbeddingStore(examples, self.model, self.storeDir, 'key')
+		store = es.loadEmbeddingStore(self.storeDir, 'key')
+		self.assertTrue(isinstance(store.vectors, memmap))
+		self.assertEqual(len(store), 4)
+		self.assertEqual(store.noVectorSents, ['unseen'])
+		self.assertEqual(store.getMissingExamples(examples), [])
+		sents = ['dog ran', 'the big cat', 'unseen']
+		vectors = store.getVectors(sents)
+		self.assertEqual(vectors.dtype.name, 'float32')
+		expected = getSentenceVectors([['dog', 'ran'], ['the', 'big', 'cat'], 
+			['unseen']], self.model)
+		self.assertTrue(allclose(vectors[:2], expected[:2]))
+		self.assertTrue(isnan(vectors[2]).all())
+
+	def test_add_missing_examples(self):
+		examples = es.getDatasetExamples(self.dataset)
+		store = es.saveEmbeddingStore(examples[:2], self.model, self.storeDir, 
+			'key')
+		missing = store.getMissingExamples(examples)
+		self.assertEqual(len(missing), 2)
+		store = es.saveEmbeddingStore(missing, self.model, self.storeDir, 'key', 
+			store)
+		self.assertEqual(len(store), 4)
+		self.assertEqual(store.getMissingExamples(examples), [])
+		for example in examples:
+			vector = store.getVectors([example['sent']])
+			expected = getSentenceVectors([example['tokens']], self.model)
+			self.assertTrue(allclose(vector, expected, equal_nan=True))
+
+	def test_predictions_match_model(self):
+		examples = es.getDatasetExamples(self.dataset)
+		store = es.saveEmbeddingStore(examples, self.model, self.storeDir, 'key')
+		testData = {'dog':examples}
+		for seedNo in range(5):
+			seed(seedNo)
+			expected = GroupedPredictions().word2VecSimilaritySelection(testData,
+				2, self.model)
+			seed(seedNo)
+			predictions = GroupedPredictions(embeddingStore=store)\
+				.word2VecSimilaritySelection(testData, 2, None)
+			self.assertEqual(predictions, expected)
+
+	def test_store_key(self):
+		paths = []
+		for name in ['model.bin', 'dictionary']:
+			paths.append(os.path.join(self.storeDir, name))
+			with open(paths[-1], 'w') as f:
+				f.write(name)
+		key = es.getStoreKey(paths[0], True, True, False, paths[1])
+		self.assertEqual(key, es.getStoreKey(paths[0], True, True, False, 
+			paths[1]))
+		self.assertNotEqual(key, es.getStoreKey(paths[0], True, False, False, 
+			paths[1]))
+		self.assertNotEqual(key, es.getStoreKey(paths[1], True, True, False, 
+			paths[0]))
+		with open(paths[1], 'a') as f:
+			f.write(' changed')
+		self.assertNotEqual(key, es.getStoreKey(paths[0], True, True, False, 
+			paths[1]))
+
+if __name__ == '__main__':
+	unittest.main()
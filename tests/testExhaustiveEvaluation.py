@@ -0,0 +1,100 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from itertools import combinations
+from itertools import product
+from numpy import array
+from numpy import isnan
+from numpy import mean
+from numpy import nan
+from numpy import repeat
+from numpy import where
+from numpy.random import RandomState
+import dataSelection as ds
+import exhaustiveEvaluation as ee
+from evaluateDatasets import runOFMTest
+from syntheticData import createSyntheticDataset
+from syntheticData import createSyntheticModel
+
+class TestExhaustiveEvaluation(unittest.TestCase):
+
+	def setUp(self):
+		self.model = createSyntheticModel()
+		keys = ['word{}'.format(key) for key in range(12)]
+		self.dataset = createSyntheticDataset(keys, 2, (3, 5), (2, 4), 4)
+
+	def getEnumeratedAccuracy(self, scores, labels, numOptions, minValue):
+		# Every problem one by one, the choice of other senses made before the
+		# choice of their examples as when sampling
+		scores = where(isnan(scores), float('inf'), scores)
+		if minValue:
+			scores = -scores
+		senses = sorted(set(labels))
+		members = dict((sense, [i for i in range(len(labels))
+			if labels[i] == sense]) for sense in senses)
+		senseAccuracies = []
+		for sense in senses:
+			queryAccuracies = []
+			for query in members[sense]:
+				correctAccuracies = []
+				for correct in members[sense]:
+					if correct == query:
+						continue
+					choiceAccuracies = []
+					for others in combinations([other for other in senses
+						if other != sense], numOptions - 1):
+						problems = []
+						for options in product(*[members[other] for other in others]):
+							optionScores = [scores[query, option] for option in options]
+							score = scores[query, correct]
+							problems.append(0.0 if max(optionScores) > score else
+								1.0 / (1 + optionScores.count(score)))
+						choiceAccuracies.append(mean(problems))
+					correctAccuracies.append(mean(choiceAccuracies))
+				queryAccuracies.append(mean(correctAccuracies))
+			senseAccuracies.append(mean(queryAccuracies))
+		return mean(senseAccuracies)
+
+	def test_matches_enumeration(self):
+		randomScores = RandomState(0)
+		for trial in range(20):
+			sizes = randomScores.randint(2, 4, randomScores.randint(3, 6))
+			labels = repeat(range(len(sizes)), sizes)
+			# Few distinct scores so many options tie
+			scores = randomScores.randint(0, 3, (len(labels),) * 2).astype(float)
+			if trial % 3 == 0:
+				scores[randomScores.randint(len(labels))] = nan
+			numOptions = randomScores.randint(2, len(sizes) + 1)
+			for minValue in [True, False]:
+				self.assertAlmostEqual(ee.getWordOFMAccuracy(scores, labels,
+					numOptions, minValue), self.getEnumeratedAccuracy(scores,
+					labels.tolist(), numOptions, minValue))
+
+	def test_question_num(self):
+		# Senses of 2, 3 and 1 examples with 2 options
+		self.assertEqual(ee.getOFMQuestionNum([0, 0, 1, 1, 1, 2], 2),
+			2 * (3 + 1) + 6 * (2 + 1))
+		self.assertEqual(ee.getOFMQuestionNum([0, 0, 1, 1, 1, 2], 3),
+			2 * 3 + 6 * 2)
+
+	def test_random_method(self):
+		report = ee.runExhaustiveOFMTest(self.dataset, 'random', 3)
+		self.assertAlmostEqual(report['accuracy'], 1 / 3.0)
+		self.assertAlmostEqual(report['variance'], 2 / 9.0 / len(self.dataset))
+		self.assertEqual(report['words'], len(self.dataset))
+
+	def test_agrees_with_sampled(self):
+		random.seed(3)
+		iterations = 400
+		for method in ['wordCrossover', 'word2vecCosine']:
+			report = ee.runExhaustiveOFMTest(self.dataset, method, 3, self.model)
+			accuracies = array([runOFMTest(ds.selectExamplesAndSenses(self.dataset,
+				3, 2), method, self.model) for i in range(iterations)])
+			self.assertTrue(abs(accuracies.mean() - report['accuracy']) <
+				4 * (report['variance'] / iterations) ** 0.5)
+
+if __name__ == '__main__':
+	unittest.main()
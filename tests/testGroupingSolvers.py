@@ -0,0 +1,233 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import groupingSolvers as gs
+from itertools import permutations
+from random import Random
+from numpy.random import RandomState
+from baseLinePredictions import GroupedPredictions
+
+class TestGroupingSolvers(unittest.TestCase):
+
+	def test_partition_template_counts(self):
+		self.assertEqual(len(gs.getPartitionTemplates(9, 3)), 280)
+		self.assertEqual(len(gs.getPartitionTemplates(6, 2)), 15)
+		self.assertEqual(len(gs.getPartitionTemplates(8, 4)), 35)
+		self.assertEqual(len(gs.getPartitionTemplates(4, 4)), 1)
+
+	def test_partition_templates_are_distinct_partitions(self):
+		templates = gs.getPartitionTemplates(9, 3)
+		self.assertEqual(templates.shape, (280, 3, 3))
+		seen = set()
+		for partition in templates:
+			self.assertEqual(sorted(partition.flatten()), list(range(9)))
+			seen.add(frozenset(frozenset(group) for group in partition))
+		self.assertEqual(len(seen), 280)
+
+	def test_partition_templates_are_cached(self):
+		first = gs.getPartitionTemplates(9, 3)
+		second = gs.getPartitionTemplates(9, 3)
+		self.assertTrue(first is second)
+		self.assertFalse(first.flags.writeable)
+
+	def test_partition_templates_invalid_size(self):
+		self.assertRaises(ValueError, gs.getPartitionTemplates, 10, 3)
+
+	def test_score_partitions_matches_group_score(self):
+		groupedPredictor = GroupedPredictions()
+		simValues = [[(i * 7 + j * 3) % 5 for j in range(6)] for i in range(6)]
+		templates = gs.getPartitionTemplates(6, 3)
+		scores = gs.scorePartitions(simValues, templates)
+		idMap = dict((i, i) for i in range(6))
+		for partition, score in zip(templates, scores):
+			manual = sum(groupedPredictor.calculateGroupScore(group, simValues,
+				idMap) for group in partition)
+			self.assertEqual(score, manual)
+
+	def test_subset_templates_match_partition_templates(self):
+		subsets, partitionSubsets = gs.getSubsetTemplates(9, 3)
+		templates = gs.getPartitionTemplates(9, 3)
+		self.assertEqual(len(subsets), 84)
+		self.assertEqual(partitionSubsets.shape, (280, 3))
+		for partition, subsetIDs in zip(templates, partitionSubsets):
+			for group, subsetID in zip(partition, subsetIDs):
+				self.assertEqual(list(group), list(subsets[subsetID]))
+
+	def test_batch_solver_matches_brute_force(self):
+		rand = Random(5)
+		for exampleNum, groupSize in [(6, 2), (9, 3), (8, 4)]:
+			templates = gs.getPartitionTemplates(exampleNum, groupSize)
+			batch = [[[rand.random() for j in range(exampleNum)] 
+				for i in range(exampleNum)] for word in range(6)]
+			for minValue in [False, True]:
+				selections = gs.solveGroupingsBatch(batch, groupSize, minValue, 
+					maxElements=len(templates) * 4)
+				for simValues, selection in zip(batch, selections):
+					scores = gs.scorePartitions(simValues, templates)
+					best = scores.min() if minValue else scores.max()
+					self.assertAlmostEqual(gs.groupingScore(simValues, selection), 
+						best)
+
+	def test_batch_solver_breaks_ties_at_random(self):
+		# Every grouping scores the same so the choice is down to the ties
+		batch = [[[1] * 6 for i in range(6)]] * 50
+		selections = gs.solveGroupingsBatch(batch, 3, False, RandomState(0))
+		chosen = set(tuple(selection.flatten()) for selection in selections)
+		self.assertTrue(len(chosen) > 1)
+		selections = gs.solveGroupingsBatch(batch, 3, False)
+		chosen = set(tuple(selection.flatten()) for selection in selections)
+		self.assertEqual(len(chosen), 1)
+
+	def test_exact_solver_matches_brute_force(self):
+		rand = Random(7)
+		for exampleNum, groupSize in [(6, 2), (6, 3), (9, 3), (8, 4), (12, 3)]:
+			templates = gs.getPartitionTemplates(exampleNum, groupSize)
+			for trial in range(5):
+				simValues = [[rand.randint(0, 4) for j in range(exampleNum)] 
+					for i in range(exampleNum)]
+				scores = gs.scorePartitions(simValues, templates)
+				for minValue in [False, True]:
+					grouping = gs.solveGroupingExact(simValues, groupSize, minValue)
+					self.assertEqual(sorted(sum(grouping, [])), 
+						list(range(exampleNum)))
+					best = scores.min() if minValue else scores.max()
+					self.assertAlmostEqual(gs.groupingScore(simValues, grouping), 
+						best)
+
+	def test_exact_solver_on_random_similarities(self):
+		rand = Random(6)
+		for exampleNum, groupSize in [(9, 3), (10, 5), (12, 3), (12, 4)]:
+			simValues = [[rand.random() for j in range(exampleNum)]
+				for i in range(exampleNum)]
+			scores = gs.scorePartitions(simValues,
+				gs.getPartitionTemplates(exampleNum, groupSize))
+			for minValue in [False, True]:
+				grouping = gs.solveGroupingExact(simValues, groupSize, minValue)
+				best = scores.min() if minValue else scores.max()
+				self.assertAlmostEqual(gs.groupingScore(simValues, grouping), best)
+		# 6 senses by 6 examples is more examples than the subset DP can hold
+		simValues = [[rand.random() for j in range(36)] for i in range(36)]
+		self.assertRaises(ValueError, gs.solveGroupingExact, simValues, 6, False)
+		# Pairs are matched so any number of senses can be grouped
+		self.assertEqual(gs.solveGroupingExact(simValues, 2, False),
+			gs.solveGroupingMatching(simValues, False))
+
+	def test_heuristic_solvers_return_partitions(self):
+		rand = Random(11)
+		solvers = [gs.solveGroupingGreedy, gs.solveGroupingLocalSearch,
+			gs.solveGroupingKMedoids]
+		for exampleNum, groupSize in [(6, 2), (9, 3), (16, 4), (25, 5)]:
+			simValues = [[rand.random() for j in range(exampleNum)]
+				for i in range(exampleNum)]
+			for solve in solvers:
+				for minValue in [False, True]:
+					grouping = solve(simValues, groupSize, minValue,
+						maxIterations=5, randomState=RandomState(1))
+					self.assertEqual(sorted(sum(grouping, [])),
+						list(range(exampleNum)))
+					self.assertTrue(all(len(group) == groupSize
+						for group in grouping))
+		# Groups of unequal size
+		for groupSizes in [[2, 3, 4], [5, 1, 7, 3, 8]]:
+			exampleNum = sum(groupSizes)
+			simValues = [[rand.random() for j in range(exampleNum)]
+				for i in range(exampleNum)]
+			for solve in solvers:
+				grouping = solve(simValues, groupSizes, False, maxIterations=5,
+					randomState=RandomState(1))
+				self.assertEqual(sorted(sum(grouping, [])), list(range(exampleNum)))
+				self.assertEqual([len(group) for group in grouping], groupSizes)
+
+	def test_heuristic_solvers_find_clear_senses(self):
+		rand = Random(3)
+		senses = [i // 5 for i in range(25)]
+		rand.shuffle(senses)
+		simValues = [[(1 if senses[i] == senses[j] else 0) + rand.random() * 0.3
+			for j in range(25)] for i in range(25)]
+		for solve in [gs.solveGroupingLocalSearch, gs.solveGroupingKMedoids]:
+			grouping = solve(simValues, 5, False, maxIterations=20,
+				randomState=RandomState(0))
+			for group in grouping:
+				self.assertEqual(len(set(senses[i] for i in group)), 1)
+
+	def test_search_budget(self):
+		budget = gs.SearchBudget()
+		self.assertFalse(budget.spend())
+		budget = gs.SearchBudget(maxIterations=3)
+		self.assertEqual([budget.spend() for i in range(3)], [True, True, False])
+		budget = gs.SearchBudget(timeLimit=0)
+		self.assertFalse(budget.spend())
+
+	def test_optimality_gap(self):
+		rand = Random(5)
+		simValues = [[rand.randint(0, 4) for j in range(9)] for i in range(9)]
+		for minValue in [False, True]:
+			optimum = gs.solveGroupingExact(simValues, 3, minValue)
+			report = gs.optimalityGap(simValues, optimum, 3, minValue)
+			self.assertEqual(report['gap'], 0.0)
+			grouping = gs.solveGroupingGreedy(simValues, 3, minValue)
+			report = gs.optimalityGap(simValues, grouping, 3, minValue)
+			self.assertTrue(report['gap'] >= 0.0)
+			self.assertTrue(report['score'] <= report['optimum'])
+		self.assertTrue(gs.optimalityGap(simValues, optimum, 3, False, 6) is None)
+
+	def test_subset_dp_unequal_sizes(self):
+		rand = Random(4)
+		for groupSizes in [[1, 2, 3], [2, 2, 3], [3, 1, 3], [2, 1, 2, 2]]:
+			exampleNum = sum(groupSizes)
+			simValues = [[rand.randint(0, 5) for j in range(exampleNum)] 
+				for i in range(exampleNum)]
+			# Every grouping with these sizes from every ordering of examples
+			groupings = []
+			for order in permutations(range(exampleNum)):
+				groups = []
+				start = 0
+				for size in groupSizes:
+					groups.append(list(order[start:start + size]))
+					start += size
+				groupings.append(groups)
+			scores = [gs.groupingScore(simValues, groups) for groups in groupings]
+			for minValue in [False, True]:
+				grouping = gs.solveGroupingSubsetDP(simValues, groupSizes, minValue)
+				self.assertEqual(sorted(len(group) for group in grouping), 
+					sorted(groupSizes))
+				self.assertEqual(sorted(sum(grouping, [])), list(range(exampleNum)))
+				best = min(scores) if minValue else max(scores)
+				self.assertAlmostEqual(gs.groupingScore(simValues, grouping), best)
+
+	def test_matching_matches_subset_dp(self):
+		rand = Random(6)
+		for exampleNum in [2, 4, 6, 8, 10, 12]:
+			for trial in range(5):
+				simValues = [[rand.randint(-3, 4) for j in range(exampleNum)] 
+					for i in range(exampleNum)]
+				for minValue in [False, True]:
+					grouping = gs.solveGroupingMatching(simValues, minValue)
+					self.assertEqual(sorted(sum(grouping, [])), list(range(exampleNum)))
+					best = gs.solveGroupingSubsetDP(simValues, 
+						[2] * (exampleNum // 2), minValue)
+					self.assertAlmostEqual(gs.groupingScore(simValues, grouping), 
+						gs.groupingScore(simValues, best))
+
+	def test_matching_many_senses(self):
+		rand = Random(8)
+		senses = [i // 2 for i in range(60)]
+		rand.shuffle(senses)
+		simValues = [[(1 if senses[i] == senses[j] else 0) + rand.random() * 0.4
+			for j in range(60)] for i in range(60)]
+		for group in gs.solveGroupingMatching(simValues, False):
+			self.assertEqual(senses[group[0]], senses[group[1]])
+		self.assertRaises(ValueError, gs.solveGroupingMatching, simValues[:5], 
+			False)
+
+	def test_subset_dp_invalid_sizes(self):
+		simValues = [[0] * 6 for i in range(6)]
+		self.assertRaises(ValueError, gs.solveGroupingSubsetDP, simValues, 
+			[2, 3], False)
+		self.assertRaises(ValueError, gs.solveGroupingSubsetDP, simValues, 
+			[6, 0], False)
+
+if __name__ == '__main__':
+	unittest.main()
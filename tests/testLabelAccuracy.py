@@ -0,0 +1,75 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from itertools import combinations
+from math import log
+import labelAccuracy as la
+
+class TestLabelAccuracy(unittest.TestCase):
+
+	def getMutualInformation(self, actual, predicted):
+		# The normalised mutual information summed over every pair of labels
+		n = float(len(actual))
+		def entropy(labels):
+			return -sum(labels.count(label) / n * log(labels.count(label) / n)
+				for label in set(labels))
+		information = 0.0
+		for i in set(actual):
+			for j in set(predicted):
+				both = sum(1 for a, p in zip(actual, predicted) if a == i and p == j)
+				if both:
+					information += both / n * log(both * n /
+						(actual.count(i) * predicted.count(j)))
+		return information / ((entropy(actual) + entropy(predicted)) / 2)
+
+	def test_measures(self):
+		actual = la.stackLabels([[0, 0, 0, 1, 1, 1], [0, 0, 1, 1]])
+		predicted = la.stackLabels([[0, 0, 1, 1, 2, 2], [1, 1, 0, 0]])
+		accuracies = la.calculateGroupedAccuracies(actual, predicted)
+		self.assertEqual(accuracies['total'].tolist(), [0, 1])
+		self.assertEqual(accuracies['pairs'].tolist(), [2 / 6.0, 1])
+		# 2 pairs in both, 6 actual and 3 predicted pairs of the 15
+		self.assertAlmostEqual(accuracies['ari'][0], (2 - 1.2) / (4.5 - 1.2))
+		self.assertAlmostEqual(accuracies['nmi'][0], self.getMutualInformation(
+			[0, 0, 0, 1, 1, 1], [0, 0, 1, 1, 2, 2]))
+		self.assertAlmostEqual(accuracies['ari'][1], 1)
+		self.assertAlmostEqual(accuracies['nmi'][1], 1)
+
+	def test_matches_pair_sets(self):
+		randomLabels = random.Random(6)
+		for trial in range(50):
+			actual = [randomLabels.randint(0, 3) for i in range(9)]
+			predicted = [randomLabels.randint(0, 3) for i in range(9)]
+			actualPairs = set(pair for pair in combinations(range(9), 2)
+				if actual[pair[0]] == actual[pair[1]])
+			predictedPairs = set(pair for pair in combinations(range(9), 2)
+				if predicted[pair[0]] == predicted[pair[1]])
+			accuracies = la.calculateGroupedAccuracies(la.stackLabels([actual]),
+				la.stackLabels([predicted]))
+			if actualPairs:
+				self.assertAlmostEqual(accuracies['pairs'][0],
+					len(actualPairs & predictedPairs) / float(len(actualPairs)))
+			self.assertEqual(accuracies['total'][0],
+				float(actualPairs == predictedPairs))
+			if len(set(actual)) > 1 or len(set(predicted)) > 1:
+				self.assertAlmostEqual(accuracies['nmi'][0],
+					self.getMutualInformation(actual, predicted))
+
+	def test_predicted_labels(self):
+		examples = [{'sent':sent} for sent in ['a', 'b', 'a', 'c', 'd']]
+		self.assertEqual(la.getPredictedLabels(examples, [['a', 'b'],
+			['c', 'a']]), [0, 0, 1, 1, 2])
+		self.assertEqual(la.getActualLabels(examples, [['a', 'b'], ['c', 'a']]),
+			[0, 0, 1, 1, 2])
+		self.assertEqual(la.getActualLabels(examples, [], [1, 0, 1, 0, 0]),
+			[1, 0, 1, 0, 0])
+
+	def test_ofm_accuracy(self):
+		self.assertEqual(la.calculateOFMAccuracy(['a', 'b', 'c', 'd'],
+			['a', 'c', 'c', 'b']), 0.5)
+
+if __name__ == '__main__':
+	unittest.main()
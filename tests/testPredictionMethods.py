@@ -0,0 +1,76 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from copy import deepcopy
+from numpy import allclose
+import dataSelection as ds
+import predictionMethods as pm
+from baseLinePredictions import GroupedPredictions
+from baseLinePredictions import OFMPredictions
+from syntheticData import createSyntheticDataset
+from syntheticData import createSyntheticModel
+
+class TestPredictionMethods(unittest.TestCase):
+
+	def setUp(self):
+		self.model = createSyntheticModel()
+		self.dataset = createSyntheticDataset(['word1', 'word2', 'word3'],
+			2, 3, 4, 6)
+
+	def test_method_names(self):
+		self.assertEqual(pm.getMethodNames(True), ['random', 'word2vec',
+			'wordCrossover'])
+		self.assertEqual(pm.getMethodNames(False), ['random', 'word2vecCosine',
+			'word2vecWordSim', 'wordCrossover'])
+		self.assertRaises(ValueError, pm.getPredictionMethod, 'unknown')
+
+	def test_batch_scores_match_matrices(self):
+		examples = [example for sense in self.dataset['word1']
+			for example in sense['examples']]
+		for name in ['wordCrossover', 'word2vecWordSim', 'word2vecCosine']:
+			method = pm.getPredictionMethod(name)
+			matrix = method.scoreMatrices({'word1':examples}, self.model)['word1']
+			scores = method.scoreBatch([examples[0]] * len(examples), examples,
+				self.model)
+			self.assertTrue(allclose(scores, matrix[0], atol=1e-6))
+
+	def test_predict_matches_selections(self):
+		for name, selection in [('random', 'randomSelection'),
+			('wordCrossover', 'wordCrossoverSelection'),
+			('word2vecWordSim', 'word2VecSimilaritySelectionWordSim'),
+			('word2vecCosine', 'word2VecSimilaritySelectionCosine')]:
+			dataset = deepcopy(self.dataset)
+			random.seed(3)
+			ofmData = ds.createOFMData(ds.selectExamplesAndSenses(dataset, 3, 2))
+			predictor = OFMPredictions()
+			random.seed(5)
+			if name in ['random', 'wordCrossover']:
+				expected = getattr(predictor, selection)(deepcopy(ofmData))
+			else:
+				expected = getattr(predictor, selection)(deepcopy(ofmData),
+					self.model)
+			random.seed(5)
+			self.assertEqual(predictor.predict(ofmData, name, self.model),
+				expected)
+		for name in ['wordCrossover', 'word2vec']:
+			dataset = deepcopy(self.dataset)
+			random.seed(3)
+			groupData = ds.createGroupedTestData(ds.selectExamplesAndSenses(
+				dataset, 3, 3))
+			predictor = GroupedPredictions()
+			random.seed(5)
+			if name == 'wordCrossover':
+				expected = predictor.wordCrossoverSelection(deepcopy(groupData),
+					3, solver='exact')
+			else:
+				expected = predictor.word2VecSimilaritySelection(
+					deepcopy(groupData), 3, self.model, 'exact')
+			random.seed(5)
+			self.assertEqual(predictor.predict(groupData, 3, name, self.model,
+				'exact'), expected)
+
+if __name__ == '__main__':
+	unittest.main()
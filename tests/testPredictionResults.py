@@ -0,0 +1,80 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from copy import deepcopy
+import dataSelection as ds
+import predictionResults as pr
+from baseLinePredictions import GroupedPredictions
+from baseLinePredictions import OFMPredictions
+from syntheticData import createSyntheticDataset
+from syntheticData import createSyntheticModel
+
+class TestPredictionResults(unittest.TestCase):
+
+	def setUp(self):
+		self.model = createSyntheticModel()
+		self.dataset = createSyntheticDataset(['word1', 'word2', 'word3', 'word4'],
+			2, 3, 4, 6)
+
+	def test_label_dtype(self):
+		results = pr.getGroupedIndexResults(['a', 'b'], [[[2, 0], [1]],
+			[[0], [1, 2, 3]]], [3, 4])
+		self.assertEqual(results.labels.tolist(), [[0, 1, 0, -1], [0, 1, 1, 1]])
+		self.assertEqual(results.labels.itemsize, 1)
+		self.assertEqual(results.getGroups(0), [[0, 2], [1]])
+		self.assertEqual(pr.getLabelDtype(200)().itemsize, 2)
+
+	def test_ofm_results_match_sentences(self):
+		for method in ['random', 'wordCrossover', 'word2vecCosine']:
+			ofmData = ds.createOFMData(ds.selectExamplesAndSenses(
+				deepcopy(self.dataset), 3, 2))
+			random.seed(4)
+			expected = OFMPredictions().predict(ofmData, method, self.model)
+			random.seed(4)
+			predictor = OFMPredictions(indexResults=True)
+			results = predictor.predict(ofmData, method, self.model)
+			self.assertEqual(results.toSentences(ofmData), expected)
+			self.assertEqual(predictor.calculateAccuracy(results, ofmData),
+				predictor.calculateAccuracy(expected, ofmData))
+
+	def test_grouped_results_match_sentences(self):
+		for method, solver in [('random', 'bruteForce'),
+			('wordCrossover', 'bruteForce'), ('word2vec', 'subsetDP'),
+			('wordCrossover', 'batch')]:
+			groupData = ds.createGroupedTestData(ds.selectExamplesAndSenses(
+				deepcopy(self.dataset), 3, 3))
+			random.seed(4)
+			expected = GroupedPredictions().predict(groupData, 3, method,
+				self.model, solver)
+			random.seed(4)
+			predictor = GroupedPredictions(indexResults=True)
+			results = predictor.predict(groupData, 3, method, self.model, solver)
+			converted = results.toSentences(groupData)
+			for key in expected:
+				self.assertEqual(sorted(sorted(group) for group in converted[key]),
+					sorted(sorted(group) for group in expected[key]))
+			for measure in ['total', 'pairs', 'ari']:
+				self.assertAlmostEqual(predictor.calculateAccuracyMeasure(results,
+					groupData, measure), predictor.calculateAccuracyMeasure(expected,
+					groupData, measure))
+
+	def test_repeated_sentences(self):
+		# The correct option has the same sentence as another option
+		ofmData = {'word1':{'example':{'sent':'a', 'tokens':['a']},
+			'options':[{'sent':'b', 'tokens':['b']},
+			{'sent':'b', 'tokens':['c']}]}}
+		results = pr.OFMIndexResults(['word1'], [1])
+		self.assertEqual(results.calculateAccuracy(), 0)
+		self.assertEqual(results.toSentences(ofmData)['word1']['solution'], 'b')
+
+		groupData = {'word1':[{'sent':sent} for sent in ['a', 'a', 'b', 'b']]}
+		results = pr.getGroupedIndexResults(['word1'], [[[0, 2], [1, 3]]], [4])
+		self.assertEqual(results.calculateAccuracies(groupData)['total'][0], 0)
+		self.assertEqual(results.toSentences(groupData),
+			{'word1':[['a', 'b'], ['a', 'b']]})
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from itertools import combinations
+from itertools import permutations
+from numpy import array
+from numpy import mean
+import dataSelection as ds
+import randomBaseline as rb
+from evaluateDatasets import runGroupedTest
+from evaluateDatasets import runOFMTest
+
+class TestRandomBaseline(unittest.TestCase):
+
+	def setUp(self):
+		randomSizes = random.Random(3)
+		self.dataset = {}
+		for key in range(40):
+			self.dataset['word{}'.format(key)] = [{'examples':[{'sent':
+				'{} {} {}'.format(key, sense, example), 'tokens':[]}
+				for example in range(randomSizes.randint(2, 4))]}
+				for sense in range(randomSizes.randint(3, 5))]
+
+	def getEnumeratedMoments(self, groupSizes):
+		# Every order of the examples split into blocks of the group sizes
+		labels = [sense for sense, size in enumerate(groupSizes)
+			for example in range(size)]
+		actualPairs = set(pair for pair in combinations(range(len(labels)), 2)
+			if labels[pair[0]] == labels[pair[1]])
+		totals = []
+		pairs = []
+		for order in permutations(range(len(labels))):
+			blocks = []
+			start = 0
+			for size in groupSizes:
+				blocks.append(sorted(order[start:start + size]))
+				start += size
+			totals.append(float(all(len(set(labels[i] for i in block)) == 1
+				for block in blocks)))
+			predictedPairs = set(pair for block in blocks
+				for pair in combinations(block, 2))
+			pairs.append(len(predictedPairs & actualPairs) /
+				float(len(actualPairs)))
+		return (mean(totals), mean(totals)), \
+			(mean(pairs), mean([pair ** 2 for pair in pairs]))
+
+	def test_moments_match_enumeration(self):
+		for groupSizes in [[2, 2, 2], [3, 3], [3, 2, 2], [4, 2, 1], [2, 2, 2, 2]]:
+			total, pairs = self.getEnumeratedMoments(groupSizes)
+			for expected, actual in zip(total + pairs,
+				rb.getGroupedTotalMoments(groupSizes) +
+				rb.getGroupedPairsMoments(groupSizes)):
+				self.assertAlmostEqual(expected, actual)
+		self.assertEqual(rb.getGroupedTotalMoments([3, 3, 3])[0], 1 / 280.0)
+		self.assertEqual(rb.getOFMMoments(4), (0.25, 0.25))
+
+	def test_selected_senses(self):
+		# Choosing 2 of senses of sizes 2, 2 and 3
+		mean, meanSquare = rb.getSelectedWordMoments([2, 2, 3], 2, True, 'total')
+		expected = (rb.getGroupedTotalMoments([2, 2])[0] +
+			2 * rb.getGroupedTotalMoments([2, 3])[0]) / 3
+		self.assertAlmostEqual(mean, expected)
+		self.assertEqual(rb.getSelectedWordMoments([2, 2, 3], 2, False, 'total'),
+			(0.5, 0.5))
+
+	def assertAgreesWithSampling(self, expected, variance, accuracies):
+		# The sampled mean and variance are each within 4 standard errors, the
+		# error of the variance growing with the kurtosis of the accuracies
+		accuracies = array(accuracies)
+		self.assertTrue(abs(accuracies.mean() - expected) <
+			4 * (variance / len(accuracies)) ** 0.5)
+		sampledVariance = accuracies.var()
+		kurtosis = ((accuracies - accuracies.mean()) ** 4).mean() / \
+			sampledVariance ** 2
+		self.assertTrue(abs(sampledVariance / variance - 1) <
+			4 * ((kurtosis - 1) / len(accuracies)) ** 0.5)
+
+	def test_analytic_agrees_with_sampled(self):
+		random.seed(1)
+		iterations = 1000
+		for numSenses, numExamp, measure, unequal in [(3, 2, 'total', False),
+			(3, 2, 'pairs', False), (3, 4, 'pairs', True), (3, 4, 'total', True)]:
+			expected, variance = rb.expectedRandomAccuracy(self.dataset, numSenses,
+				numExamp, True, measure)
+			accuracies = []
+			for i in range(iterations):
+				data = ds.selectExamplesAndSenses(self.dataset, numSenses, numExamp)
+				accuracies.append(runGroupedTest(data, 'random', None, measure,
+					None if unequal else numExamp))
+			self.assertAgreesWithSampling(expected, variance, accuracies)
+		expected, variance = rb.expectedRandomAccuracy(self.dataset, 3, 2, False)
+		self.assertAlmostEqual(expected, 1 / 3.0)
+		accuracies = [runOFMTest(ds.selectExamplesAndSenses(self.dataset, 3, 2),
+			'random', None) for i in range(iterations)]
+		self.assertAgreesWithSampling(expected, variance, accuracies)
+
+if __name__ == '__main__':
+	unittest.main()
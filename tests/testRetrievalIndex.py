@@ -0,0 +1,96 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from numpy import arange
+from numpy import argsort
+from numpy import asarray
+from numpy import float32
+from numpy import inf
+from numpy import nan
+from numpy.linalg import norm
+from numpy.random import RandomState
+import retrievalIndex as ri
+
+class TestRetrievalIndex(unittest.TestCase):
+
+	def setUp(self):
+		randomState = RandomState(0)
+		# 40 senses of 5 examples near their sense's direction
+		centres = randomState.standard_normal((40, 16))
+		vectors = centres.repeat(5, axis=0) + \
+			0.3 * randomState.standard_normal((200, 16))
+		self.vectors = (vectors / norm(vectors, axis=1).reshape(-1, 1))\
+			.astype(float32)
+		self.vectors[3] = nan
+		self.senses = arange(40).repeat(5)
+
+	def test_exact_top_k(self):
+		index = ri.RetrievalIndex(self.vectors, blockRows=7, queryBlockRows=3)
+		queryRows = arange(0, 200, 9)
+		rows, scores = index.topK(index.vectors[queryRows], 6, queryRows)
+		expected = index.vectors[queryRows].dot(index.vectors.T)
+		expected[:, 3] = -inf
+		expected[arange(len(queryRows)), queryRows] = -inf
+		expectedRows = argsort(-expected, axis=1)[:, :6]
+		self.assertEqual(rows.tolist(), expectedRows.tolist())
+		self.assertTrue(abs(scores - expected[arange(len(queryRows))
+			.reshape(-1, 1), expectedRows]).max() < 1e-6)
+		self.assertEqual(index.getIndexBytes(), 200 * 16 * 4 + 200)
+
+	def test_fewer_candidates_than_k(self):
+		index = ri.RetrievalIndex(self.vectors[:4])
+		rows, scores = index.topK(index.vectors[:1], 5, [0])
+		self.assertEqual(rows[0, 2:].tolist(), [-1, -1, -1])
+		self.assertEqual(sorted(rows[0, :2].tolist()), [1, 2])
+		self.assertEqual(scores[0, 4], -inf)
+
+	def test_lsh_index(self):
+		index = ri.RetrievalIndex(self.vectors)
+		queryRows = arange(0, 200, 5)
+		rows, scores = index.topK(index.vectors[queryRows], 4, queryRows)
+		exactRecall = ri.recallAtK(rows, queryRows, self.senses, index.valid,
+			[1, 4])
+		self.assertEqual(exactRecall[4], 1.0)
+		lshIndex = ri.LSHIndex(index, numBits=4, numTables=8, seed=1)
+		lshRows, lshScores = lshIndex.topK(index.vectors[queryRows], 4,
+			queryRows)
+		self.assertFalse(3 in lshRows)
+		self.assertFalse((lshRows == queryRows.reshape(-1, 1)).any())
+		self.assertTrue(lshIndex.lastCandidates < 200)
+		# Each row found is scored exactly and can be no better than exact
+		self.assertTrue((lshScores[:, 0] <= scores[:, 0] + 1e-6).all())
+		lshRecall = ri.recallAtK(lshRows, queryRows, self.senses, index.valid,
+			[1, 4])
+		self.assertTrue(0.5 < lshRecall[4] <= exactRecall[4])
+
+	def test_recall_at_k(self):
+		senses = arange(3).repeat(3)
+		valid = senses >= 0
+		valid[8] = False
+		rows = asarray([[1, 3, 2], [7, 4, -1]])
+		recall = ri.recallAtK(rows, asarray([0, 6]), senses, valid,
+			[1, 2, 3])
+		self.assertEqual(recall, {1:0.75, 2:0.75, 3:1.0})
+
+	def test_retrieval_data(self):
+		dataset = {'b':[{'examples':[{'sent':'b1'}, {'sent':'b2'}]},
+			{'examples':[{'sent':'b3'}]}], 'a':[{'examples':[{'sent':'a1'},
+			{'sent':'a2'}]}]}
+		data = ri.createRetrievalData(dataset)
+		self.assertEqual([example['sent'] for example in data['examples']],
+			['a1', 'a2', 'b1', 'b2', 'b3'])
+		self.assertEqual(data['senses'].tolist(), [0, 0, 1, 1, 2])
+		self.assertEqual(data['keys'], ['a', 'b', 'b'])
+		valid = data['senses'] >= 0
+		valid[0] = False
+		random.seed(2)
+		queryRows = ri.selectRetrievalQueries(data, valid)
+		# Word 'a' has no sense with two examples that can be retrieved
+		self.assertEqual(len(queryRows), 1)
+		self.assertTrue(queryRows[0] in [2, 3])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import random
+from copy import deepcopy
+from numpy import allclose
+import dataSelection as ds
+from baseLinePredictions import GroupedPredictions
+from baseLinePredictions import OFMPredictions
+from crossoverSimilarity import crossoverMatricesByKey
+from embeddingSimilarity import cosineDistanceMatricesByKey
+from similarityCache import buildSimilarityCache
+from similarityCache import getExamplesByKey
+from syntheticData import createSyntheticDataset
+from syntheticData import createSyntheticModel
+
+class TestSimilarityCache(unittest.TestCase):
+
+	def setUp(self):
+		self.model = createSyntheticModel()
+		self.dataset = createSyntheticDataset(['word1', 'word2', 'word3'],
+			4, 4, 5, 6)
+
+	def assertSamePredictions(self, predict):
+		# Selecting examples shuffles the senses and examples in place
+		dataset = deepcopy(self.dataset)
+		random.seed(7)
+		expected = predict(None)
+		self.dataset = dataset
+		random.seed(7)
+		self.assertEqual(predict(self.cache), expected)
+
+	def test_cached_scores_match(self):
+		examplesByKey = getExamplesByKey(self.dataset)
+		tokenListsByKey = dict((key, [example['tokens'] for example in
+			examplesByKey[key]]) for key in examplesByKey)
+		cache = buildSimilarityCache(self.dataset, 'word2vec', self.model)
+		expected = cosineDistanceMatricesByKey(tokenListsByKey, self.model)
+		for key in examplesByKey:
+			sents = [example['sent'] for example in examplesByKey[key]][::-1]
+			self.assertTrue(allclose(cache.getSimilarityMatrix(key, sents),
+				expected[key][::-1, ::-1], atol=1e-6))
+		cache = buildSimilarityCache(self.dataset, 'wordCrossover')
+		expected = crossoverMatricesByKey(tokenListsByKey)
+		for key in examplesByKey:
+			sents = [example['sent'] for example in examplesByKey[key]]
+			self.assertEqual(cache.getSimilarityMatrix(key, sents).tolist(),
+				expected[key].tolist())
+			self.assertEqual(cache.getOptionScores([key], [sents[3]],
+				[sents[:2]]).tolist(), expected[key][3, :2].tolist())
+
+	def test_cached_ofm_predictions(self):
+		for method, selection in [('wordCrossover', 'wordCrossoverSelection'),
+			('word2vecWordSim', 'word2VecSimilaritySelectionWordSim'),
+			('word2vecCosine', 'word2VecSimilaritySelectionCosine')]:
+			self.cache = buildSimilarityCache(self.dataset, method, self.model)
+			def predict(cache):
+				predictor = OFMPredictions(similarityCache=cache)
+				results = []
+				for i in range(5):
+					ofmData = ds.createOFMData(ds.selectExamplesAndSenses(
+						self.dataset, 3, 2))
+					if method == 'wordCrossover':
+						results.append(predictor.wordCrossoverSelection(ofmData))
+					else:
+						results.append(getattr(predictor, selection)(ofmData,
+							self.model))
+				return results
+			self.assertSamePredictions(predict)
+
+	def test_cached_grouped_predictions(self):
+		for method in ['wordCrossover', 'word2vec']:
+			self.cache = buildSimilarityCache(self.dataset, method, self.model)
+			def predict(cache):
+				predictor = GroupedPredictions(similarityCache=cache)
+				results = []
+				for i in range(5):
+					groupData = ds.createGroupedTestData(
+						ds.selectExamplesAndSenses(self.dataset, 3, 3))
+					if method == 'wordCrossover':
+						results.append(predictor.wordCrossoverSelection(groupData,
+							3, solver='exact'))
+					else:
+						results.append(predictor.word2VecSimilaritySelection(
+							groupData, 3, self.model, 'exact'))
+				return results
+			self.assertSamePredictions(predict)
+
+	def test_crossover_without_tokens(self):
+		self.dataset['word1'][0]['examples'][0]['tokens'] = []
+		self.dataset['word1'][0]['examples'][1]['tokens'] = []
+		cache = buildSimilarityCache(self.dataset, 'wordCrossover')
+		self.assertEqual(cache.getOptionScores(['word1'], ['word1 0 0'],
+			[['word1 1 0']]).tolist(), [0])
+		self.assertRaises(ZeroDivisionError, cache.getOptionScores, ['word1'],
+			['word1 0 0'], [['word1 0 1']])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+from ConfigParser import SafeConfigParser
+from configValidation import optionalDefaults
+import evaluateDatasets as ed
+import wordSharding as ws
+from syntheticData import createSyntheticDataset
+from syntheticData import createSyntheticModel
+
+class TestTestIterations(unittest.TestCase):
+
+	def setUp(self):
+		self.model = createSyntheticModel()
+		keys = ['word{}'.format(key) for key in range(10)]
+		self.dataset = createSyntheticDataset(keys, 2, 4, 4, 5)
+
+	def getContext(self, grouped, method, compareToExact=False):
+		parser = SafeConfigParser(optionalDefaults)
+		parser.add_section('evaluation_params')
+		for key, value in [('grouped', grouped), ('baseLineMethod', method),
+			('groupedAccuracyMeasure', 'pairs'), ('numOfSenses', 3)]:
+			parser.set('evaluation_params', key, str(value))
+		return {'parser':parser, 'data':self.dataset, 'model':self.model,
+			'fullModel':None, 'vocabulary':None, 'embeddingStore':None,
+			'similarityCache':None, 'selectedExamp':3, 'groupSize':3,
+			'solver':'greedy' if compareToExact else 'bruteForce',
+			'timeLimit':None, 'maxIterations':5, 'compareToExact':compareToExact}
+
+	def test_iteration_seeds(self):
+		self.assertEqual(ed.getIterationSeeds(100, 5), ed.getIterationSeeds(100, 5))
+		self.assertEqual(ed.getIterationSeeds(100, 5)[:3],
+			ed.getIterationSeeds(100, 3))
+		self.assertNotEqual(ed.getIterationSeeds(100, 3),
+			ed.getIterationSeeds(101, 3))
+
+	def test_workers_match_serial(self):
+		seeds = ed.getIterationSeeds(7, 6)
+		sentences = [example['sent'] for key in sorted(self.dataset)
+			for sense in self.dataset[key] for example in sense['examples']]
+		for grouped, method, compareToExact in [(False, 'word2vecCosine', False),
+			(False, 'random', False), (True, 'wordCrossover', False),
+			(True, 'word2vec', True)]:
+			context = self.getContext(grouped, method, compareToExact)
+			serial = ed.runTestIterations(context, seeds)
+			parallel = ed.runTestIterations(context, seeds, 3)
+			self.assertEqual([result['accuracy'] for result in serial],
+				[result['accuracy'] for result in parallel])
+			if compareToExact:
+				self.assertEqual([result['comparison']['exactAccuracy']
+					for result in serial], [result['comparison']['exactAccuracy']
+					for result in parallel])
+			# Each iteration selects from the dataset as it was given
+			self.assertEqual([result['accuracy'] for result in serial[2:4]],
+				[result['accuracy'] for result in
+				ed.runTestIterations(context, seeds[2:4])])
+		self.assertEqual([example['sent'] for key in sorted(self.dataset)
+			for sense in self.dataset[key] for example in sense['examples']],
+			sentences)
+
+	def test_sharded_workers_match_serial(self):
+		seeds = ed.getIterationSeeds(7, 3)
+		for grouped, method, compareToExact in [(False, 'word2vecWordSim', False),
+			(True, 'wordCrossover', False), (True, 'word2vec', True)]:
+			context = self.getContext(grouped, method, compareToExact)
+			context['shardWords'] = True
+			serial = ed.runTestIterations(context, seeds)
+			parallel = ed.runTestIterations(context, seeds, 3)
+			self.assertEqual(serial, [dict(result, comparison=dict(
+				result['comparison'], seconds=serial[i]['comparison']['seconds'],
+				exactSeconds=serial[i]['comparison']['exactSeconds']))
+				if compareToExact else result for i, result in enumerate(parallel)])
+			if compareToExact:
+				self.assertEqual(serial[0]['comparison']['words'], len(self.dataset))
+
+	def test_word_costs(self):
+		self.assertEqual(ws.getPartitionNum([3, 3, 3]), 280)
+		self.assertEqual(ws.getPartitionNum([4, 4, 4, 4]), 2627625)
+		self.assertEqual(ws.getPartitionNum([2, 3]), 10)
+		examples = [{'tokens':['a', 'b']}] * 16
+		self.assertTrue(ws.estimateWordCost(examples, True, [4] * 4) >
+			ws.estimateWordCost(examples[:9], True, [3] * 3) >
+			ws.estimateWordCost(examples[:9], False))
+		# Pairs are matched rather than grouped over subsets
+		self.assertEqual(ws.estimateWordCost(examples, True, [2] * 8, 'exact'),
+			ws.estimateWordCost(examples, True, [2] * 8, 'matching'))
+		self.assertTrue(ws.estimateWordCost(examples, True, [4] * 4, 'exact') >
+			ws.estimateWordCost(examples, True, [4] * 4, 'matching'))
+		self.assertEqual(ws.orderByCost({'a':1, 'b':5, 'c':1}), ['b', 'a', 'c'])
+
+	def test_merge_word_results(self):
+		merged = ws.mergeWordResults({'a':{'accuracy':1.0, 'fullAccuracy':0.5},
+			'b':{'accuracy':0.0, 'fullAccuracy':0.5}})
+		self.assertEqual(merged, {'accuracy':0.5, 'fullAccuracy':0.5})
+
+if __name__ == '__main__':
+	unittest.main()
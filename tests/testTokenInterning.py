@@ -0,0 +1,42 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import tokenInterning as ti
+from gensim.models import Word2Vec
+
+class TestTokenInterning(unittest.TestCase):
+
+	def test_intern(self):
+		vocabulary = ti.TokenVocabulary()
+		tokenIDs = vocabulary.intern(['the', 'cat', 'the'])
+		self.assertEqual(tokenIDs.dtype.name, 'int32')
+		self.assertEqual(tokenIDs.tolist(), [0, 1, 0])
+		self.assertEqual(vocabulary.intern(['dog', 'cat']).tolist(), [2, 1])
+		self.assertEqual(len(vocabulary), 3)
+		self.assertEqual(vocabulary.getTokens(tokenIDs), ['the', 'cat', 'the'])
+		self.assertEqual(vocabulary.intern([]).tolist(), [])
+
+	def test_embedding_rows(self):
+		model = Word2Vec([['the', 'cat', 'ran']] * 20, size=4, min_count=1, 
+			seed=1, workers=1)
+		vocabulary = ti.TokenVocabulary()
+		vocabulary.intern(['cat', 'unseen'])
+		rows = vocabulary.getEmbeddingRows(model)
+		self.assertEqual(rows.tolist(), [model.vocab['cat'].index, ti.oovRow])
+		self.assertTrue(vocabulary.getEmbeddingRows(model) is rows)
+		# Tokens interned later are added to the map
+		vocabulary.intern(['ran'])
+		self.assertEqual(vocabulary.getEmbeddingRows(model).tolist(), 
+			[model.vocab['cat'].index, ti.oovRow, model.vocab['ran'].index])
+
+	def test_is_interned(self):
+		vocabulary = ti.TokenVocabulary()
+		self.assertTrue(ti.isInterned([vocabulary.intern(['a']), 
+			vocabulary.intern([])]))
+		self.assertFalse(ti.isInterned([['a'], []]))
+		self.assertFalse(ti.isInterned([]))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,41 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+from weightedMatching import maxWeightMatching
+
+class TestWeightedMatching(unittest.TestCase):
+
+	def test_empty_graph(self):
+		self.assertEqual(maxWeightMatching([]), [])
+
+	def test_single_edge(self):
+		self.assertEqual(maxWeightMatching([(0, 1, 1)]), [1, 0])
+
+	def test_heaviest_edge_chosen(self):
+		self.assertEqual(maxWeightMatching([(1, 2, 10), (2, 3, 11)]), 
+			[-1, -1, 3, 2])
+		self.assertEqual(maxWeightMatching([(1, 2, 5), (2, 3, 11), (3, 4, 5)]), 
+			[-1, -1, 3, 2, -1])
+
+	def test_max_cardinality(self):
+		self.assertEqual(maxWeightMatching([(1, 2, 5), (2, 3, 11), (3, 4, 5)], 
+			True), [-1, 2, 1, 4, 3])
+
+	def test_negative_weights(self):
+		edges = [(1, 2, 2), (1, 3, -2), (2, 3, 1), (2, 4, -1), (3, 4, -6)]
+		self.assertEqual(maxWeightMatching(edges), [-1, 2, 1, -1, -1])
+		self.assertEqual(maxWeightMatching(edges, True), [-1, 3, 4, 1, 2])
+
+	def test_blossoms(self):
+		edges = [(1, 2, 8), (1, 3, 9), (2, 3, 10), (3, 4, 7)]
+		self.assertEqual(maxWeightMatching(edges), [-1, 2, 1, 4, 3])
+		edges += [(1, 6, 5), (4, 5, 6)]
+		self.assertEqual(maxWeightMatching(edges), [-1, 6, 3, 2, 5, 4, 1])
+		edges = [(1, 2, 9), (1, 3, 8), (2, 3, 10), (1, 4, 5), (4, 5, 4), 
+			(1, 6, 3)]
+		self.assertEqual(maxWeightMatching(edges), [-1, 6, 3, 2, 5, 4, 1])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath('..'))
+
+import unittest
+import shutil
+import tempfile
+import word2vecSidecar as ws
+from gensim.models import Word2Vec
+from tokenInterning import TokenVocabulary
+
+class TestWord2vecSidecar(unittest.TestCase):
+
+	def setUp(self):
+		corpus = [[u'the', u'big', u'cat'], [u'a', u'red', u'dog', u'ran'], 
+			[u'caf\xe9']] * 50
+		self.tempDir = tempfile.mkdtemp()
+		self.word2vecBin = os.path.join(self.tempDir, 'model.bin')
+		Word2Vec(corpus, size=8, min_count=1, seed=1, workers=1)\
+			.save_word2vec_format(self.word2vecBin, binary=True)
+		self.model = Word2Vec.load_word2vec_format(self.word2vecBin, binary=True)
+		self.sidecarPath = os.path.join(self.tempDir, 'sidecar', 'model')
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def assertSameVectors(self, model, tokens):
+		for token in tokens:
+			self.assertEqual(model[token].tolist(), self.model[token].tolist())
+
+	def test_dataset_tokens(self):
+		dataset = {'cat':[{'examples':[{'sent':'the cat', 
+			'tokens':[u'the', u'cat']}, {'sent':'', 'tokens':[]}]}], 
+			'dog':[{'examples':[{'sent':'a dog', 'tokens':[u'a', u'dog']}]}]}
+		self.assertEqual(ws.getDatasetTokens(dataset), 
+			set([u'the', u'cat', u'a', u'dog']))
+		vocabulary = TokenVocabulary()
+		vocabulary.intern([u'red', u'dog'])
+		self.assertEqual(ws.getDatasetTokens(dataset, vocabulary), 
+			set([u'red', u'dog']))
+
+	def test_scan_binary(self):
+		words, vectors = ws.scanWord2VecBinary(self.word2vecBin, 
+			set([u'cat', u'caf\xe9', u'unseen']))
+		self.assertEqual(sorted(words), sorted([u'cat', u'caf\xe9']))
+		self.assertEqual(vectors.shape, (2, 8))
+		for word, vector in zip(words, vectors):
+			self.assertEqual(vector.tolist(), self.model[word].tolist())
+		words, vectors = ws.scanWord2VecBinary(self.word2vecBin, set([u'unseen']))
+		self.assertEqual((words, vectors.shape), ([], (0, 8)))
+
+	def test_restricted_model(self):
+		model = ws.loadRestrictedModel(self.word2vecBin, self.sidecarPath, 
+			set([u'cat', u'dog', u'unseen']))
+		self.assertEqual(sorted(model.vocab), [u'cat', u'dog'])
+		self.assertEqual(model.vector_size, 8)
+		self.assertSameVectors(model, [u'cat', u'dog'])
+		self.assertAlmostEqual(model.similarity(u'cat', u'dog'), 
+			self.model.similarity(u'cat', u'dog'))
+
+	def test_sidecar_rebuilt_when_tokens_grow(self):
+		vectorsPath, indexPath = ws.getSidecarPaths(self.sidecarPath)
+		ws.loadRestrictedModel(self.word2vecBin, self.sidecarPath, 
+			set([u'cat', u'unseen']))
+		modifiedTime = os.path.getmtime(indexPath)
+		os.utime(indexPath, (modifiedTime - 10, modifiedTime - 10))
+		modifiedTime = os.path.getmtime(indexPath)
+		# Tokens it was built for, even those not in the binary, are not missing
+		model = ws.loadRestrictedModel(self.word2vecBin, self.sidecarPath, 
+			set([u'unseen']))
+		self.assertEqual(os.path.getmtime(indexPath), modifiedTime)
+		self.assertEqual(sorted(model.vocab), [u'cat'])
+		model = ws.loadRestrictedModel(self.word2vecBin, self.sidecarPath, 
+			set([u'red']))
+		self.assertEqual(sorted(model.vocab), [u'cat', u'red'])
+		self.assertSameVectors(model, [u'cat', u'red'])
+
+if __name__ == '__main__':
+	unittest.main()
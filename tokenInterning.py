@@ -0,0 +1,83 @@
+from numpy import asarray
+from numpy import concatenate
+from numpy import full
+from numpy import int32
+from numpy import ndarray
+from embeddingBackends import getEmbeddingBackend
+
+# The embedding row of a token that is not in the model
+oovRow = -1
+
+class TokenVocabulary:
+	"""
+	Gives every distinct token of a dataset an integer ID so examples can hold
+	their tokens as compact int32 arrays and be compared without hashing
+	strings.
+	"""
+
+	def __init__(self):
+		self.tokenIDs = {}
+		self.tokens = []
+		self.embeddingModel = None
+		self.embeddingRows = None
+
+	def __len__(self):
+		return len(self.tokens)
+
+	def intern(self, tokens):
+		"""
+		Converts a list of tokens to their IDs, giving tokens not seen before
+		the next free ID.
+
+		Args:
+		tokens: A list of tokens.
+
+		Returns:
+		An int32 array holding the ID of each token.
+		"""
+		for token in tokens:
+			if token not in self.tokenIDs:
+				self.tokenIDs[token] = len(self.tokens)
+				self.tokens.append(token)
+		return asarray([self.tokenIDs[token] for token in tokens], dtype=int32)
+
+	def getTokens(self, tokenIDs):
+		"""
+		Converts an array of token IDs back to the list of tokens.
+		"""
+		return [self.tokens[tokenID] for tokenID in tokenIDs]
+
+	def getEmbeddingRows(self, model):
+		"""
+		Maps every token ID to the row of the token's vector in the model's
+		embedding matrix. The map is built once for each model and grown if
+		tokens have been interned since.
+
+		Args:
+		model: A trained word2vec model or EmbeddingBackend.
+
+		Returns:
+		An int32 array with the embedding row of each token ID, or oovRow for
+		tokens that are not in the model.
+		"""
+		if self.embeddingModel is not model:
+			self.embeddingModel = model
+			self.embeddingRows = full(0, oovRow, dtype=int32)
+		known = len(self.embeddingRows)
+		if known < len(self.tokens):
+			backend = getEmbeddingBackend(model)
+			newRows = full(len(self.tokens) - known, oovRow, dtype=int32)
+			for i, token in enumerate(self.tokens[known:]):
+				embeddingRow = backend.getRow(token)
+				if embeddingRow is not None:
+					newRows[i] = embeddingRow
+			self.embeddingRows = concatenate([self.embeddingRows, newRows])
+		return self.embeddingRows
+
+def isInterned(tokenLists):
+	"""
+	Checks if lists of tokens hold token IDs from a TokenVocabulary rather than
+	the tokens themselves.
+	"""
+	return len(tokenLists) > 0 and all(isinstance(tokens, ndarray)
+		for tokens in tokenLists)
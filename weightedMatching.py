@@ -0,0 +1,392 @@
+# Maximum weight matching in general graphs, ported from mwmatching.py by
+# Joris van Rantwijk (http://jorisvr.nl/article/maximum-matching), with the
+# names and structure changed to match this project. mwmatching.py follows
+# Z. Galil, "Efficient algorithms for finding maximum matching in graphs",
+# ACM Computing Surveys, 1986, and was released by its author into the
+# public domain, which this port keeps.
+
+def maxWeightMatching(edges, maxCardinality=False):
+	"""
+	Finds a maximum weight matching of a general graph with Edmonds' blossom
+	algorithm using the primal-dual method, taking O(n^3) time for n vertices.
+
+	Args:
+	edges: A list of (i, j, weight) tuples, one for each edge between vertex
+	i and vertex j. Vertices are numbered from 0.
+	maxCardinality: Boolean to indicate if only matchings with the largest
+	possible number of edges should be considered, in which case the heaviest
+	of those is found. On a complete graph with an even number of vertices
+	this gives a maximum weight perfect matching.
+
+	Returns:
+	A list with the vertex each vertex is matched to, or -1 if it is not
+	matched.
+	"""
+	if not edges:
+		return []
+	edgeNum = len(edges)
+	vertexNum = 1 + max(max(i, j) for i, j, weight in edges)
+	maxWeight = max(0, max(weight for i, j, weight in edges))
+
+	# Each edge k has two endpoints, 2k is vertex i and 2k + 1 is vertex j.
+	# Endpoint p is the end of the edge at vertex endpoint[p], endpoint p ^ 1
+	# is the other end.
+	endpoint = [edges[p // 2][p % 2] for p in range(2 * edgeNum)]
+	neighbourEnds = [[] for i in range(vertexNum)]
+	for k, (i, j, weight) in enumerate(edges):
+		neighbourEnds[i].append(2 * k + 1)
+		neighbourEnds[j].append(2 * k)
+
+	# The remote endpoint of each vertex's matched edge or -1
+	mate = [-1] * vertexNum
+	# Blossoms 0 to vertexNum - 1 are single vertices, the rest are non-trivial.
+	# Labels are 0 for free, 1 for S and 2 for T. labelEnd is the endpoint
+	# through which a blossom got its label.
+	label = [0] * (2 * vertexNum)
+	labelEnd = [-1] * (2 * vertexNum)
+	inBlossom = list(range(vertexNum))
+	blossomParent = [-1] * (2 * vertexNum)
+	blossomChildren = [None] * (2 * vertexNum)
+	blossomBase = list(range(vertexNum)) + [-1] * vertexNum
+	blossomEnds = [None] * (2 * vertexNum)
+	bestEdge = [-1] * (2 * vertexNum)
+	blossomBestEdges = [None] * (2 * vertexNum)
+	unusedBlossoms = list(range(vertexNum, 2 * vertexNum))
+	dualVar = [maxWeight] * vertexNum + [0] * vertexNum
+	allowEdge = [False] * edgeNum
+	queue = []
+
+	def slack(k):
+		i, j, weight = edges[k]
+		return dualVar[i] + dualVar[j] - 2 * weight
+
+	def blossomLeaves(b):
+		if b < vertexNum:
+			yield b
+		else:
+			for child in blossomChildren[b]:
+				for leaf in blossomLeaves(child):
+					yield leaf
+
+	def assignLabel(w, labelType, p):
+		b = inBlossom[w]
+		label[w] = label[b] = labelType
+		labelEnd[w] = labelEnd[b] = p
+		bestEdge[w] = bestEdge[b] = -1
+		if labelType == 1:
+			queue.extend(blossomLeaves(b))
+		else:
+			# The base of a T blossom is matched so its mate becomes an S vertex
+			base = blossomBase[b]
+			assignLabel(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+	def scanBlossom(v, w):
+		# Trace back from v and w alternately, leaving breadcrumbs, to find
+		# either a new blossom's base or an augmenting path
+		path = []
+		base = -1
+		while v != -1 or w != -1:
+			b = inBlossom[v]
+			if label[b] & 4:
+				base = blossomBase[b]
+				break
+			path.append(b)
+			label[b] = 5
+			if labelEnd[b] == -1:
+				v = -1
+			else:
+				v = endpoint[labelEnd[b]]
+				b = inBlossom[v]
+				v = endpoint[labelEnd[b]]
+			if w != -1:
+				v, w = w, v
+		for b in path:
+			label[b] = 1
+		return base
+
+	def addBlossom(base, k):
+		v, w, weight = edges[k]
+		baseBlossom = inBlossom[base]
+		bv = inBlossom[v]
+		bw = inBlossom[w]
+		b = unusedBlossoms.pop()
+		blossomBase[b] = base
+		blossomParent[b] = -1
+		blossomParent[baseBlossom] = b
+		blossomChildren[b] = path = []
+		blossomEnds[b] = ends = []
+		while bv != baseBlossom:
+			blossomParent[bv] = b
+			path.append(bv)
+			ends.append(labelEnd[bv])
+			v = endpoint[labelEnd[bv]]
+			bv = inBlossom[v]
+		path.append(baseBlossom)
+		path.reverse()
+		ends.reverse()
+		ends.append(2 * k)
+		while bw != baseBlossom:
+			blossomParent[bw] = b
+			path.append(bw)
+			ends.append(labelEnd[bw] ^ 1)
+			w = endpoint[labelEnd[bw]]
+			bw = inBlossom[w]
+		label[b] = 1
+		labelEnd[b] = labelEnd[baseBlossom]
+		dualVar[b] = 0
+		for v in blossomLeaves(b):
+			if label[inBlossom[v]] == 2:
+				# T vertices inside the new blossom become S vertices
+				queue.append(v)
+			inBlossom[v] = b
+		# Keep the least slack edge from the new blossom to each S blossom
+		bestEdgeTo = [-1] * (2 * vertexNum)
+		for bv in path:
+			if blossomBestEdges[bv] is None:
+				neighbourLists = [[p // 2 for p in neighbourEnds[v]]
+					for v in blossomLeaves(bv)]
+			else:
+				neighbourLists = [blossomBestEdges[bv]]
+			for neighbourList in neighbourLists:
+				for k in neighbourList:
+					i, j, weight = edges[k]
+					if inBlossom[j] == b:
+						i, j = j, i
+					bj = inBlossom[j]
+					if bj != b and label[bj] == 1 and (bestEdgeTo[bj] == -1 or
+						slack(k) < slack(bestEdgeTo[bj])):
+						bestEdgeTo[bj] = k
+			blossomBestEdges[bv] = None
+			bestEdge[bv] = -1
+		blossomBestEdges[b] = [k for k in bestEdgeTo if k != -1]
+		bestEdge[b] = -1
+		for k in blossomBestEdges[b]:
+			if bestEdge[b] == -1 or slack(k) < slack(bestEdge[b]):
+				bestEdge[b] = k
+
+	def expandBlossom(b, endStage):
+		for child in blossomChildren[b]:
+			blossomParent[child] = -1
+			if child < vertexNum:
+				inBlossom[child] = child
+			elif endStage and dualVar[child] == 0:
+				expandBlossom(child, endStage)
+			else:
+				for v in blossomLeaves(child):
+					inBlossom[v] = child
+		if not endStage and label[b] == 2:
+			# Relabel the children on the even length path from the entry child
+			# to the base as alternately T and S
+			entryChild = inBlossom[endpoint[labelEnd[b] ^ 1]]
+			j = blossomChildren[b].index(entryChild)
+			if j & 1:
+				j -= len(blossomChildren[b])
+				step = 1
+				endTrick = 0
+			else:
+				step = -1
+				endTrick = 1
+			p = labelEnd[b]
+			while j != 0:
+				label[endpoint[p ^ 1]] = 0
+				label[endpoint[blossomEnds[b][j - endTrick] ^ endTrick ^ 1]] = 0
+				assignLabel(endpoint[p ^ 1], 2, p)
+				allowEdge[blossomEnds[b][j - endTrick] // 2] = True
+				j += step
+				p = blossomEnds[b][j - endTrick] ^ endTrick
+				allowEdge[p // 2] = True
+				j += step
+			bv = blossomChildren[b][j]
+			label[endpoint[p ^ 1]] = label[bv] = 2
+			labelEnd[endpoint[p ^ 1]] = labelEnd[bv] = p
+			bestEdge[bv] = -1
+			j += step
+			# Children off the path that are reachable through a T vertex are
+			# labelled T again
+			while blossomChildren[b][j] != entryChild:
+				bv = blossomChildren[b][j]
+				if label[bv] == 1:
+					j += step
+					continue
+				for v in blossomLeaves(bv):
+					if label[v] != 0:
+						break
+				if label[v] != 0:
+					label[v] = 0
+					label[endpoint[mate[blossomBase[bv]]]] = 0
+					assignLabel(v, 2, labelEnd[v])
+				j += step
+		label[b] = labelEnd[b] = -1
+		blossomChildren[b] = blossomEnds[b] = None
+		blossomBase[b] = -1
+		blossomBestEdges[b] = None
+		bestEdge[b] = -1
+		unusedBlossoms.append(b)
+
+	def augmentBlossom(b, v):
+		# Swap matched and unmatched edges on the path from v to the base of b
+		# so v becomes the new base
+		t = v
+		while blossomParent[t] != b:
+			t = blossomParent[t]
+		if t >= vertexNum:
+			augmentBlossom(t, v)
+		i = j = blossomChildren[b].index(t)
+		if i & 1:
+			j -= len(blossomChildren[b])
+			step = 1
+			endTrick = 0
+		else:
+			step = -1
+			endTrick = 1
+		while j != 0:
+			j += step
+			t = blossomChildren[b][j]
+			p = blossomEnds[b][j - endTrick] ^ endTrick
+			if t >= vertexNum:
+				augmentBlossom(t, endpoint[p])
+			j += step
+			t = blossomChildren[b][j]
+			if t >= vertexNum:
+				augmentBlossom(t, endpoint[p ^ 1])
+			mate[endpoint[p]] = p ^ 1
+			mate[endpoint[p ^ 1]] = p
+		blossomChildren[b] = blossomChildren[b][i:] + blossomChildren[b][:i]
+		blossomEnds[b] = blossomEnds[b][i:] + blossomEnds[b][:i]
+		blossomBase[b] = blossomBase[blossomChildren[b][0]]
+
+	def augmentMatching(k):
+		v, w, weight = edges[k]
+		for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+			# Follow the alternating path from s back to a free vertex
+			while True:
+				bs = inBlossom[s]
+				if bs >= vertexNum:
+					augmentBlossom(bs, s)
+				mate[s] = p
+				if labelEnd[bs] == -1:
+					break
+				t = endpoint[labelEnd[bs]]
+				bt = inBlossom[t]
+				s = endpoint[labelEnd[bt]]
+				j = endpoint[labelEnd[bt] ^ 1]
+				if bt >= vertexNum:
+					augmentBlossom(bt, j)
+				mate[j] = labelEnd[bt]
+				p = labelEnd[bt] ^ 1
+
+	# Each stage grows the matching by one edge or proves it can not grow
+	for stage in range(vertexNum):
+		label[:] = [0] * (2 * vertexNum)
+		bestEdge[:] = [-1] * (2 * vertexNum)
+		blossomBestEdges[vertexNum:] = [None] * vertexNum
+		allowEdge[:] = [False] * edgeNum
+		queue[:] = []
+		for v in range(vertexNum):
+			if mate[v] == -1 and label[inBlossom[v]] == 0:
+				assignLabel(v, 1, -1)
+		augmented = False
+		while True:
+			while queue and not augmented:
+				v = queue.pop()
+				for p in neighbourEnds[v]:
+					k = p // 2
+					w = endpoint[p]
+					if inBlossom[v] == inBlossom[w]:
+						continue
+					if not allowEdge[k]:
+						edgeSlack = slack(k)
+						if edgeSlack <= 0:
+							allowEdge[k] = True
+					if allowEdge[k]:
+						if label[inBlossom[w]] == 0:
+							assignLabel(w, 2, p ^ 1)
+						elif label[inBlossom[w]] == 1:
+							base = scanBlossom(v, w)
+							if base >= 0:
+								addBlossom(base, k)
+							else:
+								augmentMatching(k)
+								augmented = True
+								break
+						elif label[w] == 0:
+							label[w] = 2
+							labelEnd[w] = p ^ 1
+					elif label[inBlossom[w]] == 1:
+						b = inBlossom[v]
+						if bestEdge[b] == -1 or edgeSlack < slack(bestEdge[b]):
+							bestEdge[b] = k
+					elif label[w] == 0:
+						if bestEdge[w] == -1 or edgeSlack < slack(bestEdge[w]):
+							bestEdge[w] = k
+			if augmented:
+				break
+
+			# No augmenting path with the current duals so find the largest
+			# dual change that keeps every slack non negative
+			deltaType = -1
+			delta = deltaEdge = deltaBlossom = None
+			if not maxCardinality:
+				deltaType = 1
+				delta = min(dualVar[:vertexNum])
+			for v in range(vertexNum):
+				if label[inBlossom[v]] == 0 and bestEdge[v] != -1:
+					d = slack(bestEdge[v])
+					if deltaType == -1 or d < delta:
+						delta = d
+						deltaType = 2
+						deltaEdge = bestEdge[v]
+			for b in range(2 * vertexNum):
+				if blossomParent[b] == -1 and label[b] == 1 and bestEdge[b] != -1:
+					d = slack(bestEdge[b]) / 2.0
+					if deltaType == -1 or d < delta:
+						delta = d
+						deltaType = 3
+						deltaEdge = bestEdge[b]
+			for b in range(vertexNum, 2 * vertexNum):
+				if blossomBase[b] >= 0 and blossomParent[b] == -1 and \
+					label[b] == 2 and (deltaType == -1 or dualVar[b] < delta):
+					delta = dualVar[b]
+					deltaType = 4
+					deltaBlossom = b
+			if deltaType == -1:
+				# Only reachable with maxCardinality when the matching is maximum
+				deltaType = 1
+				delta = max(0, min(dualVar[:vertexNum]))
+
+			for v in range(vertexNum):
+				if label[inBlossom[v]] == 1:
+					dualVar[v] -= delta
+				elif label[inBlossom[v]] == 2:
+					dualVar[v] += delta
+			for b in range(vertexNum, 2 * vertexNum):
+				if blossomBase[b] >= 0 and blossomParent[b] == -1:
+					if label[b] == 1:
+						dualVar[b] += delta
+					elif label[b] == 2:
+						dualVar[b] -= delta
+
+			if deltaType == 1:
+				break
+			elif deltaType == 2:
+				allowEdge[deltaEdge] = True
+				i, j, weight = edges[deltaEdge]
+				if label[inBlossom[i]] == 0:
+					i, j = j, i
+				queue.append(i)
+			elif deltaType == 3:
+				allowEdge[deltaEdge] = True
+				i, j, weight = edges[deltaEdge]
+				queue.append(i)
+			else:
+				expandBlossom(deltaBlossom, False)
+
+		if not augmented:
+			break
+		# Expand S blossoms whose dual has reached zero
+		for b in range(vertexNum, 2 * vertexNum):
+			if blossomParent[b] == -1 and blossomBase[b] >= 0 and \
+				label[b] == 1 and dualVar[b] == 0:
+				expandBlossom(b, True)
+
+	return [endpoint[mate[v]] if mate[v] >= 0 else -1 for v in range(vertexNum)]
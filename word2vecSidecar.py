@@ -0,0 +1,173 @@
+import os
+from mmap import ACCESS_READ
+from mmap import mmap
+from gensim.models import Word2Vec
+from gensim.models.word2vec import Vocab
+from numpy import float32
+from numpy import fromstring
+from numpy import load
+from numpy import save
+from numpy import zeros
+import loadAndSave as sl
+
+def getDatasetTokens(dataset, vocabulary=None):
+	"""
+	Gathers every distinct token of the examples of a dataset.
+
+	Args:
+	dataset: A dictionary with words as keys and as values a list of senses
+	which are dictionarys which must have a key 'examples' that as a value is
+	a list of dictionaries with keys 'sent' and 'tokens'.
+	vocabulary: The TokenVocabulary the tokens were interned with or None.
+
+	Returns:
+	A set of the tokens.
+	"""
+	if vocabulary is not None:
+		return set(vocabulary.tokens)
+	tokens = set()
+	for key in dataset:
+		for sense in dataset[key]:
+			for example in sense['examples']:
+				tokens.update(example['tokens'])
+	return tokens
+
+def scanWord2VecBinary(word2vecBin, tokens=None):
+	"""
+	Reads the vectors of the given tokens from a binary file in the original
+	C word2vec format in a single pass, without keeping the vectors of any
+	other words. The file is memory-mapped so only the word of each record is
+	looked at for words that are not wanted.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary.
+	tokens: A set of the tokens whose vectors are wanted or None for all.
+
+	Returns:
+	A tuple of the list of tokens found in the file, in the order they appear,
+	and a float32 matrix with the vector of each in a row.
+	"""
+	if tokens is not None:
+		wanted = dict((token.encode('utf-8'), token) for token in tokens)
+	words = []
+	positions = []
+	seen = set()
+	with open(word2vecBin, 'rb') as binFile:
+		data = mmap(binFile.fileno(), 0, access=ACCESS_READ)
+		try:
+			headerEnd = data.find(b'\n')
+			wordNum, vectorSize = map(int, data[:headerEnd].split())
+			vectorLength = vectorSize * 4
+			position = headerEnd + 1
+			for i in xrange(wordNum):
+				wordEnd = data.find(b' ', position)
+				if wordEnd < 0:
+					raise EOFError('Unexpected end of ' + word2vecBin)
+				# Some files have a newline in front of each word
+				word = data[position:wordEnd].lstrip(b'\n')
+				position = wordEnd + 1
+				# As when loading the full model only a word's first vector is used
+				if word not in seen and (tokens is None or word in wanted):
+					seen.add(word)
+					words.append(wanted[word] if tokens is not None else 
+						word.decode('utf-8', 'replace'))
+					positions.append(position)
+				position += vectorLength
+
+			# The rows are copied once their number is known
+			vectors = zeros((len(positions), vectorSize), dtype=float32)
+			for row, position in enumerate(positions):
+				vectors[row] = fromstring(data[position:position + vectorLength],
+					dtype=float32)
+		finally:
+			data.close()
+	return words, vectors
+
+def getSidecarPaths(sidecarPath):
+	"""
+	Gives the file paths of the vector matrix and index of a sidecar model.
+	"""
+	return sidecarPath + '.npy', sidecarPath + '.index'
+
+def saveSidecarModel(word2vecBin, sidecarPath, tokens=None):
+	"""
+	Extracts the vectors of the given tokens from a word2vec binary and saves
+	them as a sidecar model.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary.
+	sidecarPath: The file path, without extension, to save the sidecar to.
+	tokens: A set of the tokens whose vectors are wanted or None to convert 
+	the whole binary.
+	"""
+	words, vectors = scanWord2VecBinary(word2vecBin, tokens)
+	vectorsPath, indexPath = getSidecarPaths(sidecarPath)
+	sidecarDir = os.path.dirname(sidecarPath)
+	if sidecarDir and not os.path.exists(sidecarDir):
+		os.makedirs(sidecarDir)
+	with open(vectorsPath + '.tmp', 'wb') as vectorsFile:
+		save(vectorsFile, vectors)
+	sl.saveDataToFile(indexPath + '.tmp', {'words':words,
+		'requestedTokens':set(tokens if tokens is not None else words),
+		'binarySignature':sl.getFileSignature(word2vecBin)})
+	os.rename(vectorsPath + '.tmp', vectorsPath)
+	os.rename(indexPath + '.tmp', indexPath)
+
+def loadSidecarModel(sidecarPath):
+	"""
+	Loads a sidecar model as a word2vec model, which like one loaded from the
+	word2vec binary can be used to look up vectors but not trained.
+
+	Args:
+	sidecarPath: The file path, without extension, of the sidecar.
+
+	Returns:
+	The word2vec model.
+	"""
+	vectorsPath, indexPath = getSidecarPaths(sidecarPath)
+	words = sl.loadDataFromFile(indexPath)['words']
+	vectors = load(vectorsPath)
+	model = Word2Vec(size=vectors.shape[1])
+	model.wv.syn0 = vectors
+	model.wv.index2word = list(words)
+	for index, word in enumerate(words):
+		model.wv.vocab[word] = Vocab(index=index, count=len(words) - index)
+	return model
+
+def updateSidecarModel(word2vecBin, sidecarPath, tokens):
+	"""
+	Makes sure a sidecar of the word2vec binary holds the vectors of the given
+	tokens. The sidecar is created, or recreated with the tokens it already 
+	had, if it does not exist, was made from a different binary or is missing
+	any of the tokens.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary.
+	sidecarPath: The file path, without extension, of the sidecar.
+	tokens: A set of the tokens whose vectors are needed.
+	"""
+	vectorsPath, indexPath = getSidecarPaths(sidecarPath)
+	requestedTokens = set()
+	if os.path.exists(vectorsPath) and os.path.exists(indexPath):
+		index = sl.loadDataFromFile(indexPath)
+		if index['binarySignature'] == sl.getFileSignature(word2vecBin):
+			requestedTokens = index['requestedTokens']
+			if set(tokens) <= requestedTokens:
+				return
+	saveSidecarModel(word2vecBin, sidecarPath, requestedTokens | set(tokens))
+
+def loadRestrictedModel(word2vecBin, sidecarPath, tokens):
+	"""
+	Loads a word2vec model holding only the vectors of the given tokens from
+	a sidecar of the word2vec binary, updating the sidecar first if needed.
+
+	Args:
+	word2vecBin: The file path of the word2vec binary.
+	sidecarPath: The file path, without extension, of the sidecar.
+	tokens: A set of the tokens whose vectors are needed.
+
+	Returns:
+	The word2vec model.
+	"""
+	updateSidecarModel(word2vecBin, sidecarPath, tokens)
+	return loadSidecarModel(sidecarPath)
@@ -0,0 +1,127 @@
+from math import factorial
+from random import Random
+from baseLinePredictions import GroupedPredictions
+from groupingSolvers import maxSubsetExamples
+
+def getPartitionNum(groupSizes):
+	"""
+	Gives the number of ways of splitting examples into unlabelled groups of
+	the given sizes.
+
+	Args:
+	groupSizes: A list of the size of each group.
+
+	Returns:
+	The number of partitions as an integer.
+	"""
+	partitions = factorial(sum(groupSizes))
+	for size in groupSizes:
+		partitions //= factorial(size)
+	for size in set(groupSizes):
+		partitions //= factorial(groupSizes.count(size))
+	return partitions
+
+def estimateWordCost(examples, grouped, groupSizes=None, solver='bruteForce'):
+	"""
+	Estimates the relative time taken to predict a word of a test iteration,
+	to order the words so the slowest are started first. Every pair of
+	examples is scored and the word similarity methods compare every pair of
+	their tokens, so scoring grows with the square of the number of tokens.
+	Grouping grows with the number of partitions scored by 'bruteForce' and
+	'batch', with the number of subsets of the examples for 'subsetDP' and
+	'exact' and with the cube of the number of examples for matching, which
+	the enumerating solvers use for pairs, and the heuristic solvers.
+
+	Args:
+	examples: A list of the word's selected examples, each a dictionary with
+	key 'tokens'.
+	grouped: Boolean indicating if the problem is the grouped problem (if
+	True) or the select one sentence from many options problem.
+	groupSizes: A list of the size of each of the word's groups if grouped.
+	solver: The grouping solver.
+
+	Returns:
+	The estimated cost as a number.
+	"""
+	tokenNum = sum(len(example['tokens']) for example in examples)
+	cost = tokenNum ** 2
+	if not grouped:
+		return cost
+	exampleNum = len(examples)
+	if solver in GroupedPredictions.enumeratingSolvers and max(groupSizes) == 2:
+		solver = 'matching'
+	if solver in ['subsetDP', 'exact'] and exampleNum <= maxSubsetExamples:
+		return cost + 3 ** exampleNum
+	elif solver in GroupedPredictions.enumeratingSolvers:
+		return cost + getPartitionNum(groupSizes) * exampleNum
+	return cost + exampleNum ** 3
+
+def orderByCost(costsByKey):
+	"""
+	Orders words from the most to the least costly, words of equal cost by
+	key.
+
+	Args:
+	costsByKey: A dictionary with words as keys and their estimated cost as
+	values.
+
+	Returns:
+	A list of the keys.
+	"""
+	return sorted(costsByKey, key=lambda key: (-costsByKey[key], key))
+
+def getWordSeeds(iterationSeed, keys):
+	"""
+	Draws the random seed each word of a test iteration is predicted with
+	from the seed of the iteration, so the prediction of a word does not
+	depend on which process predicts it or what it predicted before.
+
+	Args:
+	iterationSeed: The random seed of the iteration.
+	keys: The words of the iteration.
+
+	Returns:
+	A dictionary with the words as keys and their seeds as values.
+	"""
+	seeds = Random(iterationSeed)
+	return dict((key, seeds.randint(0, 2**31 - 1)) for key in sorted(keys))
+
+def mergeWordResults(resultsByKey):
+	"""
+	Merges the results of the words of a test iteration predicted one at a
+	time into the results of the whole iteration. The accuracies of an
+	iteration are the mean of its words' accuracies.
+
+	Args:
+	resultsByKey: A dictionary with words as keys and as values the results
+	of predicting only that word, dictionaries with key 'accuracy' and
+	optionally 'fullAccuracy' and 'comparison' as given by runTestIteration.
+
+	Returns:
+	A dictionary of the same form for all the words.
+	"""
+	keys = sorted(resultsByKey)
+	results = [resultsByKey[key] for key in keys]
+	merged = {'accuracy':sum(result['accuracy'] for result in results) /
+		float(len(results))}
+	if 'fullAccuracy' in results[0]:
+		merged['fullAccuracy'] = sum(result['fullAccuracy']
+			for result in results) / float(len(results))
+	if 'comparison' in results[0]:
+		comparisons = [result['comparison'] for result in results]
+		words = sum(comparison['words'] for comparison in comparisons)
+		# Only words solved exactly have an exact accuracy
+		exactAccuracies = [comparison['exactAccuracy'] 
+			for comparison in comparisons if comparison['words']]
+		merged['comparison'] = {'accuracy':merged['accuracy'],
+			'exactAccuracy':sum(exactAccuracies) / float(len(exactAccuracies))
+			if exactAccuracies else None,
+			'words':words,
+			'skipped':sum(comparison['skipped'] for comparison in comparisons),
+			'meanGap':sum(comparison['meanGap'] * comparison['words']
+			for comparison in comparisons) / float(words) if words else 0.0,
+			'maxGap':max(comparison['maxGap'] for comparison in comparisons),
+			'seconds':sum(comparison['seconds'] for comparison in comparisons),
+			'exactSeconds':sum(comparison['exactSeconds']
+			for comparison in comparisons)}
+	return merged